@@ -3,5 +3,24 @@ Agent modules for AI Tech Catchup Agent
 """
 
 from .ai_tech_catchup_agent import AITechCatchupAgent
+from .batch import BatchJobStore, batch_key
+from .pipeline import PipelineStage, ReportPipeline
+from .run_guard import IssueLookup, RunGuard, run_key
+from .sharding import ShardManifestStore, build_index_issue, parse_shard, select_shard, shard_of, sweep_id
 
-__all__ = ["AITechCatchupAgent"]
+__all__ = [
+    "AITechCatchupAgent",
+    "BatchJobStore",
+    "batch_key",
+    "PipelineStage",
+    "ReportPipeline",
+    "IssueLookup",
+    "RunGuard",
+    "run_key",
+    "ShardManifestStore",
+    "build_index_issue",
+    "parse_shard",
+    "select_shard",
+    "shard_of",
+    "sweep_id",
+]
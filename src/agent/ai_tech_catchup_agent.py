@@ -2,16 +2,196 @@
 AI Tech Catchup Agent メインクラス
 """
 
+import asyncio
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Union
-
-from ..client import ClaudeCodeClient, GeminiClient, GitHubClient
+import re
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..client import ClaudeClient, ClaudeCodeClient, GeminiClient, GitHubClient, LocalTool
 from ..config import settings
-from ..utils import PromptManager
+from ..publisher import create_default_publisher
+from ..utils import LinkValidator, PromptManager, ReportIndex, SourceRegistry, UsageLedger, summarize_payload
+from ..utils.link_validator import apply_link_results, extract_links
+from ..utils.profiler import mark_boundary
+from ..utils.rate_limiter import rate_limit_priority
+from ..utils.report_index import SEARCH_TOOL, extract_report_content, run_search_tool
+from ..utils.run_history import RunHistory
+from .batch import BatchJobStore, batch_key
+from .pipeline import PipelineStage, ReportPipeline
+from .research import ResearchStore, parse_research
+from .run_guard import IssueLookup, RunGuard, run_key
+from .watermark import WatermarkStore
 
 logger = logging.getLogger(__name__)
 
+# 調査フェーズでトピックを指定しない場合の調査方針
+RESEARCH_FOCUS_ALL = "この調査結果は日次・週次・月次・トピック別の複数のレポートで再利用されるため、特定の分野に偏らず、できるだけ網羅的に収集してください。"
+
+# バッチモードで Message Batches API に置き換えるステージ（それ以降のステージは通常どおり実行）
+BATCH_REPLACED_STAGES = ("render", "generate")
+
+# レポートモードごとの定義（プロンプト、Issue のタイトル・見出し・ラベル、調査期間の日数、調査結果を再利用する場合の調査期間の日数、
+# 前回成功したレポート以降を調査期間とするか）
+REPORT_DEFINITIONS: Dict[str, Dict[str, Any]] = {
+    "report": {
+        "name": "AI技術キャッチアップ",
+        "prompt_type": "report",
+        "report_type": "report",
+        "heading": "# 🤖 AI Tech Catchup Report",
+        "title": "🤖 AI Tech Catchup Report - {date}",
+        "label": "report",
+        "period_days": 0,
+        "pass_news_count": True,
+        "research_days": 1,
+        "incremental": True,
+    },
+    "test": {
+        "name": "テストレポート",
+        "prompt_type": "test_report",
+        "report_type": "report",
+        "heading": "# 🤖 AI Tech Catchup Report",
+        "title": "🤖 AI Tech Catchup Report - {date}",
+        "label": "report",
+        "period_days": 0,
+        "pass_news_count": True,
+        "research_days": 0,
+        "incremental": False,
+    },
+    "weekly": {
+        "name": "週次レポート",
+        "prompt_type": "weekly_report",
+        "report_type": "weekly_report",
+        "heading": "# 📊 AI Tech Catchup Weekly Report",
+        "title": "📊 AI Tech Catchup Weekly Report - {week}",
+        "label": "weekly-report",
+        "period_days": 7,
+        "pass_news_count": False,
+        "research_days": 7,
+        "incremental": False,
+    },
+    "monthly": {
+        "name": "月次レポート",
+        "prompt_type": "monthly_report",
+        "report_type": "monthly_report",
+        "heading": "# 📈 AI Tech Catchup Monthly Report",
+        "title": "📈 AI Tech Catchup Monthly Report - {month}",
+        "label": "monthly-report",
+        "period_days": 30,
+        "pass_news_count": False,
+        "research_days": 30,
+        "incremental": False,
+    },
+    "topic": {
+        "name": "トピックレポート",
+        "prompt_type": "topic_report",
+        "report_type": "topic_report",
+        "heading": "# 🎯 AI Tech Catchup Topic Report: {topic}",
+        "title": "🎯 AI Tech Catchup Topic Report: {topic} - {date}",
+        "label": "topic-report",
+        "period_days": 0,
+        "pass_news_count": True,
+        "research_days": 7,
+        "incremental": True,
+    },
+}
+
+
+def report_window(days: int, now: Optional[datetime] = None) -> Tuple[date, date]:
+    """前日までの days 日間の調査期間（開始日, 終了日）を取得"""
+    yesterday = ((now or datetime.now()) - timedelta(days=1)).date()
+    return yesterday - timedelta(days=days - 1), yesterday
+
+
+def report_period(days: int, now: Optional[datetime] = None) -> str:
+    """前日までの days 日間の調査期間を "YYYY-MM-DD ~ YYYY-MM-DD" 形式で取得"""
+    start, end = report_window(days, now)
+    return f"{start.isoformat()} ~ {end.isoformat()}"
+
+
+def week_title(now: Optional[datetime] = None) -> str:
+    """月の第何週目かを表す週次レポートのタイトル（例: 2025年01月第2週）"""
+    today = now or datetime.now()
+    week_number = (today.day - 1) // 7 + 1
+    return f"{today.strftime('%Y年%m月')}第{week_number}週"
+
+
+def issue_title(definition: Dict[str, Any], topic: Optional[str], now: datetime) -> str:
+    """レポートモードの定義から Issue のタイトルを作成"""
+    title: str = definition["title"].format(topic=topic or "", date=now.strftime("%Y-%m-%d"), month=now.strftime("%Y年%m月"), week=week_title(now))
+    return title
+
+
+def run_period(definition: Dict[str, Any], now: datetime) -> str:
+    """Issue のタイトルと同じ単位のレポートの期間（週次: 週、月次: 月、それ以外: 日付）"""
+    if "{week}" in definition["title"]:
+        return week_title(now)
+    if "{month}" in definition["title"]:
+        return now.strftime("%Y年%m月")
+    return now.strftime("%Y-%m-%d")
+
+
+TOPIC_TITLE_PATTERN = re.compile(r"Topic Report: (.+) - \d{4}-\d{2}-\d{2}$")
+# レポート検索インデックスに含めない Issue のラベル（トピック別レポートの一覧など）
+INDEX_EXCLUDED_LABELS = {"topic-index"}
+
+
+def create_report_index() -> ReportIndex:
+    """設定値からレポート検索インデックスを作成"""
+    return ReportIndex(
+        str(Path(settings.state_dir) / "report_index"),
+        embedding_model=settings.report_index_embedding_model or None,
+        google_api_key=settings.google_api_key,
+    )
+
+
+def sync_report_index(report_index: ReportIndex, github_client: GitHubClient) -> Dict[str, Any]:
+    """
+    GitHub の Issue として配信済みのレポートを検索インデックスに差分同期（前回の同期以降に更新された Issue のみ）
+
+    Returns:
+        同期結果（status, synced, reports, chunks, message）
+    """
+    synced_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    since = report_index.get_meta("synced_at")
+    versions = report_index.indexed_versions()
+    reports = []
+    try:
+        for label, report_type in {definition["label"]: definition["report_type"] for definition in REPORT_DEFINITIONS.values()}.items():
+            for issue in github_client.list_issues(label=label, since=since):
+                labels = {label_info["name"] for label_info in issue.get("labels", [])}
+                if labels & INDEX_EXCLUDED_LABELS or versions.get(issue["html_url"]) == issue.get("updated_at"):
+                    continue
+                topic = TOPIC_TITLE_PATTERN.search(issue["title"])
+                reports.append(
+                    {
+                        "doc_id": issue["html_url"],
+                        "title": issue["title"],
+                        "content": extract_report_content(issue.get("body") or ""),
+                        "metadata": {
+                            "url": issue["html_url"],
+                            "number": issue["number"],
+                            "report_type": report_type,
+                            "topic": topic.group(1) if topic else None,
+                            "created_at": issue["created_at"],
+                            "updated_at": issue["updated_at"],
+                        },
+                    }
+                )
+                versions[issue["html_url"]] = issue.get("updated_at")
+    except Exception as e:
+        logger.error(f"レポート検索インデックスの同期に失敗: {e}")
+        return {"status": "error", "message": str(e)}
+
+    report_index.add_many(reports)
+    report_index.set_meta("synced_at", synced_at)
+    return {"status": "success", "synced": len(reports), **report_index.stats()}
+
 
 class AITechCatchupAgent:
     """AI Tech Catchup Agent メインクラス"""
@@ -27,293 +207,760 @@ class AITechCatchupAgent:
         self.max_tokens = max_tokens if max_tokens is not None else settings.max_tokens
         self.enabled_mcp_servers = enabled_mcp_servers or []
 
-        # モデル名に基づいてクライアントを選択
-        self.ai_client: Union[ClaudeCodeClient, GeminiClient]
-        if "claude" in self.model_name.lower():
-            self.ai_client = ClaudeCodeClient(
-                model_name=self.model_name,
+        self.source_registry = SourceRegistry(str(Path(settings.state_dir) / "sources.json"), down_threshold=settings.source_down_threshold)
+
+        self.report_index = create_report_index() if settings.report_index else None
+
+        # モデル名に基づいてクライアントを選択（2 階層モードでは調査フェーズ用に高速・低コストのモデルのクライアントも作成）
+        self.ai_client = self._create_client(self.model_name)
+        self.gather_model_name = settings.tiered_gather_model or None
+        self.gather_client = self._create_client(self.gather_model_name) if self.gather_model_name else None
+        if self.gather_model_name:
+            logger.info(f"2 階層モード: 調査 {self.gather_model_name} / 執筆 {self.model_name}")
+
+        self.github_client = GitHubClient(token=settings.github_token, repo=settings.github_repo)
+        self.publisher = create_default_publisher(self.github_client)
+        self.prompt_manager = PromptManager(prompts_dir, source_registry=self.source_registry)
+        self.usage_ledger = UsageLedger(str(Path(settings.state_dir) / "usage_ledger.jsonl"))
+        self.research_store = ResearchStore(str(Path(settings.state_dir) / "research"), settings.research_max_age_hours)
+        self.link_validator = LinkValidator(
+            str(Path(settings.state_dir) / "link_cache.json"),
+            concurrency=settings.link_validation_concurrency,
+            per_host_limit=settings.link_validation_per_host,
+            timeout=settings.link_validation_timeout,
+            ttl=settings.link_cache_ttl,
+        )
+        self.watermarks = WatermarkStore(str(Path(settings.state_dir) / "watermarks.json"), max_age_days=settings.watermark_max_days)
+        self.batch_store = BatchJobStore(str(Path(settings.state_dir) / "batches.json"))
+        self.run_guard = RunGuard(str(Path(settings.state_dir) / "runs"))
+        self.issue_lookup = IssueLookup(str(Path(settings.state_dir) / "issue_cache.json"), ttl=settings.issue_lookup_ttl)
+        self.run_history = RunHistory(str(Path(settings.state_dir) / "run_history.jsonl"))
+        self.pipeline = self._build_pipeline()
+        # 実行パラメータの設定値（RUN_TUNING=auto の場合は実行ごとの推奨値をアイテムとパイプラインに渡し、Agent の状態は変更しない）
+        self.configured_params: Dict[str, Any] = {
+            "generate_concurrency": settings.pipeline_generate_concurrency,
+            "generate_timeout": settings.generate_timeout or None,
+            "max_tokens": self.ai_client.max_tokens,
+        }
+
+    def _create_client(self, model_name: str) -> Union[ClaudeCodeClient, ClaudeClient, GeminiClient]:
+        """モデル名に基づいてクライアントを作成（Claude は CLAUDE_BACKEND で Claude Code CLI か Claude API の直接呼び出しかを選択）"""
+        if "claude" in model_name.lower() and self._use_claude_api():
+            if self.enabled_mcp_servers:
+                logger.warning("MCP サーバーは Claude API バックエンドではサポートされていません。無視されます。")
+            return ClaudeClient(
+                anthropic_api_key=settings.anthropic_api_key,
+                model_name=model_name,
+                max_tokens=self.max_tokens,
+                token_budget=settings.run_token_budget,
+                cost_budget=settings.run_cost_budget,
+                local_tools=self._local_tools(),
+                wrap_up_ratio=settings.turn_budget_wrap_up_ratio,
+            )
+        if "claude" in model_name.lower():
+            return ClaudeCodeClient(
+                model_name=model_name,
                 max_tokens=self.max_tokens,
                 enabled_mcp_servers=self.enabled_mcp_servers,
+                token_budget=settings.run_token_budget,
+                cost_budget=settings.run_cost_budget,
+                source_registry=self.source_registry,
+                wrap_up_ratio=settings.turn_budget_wrap_up_ratio,
             )
-        elif "gemini" in self.model_name.lower():
-            self.ai_client = GeminiClient(google_api_key=settings.google_api_key, model_name=self.model_name, max_tokens=self.max_tokens)
+        if "gemini" in model_name.lower():
             if self.enabled_mcp_servers:
                 logger.warning("MCP サーバーは Gemini モデルではサポートされていません。無視されます。")
-        else:
-            logger.error(f"未対応のモデルです: {self.model_name}")
-            raise ValueError(f"未対応のモデルです: {self.model_name}")
-
-        self.github_client = GitHubClient(token=settings.github_token, repo=settings.github_repo)
-        self.prompt_manager = PromptManager(prompts_dir)
+            return GeminiClient(
+                google_api_key=settings.google_api_key,
+                model_name=model_name,
+                max_tokens=self.max_tokens,
+                token_budget=settings.run_token_budget,
+                cost_budget=settings.run_cost_budget,
+            )
+        logger.error(f"未対応のモデルです: {model_name}")
+        raise ValueError(f"未対応のモデルです: {model_name}")
+
+    def _use_claude_api(self) -> bool:
+        """Claude API を直接呼び出すか（api: 常に, auto: MCP サーバーを使用しない場合, code: Claude Code CLI を使用）"""
+        if settings.claude_backend not in ("code", "api", "auto"):
+            logger.warning(f"未対応の CLAUDE_BACKEND です: {settings.claude_backend}。Claude Code を使用します")
+        return settings.claude_backend == "api" or (settings.claude_backend == "auto" and not self.enabled_mcp_servers)
+
+    def _local_tools(self) -> List[LocalTool]:
+        """Claude API のツール使用ループで使用するローカルツール（過去のレポートの検索）"""
+        if self.report_index is None:
+            return []
+        report_index = self.report_index
+        return [
+            LocalTool(
+                name=SEARCH_TOOL["name"],
+                description=SEARCH_TOOL["description"],
+                input_schema=SEARCH_TOOL["inputSchema"],
+                handler=lambda arguments: run_search_tool(report_index, arguments),
+            )
+        ]
 
-    def run_catchup(
+    def _generate(
         self,
-        create_issue: bool = True,
-        news_count: Optional[int] = None,
-        test_mode: bool = False,
+        prompt: str,
+        report_type: str,
+        topic: Optional[str] = None,
+        client: Optional[Union[ClaudeCodeClient, ClaudeClient, GeminiClient]] = None,
+        tier: str = "single",
+        params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Claude Codeで最新AI情報をキャッチアップ"""
-        logger.info("Claude CodeでAI技術キャッチアップを開始...")
-
-        try:
-            # 1. プロンプトの準備
-            logger.info("プロンプトを準備中...")
-            prompt_type = "test_report" if test_mode else "report"
-            prompt = self.prompt_manager.get_prompt(
-                prompt_type,
-                enabled_mcp_servers=self.enabled_mcp_servers,
-                news_count=str(news_count or settings.news_count),
+        """
+        LLM でレポートを生成し、利用量を台帳に記録
+
+        Args:
+            prompt: プロンプト
+            report_type: レポートタイプ
+            topic: トピック名
+            client: 使用するクライアント（None の場合はメインのモデルのクライアント）
+            tier: 階層（single: 1 回で生成, gather: 調査フェーズ, write: 執筆フェーズ）
+            params: この実行の実行パラメータ（None の場合は設定値。最大出力トークン数はメインのモデルのみに適用）
+        """
+        params = params or self.configured_params
+        max_tokens = params["max_tokens"] if client is None else None
+        client = client or self.ai_client
+        run_id = uuid.uuid4().hex[:12]
+        started = time.perf_counter()
+        search_result = client.send_message(prompt, report_type=report_type, timeout=params["generate_timeout"], max_tokens=max_tokens)
+        search_result["run_id"] = run_id
+        search_result["latency_ms"] = int((time.perf_counter() - started) * 1000)
+        search_result["tier"] = tier
+        self._record_usage(search_result, report_type, topic, type(client).__name__, model=client.model_name)
+        return search_result
+
+    def _record_usage(self, search_result: Dict[str, Any], report_type: str, topic: Optional[str], backend: str, model: Optional[str] = None) -> None:
+        """生成結果の利用量を台帳に記録"""
+        run_id = search_result["run_id"]
+        if "usage" in search_result:
+            self.usage_ledger.record(
+                {
+                    "run_id": run_id,
+                    "report_type": report_type,
+                    "topic": topic,
+                    "model": model or self.model_name,
+                    "backend": backend,
+                    "tier": search_result.get("tier", "single"),
+                    "status": "budget_exceeded" if search_result.get("budget_exceeded") else search_result["status"],
+                    "usage": search_result["usage"],
+                    "cost_usd": search_result.get("cost_usd"),
+                    "num_turns": search_result.get("num_turns"),
+                    "duration_ms": search_result.get("duration_ms"),
+                    "latency_ms": search_result.get("latency_ms"),
+                    "turn_budget": search_result.get("turn_budget"),
+                }
             )
-            if not prompt:
-                logger.error("プロンプトを取得できませんでした")
-                return {"status": "error", "message": "プロンプトの取得に失敗しました"}
-
-            # 2. LLM で最新情報を検索
-            logger.info("LLM モデル名で最新情報を検索中...")
-            search_result = self.ai_client.send_message(prompt)
-
-            if search_result["status"] != "success":
-                logger.error(f"LLM 検索エラー: {search_result['message']}")
-                return {"status": "error", "message": search_result["message"]}
-
-            result = {
-                "status": "success",
-                "content": search_result["content"],
-                "searched_at": search_result["searched_at"],
-            }
-
-            # 2. GitHub Issue作成（オプション）
-            if create_issue:
-                logger.info("GitHub Issueを作成中...")
-                issue_body = f"""# 🤖 AI Tech Catchup Report
-
-- レポート日時: `{datetime.now().strftime("%Y-%m-%d %H:%M")}`
-- 使用モデル: `{self.model_name}`
-
-> **💡 質疑応答について**
-> このレポート内容について質問したい場合は、コメントで `@claude` または `@gemini-cli` とメンションすると、AI が自動的に回答します。
-
----
-
-{search_result["content"]}
-
----
-
-*このレポートは AI Tech Catchup Agent によって自動生成されました。*
-"""
-                issue_result = self.github_client.create_issue(
-                    title=f"🤖 AI Tech Catchup Report - {datetime.now().strftime('%Y-%m-%d')}",
-                    body=issue_body,
-                    labels=["report", self.model_name],
-                )
-
-                if "error" in issue_result:
-                    logger.error(f"Issue作成エラー: {issue_result['error']}")
-                    return {"status": "error", "message": issue_result["error"]}
-
-                logger.info(f"レポートIssueを作成しました: {issue_result.get('html_url', '')}")
-                result["issue_url"] = issue_result.get("html_url", "")
+            cost = search_result.get("cost_usd")
+            cost_text = f"${cost:.4f}" if cost is not None else "不明"
+            logger.info(f"利用量 (run_id={run_id}): {search_result['usage']}, コスト: {cost_text}")
+
+    @staticmethod
+    def _tier_metrics(search_result: Dict[str, Any], model: str) -> Dict[str, Any]:
+        """階層ごとのレイテンシ・利用量（1 回で生成する場合との比較用）"""
+        return {
+            "model": model,
+            "latency_ms": search_result.get("latency_ms"),
+            "usage": search_result.get("usage"),
+            "cost_usd": search_result.get("cost_usd"),
+            "num_turns": search_result.get("num_turns"),
+        }
+
+    def _research(self, start: date, end: date, topic: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        調査フェーズ: 期間内の出典・抜粋・日付を候補のリスト（構造化データ）として収集
+
+        2 階層モードでは高速・低コストの調査用モデルで実行する
+
+        Args:
+            start: 期間の開始日
+            end: 期間の終了日
+            topic: 重点的に調査するトピック（None の場合は複数のレポートで再利用できるよう網羅的に調査）
+            params: この実行の実行パラメータ
+        """
+        prompt = self.prompt_manager.get_prompt(
+            "research",
+            enabled_mcp_servers=self.enabled_mcp_servers,
+            research_period=f"{start.strftime('%Y年%m月%d日')}から{end.strftime('%Y年%m月%d日')}まで",
+            research_focus=f"「{topic}」に関連する情報を重点的に収集してください。" if topic else RESEARCH_FOCUS_ALL,
+        )
+        if not prompt:
+            raise RuntimeError("調査プロンプトの取得に失敗しました")
+
+        model = self.gather_model_name or self.model_name
+        logger.info(f"調査フェーズを開始... 期間: {start} ~ {end} (モデル: {model})")
+        search_result = self._generate(prompt, report_type="research", topic=topic, client=self.gather_client, tier="gather", params=params)
+        if search_result["status"] != "success":
+            raise RuntimeError(search_result["message"])
+        items = parse_research(search_result["content"])
+        return {
+            "model": model,
+            "run_id": search_result["run_id"],
+            "items": items,
+            "metrics": {**self._tier_metrics(search_result, model), "items": len(items)},
+        }
+
+    def _research_and_write(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        調査フェーズで収集した候補のリストから、執筆フェーズで重要な項目を選んでレポートを作成
+
+        RESEARCH_REUSE=true の場合は期間ごとにキャッシュした調査結果を再利用し、それ以外（2 階層モード）はレポートごとに
+        トピックを重点的に調査する。調査結果を作成できない場合は、従来どおり調査と執筆を 1 回の生成で行う
+        """
+        definition = REPORT_DEFINITIONS[item["mode"]]
+        topic = item.get("topic")
+        since = item.get("since")
+        start, end = (since.date(), date.today()) if since else report_window(definition["research_days"])
+        params = item.get("params")
+        try:
+            if settings.research_reuse:
+                artifact, reused = self.research_store.get_or_create(start, end, lambda: self._research(start, end, params=params), since)
             else:
-                logger.info("GitHub Issue作成をスキップしました")
-
-            return result
-
+                artifact, reused = self._research(start, end, topic, params), False
         except Exception as e:
-            logger.error(f"キャッチアップ実行中にエラー: {e}")
-            return {"status": "error", "message": str(e)}
-
-    def weekly_report(self, create_issue: bool = True) -> Dict[str, Any]:
-        """週次レポートを生成"""
-        logger.info("週次レポート生成を開始...")
-
-        try:
-            # プロンプトの準備
-            prompt = self.prompt_manager.get_prompt("weekly_report", enabled_mcp_servers=self.enabled_mcp_servers)
-            if not prompt:
-                logger.error("週次レポートプロンプトを取得できませんでした")
-                return {"status": "error", "message": "プロンプトの取得に失敗しました"}
-
-            # LLM モデル名でレポート生成
-            logger.info(f"入力プロンプト: {prompt}")
-            search_result = self.ai_client.send_message(prompt)
-
-            if search_result["status"] != "success":
-                return {"status": "error", "message": search_result["message"]}
-
-            result = {
-                "status": "success",
-                "content": search_result["content"],
-                "searched_at": search_result["searched_at"],
-            }
-
-            # GitHub Issue作成（オプション）
-            if create_issue:
-                # 週次レポートの調査期間を計算（前日まで）
-                today = datetime.now()
-                yesterday = today - timedelta(days=1)
-                week_ago = yesterday - timedelta(days=6)  # 前日から7日間
-                week_period = f"{week_ago.strftime('%Y-%m-%d')} ~ {yesterday.strftime('%Y-%m-%d')}"
-
-                # 週番号を計算（月の第何週目か）
-                week_number = (today.day - 1) // 7 + 1
-                week_title = f"{today.strftime('%Y年%m月')}第{week_number}週"
-                issue_body = f"""# 📊 AI Tech Catchup Weekly Report
-
-- レポート日時: `{datetime.now().strftime("%Y-%m-%d %H:%M")}`
-- 調査期間: `{week_period}`
-- 使用モデル: `{self.model_name}`
-
-> **💡 質疑応答について**
-> このレポート内容について質問したい場合は、コメントで `@claude` または `@gemini-cli` とメンションすると、AI が自動的に回答します。
-
----
-
-{search_result["content"]}
-
----
-
-*このレポートは AI Tech Catchup Agent によって自動生成されました。*
-"""
-                issue_result = self.github_client.create_issue(
-                    title=f"📊 AI Tech Catchup Weekly Report - {week_title}",
-                    body=issue_body,
-                    labels=["weekly-report", self.model_name],
+            logger.warning(f"調査結果を作成できないため、調査と執筆を一括で行います: {e}")
+            return self._generate(item["prompt"], definition["prompt_type"], topic, params=params)
+
+        items = ResearchStore.select_items(artifact, start, end, topic)
+        variables = item.get("variables", {})
+        prompt = self.prompt_manager.get_prompt(
+            "write_report",
+            report_title=self.prompt_manager.get_prompt_info(definition["prompt_type"]).get("title", ""),
+            language=settings.report_language,
+            research_period=f"{start.isoformat()} ~ {end.isoformat()}",
+            topic_filter=topic or "指定なし",
+            report_format=self.prompt_manager.get_report_format(definition["prompt_type"], **variables) or "",
+            research_items=json.dumps(items, ensure_ascii=False, indent=1),
+        )
+        if not prompt:
+            return {"status": "error", "message": "執筆プロンプトの取得に失敗しました"}
+
+        logger.info(f"執筆フェーズを開始... 調査項目: {len(items)} 件 (再利用: {reused}, モデル: {self.model_name})")
+        search_result = self._generate(prompt, report_type=definition["prompt_type"], topic=topic, tier="write", params=params)
+        search_result["research"] = {"window": f"{start.isoformat()} ~ {end.isoformat()}", "reused": reused, "items": len(items)}
+
+        # 階層ごとのレイテンシ・利用量（再利用した調査結果の場合、調査フェーズの値は作成時のもの）
+        tiers = {"gather": {**artifact.get("metrics", {}), "reused": reused}, "write": self._tier_metrics(search_result, self.model_name)}
+        search_result["tiers"] = tiers
+        summary = ", ".join(
+            f"{name}={metrics.get('model')} ({(metrics.get('latency_ms') or 0) / 1000:.1f} 秒, "
+            f"{sum((metrics.get('usage') or {}).values())} トークン, ${metrics.get('cost_usd') or 0:.4f})"
+            for name, metrics in tiers.items()
+        )
+        logger.info(f"階層別の実行結果: {summary}")
+        return search_result
+
+    def _build_pipeline(self, generate_concurrency: Optional[int] = None) -> ReportPipeline:
+        """
+        レンダリング・生成・リンク検証・後処理・配信のステージからなるレポートパイプラインを構築
+
+        Args:
+            generate_concurrency: generate ステージの同時実行数（None の場合は設定値）
+        """
+        return ReportPipeline(
+            [
+                PipelineStage("render", self._render_stage),
+                PipelineStage("generate", self._generate_stage, concurrency=max(1, generate_concurrency or settings.pipeline_generate_concurrency)),
+                PipelineStage("validate_links", self._validate_links_stage),
+                PipelineStage("post_process", self._post_process_stage),
+                PipelineStage("publish", self._publish_stage),
+            ],
+            queue_size=settings.pipeline_queue_size,
+        )
+
+    async def _render_stage(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """プロンプトをレンダリング"""
+        definition = REPORT_DEFINITIONS[item["mode"]]
+        logger.info(f"{definition['name']}生成を開始...{' トピック: ' + item['topic'] if item.get('topic') else ''}")
+
+        item["started_at"] = datetime.now()
+        # 同じ期間の同じレポートが作成済み・実行中の場合は生成しない（--force で無効化）
+        if item["create_issue"] and settings.run_guard and not item.get("force"):
+            await asyncio.to_thread(self._guard_run, item)
+            if item.get("skipped") or item.get("error") or item.get("deferred"):
+                return item
+
+        variables: Dict[str, Any] = {}
+        if definition["incremental"]:
+            # 前回成功したレポート以降を調査期間にする（未記録の場合は過去24時間）
+            item["since"] = self.watermarks.get(definition["report_type"], item.get("topic"))
+            variables["since"] = item["since"]
+        if definition["pass_news_count"]:
+            variables["news_count"] = str(item.get("news_count") or settings.news_count)
+        if item.get("topic"):
+            variables["topic"] = item["topic"]
+
+        prompt = self.prompt_manager.get_prompt(definition["prompt_type"], enabled_mcp_servers=self.enabled_mcp_servers, **variables)
+        if not prompt:
+            logger.error(f"{definition['name']}プロンプトを取得できませんでした")
+            item["error"] = "プロンプトの取得に失敗しました"
+            return item
+
+        logger.info(f"入力プロンプト: {summarize_payload(prompt)}")
+        item["prompt"] = prompt
+        item["variables"] = variables
+        return item
+
+    def _guard_run(self, item: Dict[str, Any]) -> None:
+        """
+        実行キーのロックを取得し、同じレポートが作成済みの場合はスキップにする
+
+        他のプロセスが同じレポートを実行中の場合、通常は後回し（deferred）にして他のレポートの処理を止めず、
+        後回しにしたレポートの再実行時（attach）にその実行の完了を待ってから作成済みかを確認する
+        """
+        definition = REPORT_DEFINITIONS[item["mode"]]
+        key = run_key(definition["report_type"], run_period(definition, item["started_at"]), item.get("topic"))
+        if item.get("attach"):
+            run_lock = self.run_guard.lock(key, timeout=settings.run_attach_timeout)
+        else:
+            run_lock = self.run_guard.try_lock(key)
+            if run_lock is None:
+                logger.info(f"同じレポートを他のプロセスが実行中のため後回しにします: {key}")
+                item["deferred"] = True
+                return
+        if run_lock is None:
+            item["error"] = f"実行中の同じレポートの完了待ちがタイムアウトしました: {key}"
+            return
+
+        record = self.run_guard.find(key)
+        issue_url = record.get("issue_url") if record else None
+        if record is None:
+            try:
+                issue_url = self.issue_lookup.find(
+                    self.github_client, definition["label"], issue_title(definition, item.get("topic"), item["started_at"])
                 )
-                if issue_result.get("html_url"):
-                    result["issue_url"] = issue_result.get("html_url", "")
+            except Exception as e:
+                logger.warning(f"既存の Issue の検索に失敗しました（レポートを生成します）: {e}")
+        if record is None and issue_url is None:
+            item["run_key"] = key
+            item["run_lock"] = run_lock
+            return
+
+        run_lock.release()
+        logger.info(f"既存のレポートがあるため生成をスキップします: {key} ({issue_url})")
+        item["skipped"] = True
+        item["result"] = {"status": "success", "skipped": True, "issue_url": issue_url, "message": "既存のレポートがあるため生成をスキップしました"}
+
+    @staticmethod
+    def _release_runs(items: List[Dict[str, Any]]) -> None:
+        """配信まで進まなかったレポートの実行キーのロックを解放"""
+        for item in items:
+            run_lock = item.pop("run_lock", None)
+            if run_lock is not None:
+                run_lock.release()
+
+    async def _generate_stage(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM でレポートを生成"""
+        definition = REPORT_DEFINITIONS[item["mode"]]
+        started = time.perf_counter()
+        # レート制限の待ち行列ではレポートタイプの優先度（日次レポートをトピック別レポートより優先）で許可する
+        with rate_limit_priority(definition["report_type"]):
+            if (settings.research_reuse or self.gather_client is not None) and definition["research_days"]:
+                search_result = await asyncio.to_thread(self._research_and_write, item)
             else:
-                logger.info("GitHub Issue作成をスキップしました")
-
-            return result
-
-        except Exception as e:
-            logger.error(f"週次レポート生成中にエラー: {e}")
-            return {"status": "error", "message": str(e)}
-
-    def monthly_report(self, create_issue: bool = True) -> Dict[str, Any]:
-        """月次レポートを生成"""
-        logger.info("月次レポート生成を開始...")
-
-        try:
-            # プロンプトの準備
-            prompt = self.prompt_manager.get_prompt("monthly_report", enabled_mcp_servers=self.enabled_mcp_servers)
-            if not prompt:
-                logger.error("月次レポートプロンプトを取得できませんでした")
-                return {"status": "error", "message": "プロンプトの取得に失敗しました"}
-
-            # LLM モデル名でレポート生成
-            logger.info(f"入力プロンプト: {prompt}")
-            search_result = self.ai_client.send_message(prompt)
+                search_result = await asyncio.to_thread(
+                    self._generate, item["prompt"], definition["prompt_type"], item.get("topic"), params=item.get("params")
+                )
 
-            if search_result["status"] != "success":
-                return {"status": "error", "message": search_result["message"]}
-
-            result = {
-                "status": "success",
-                "content": search_result["content"],
-                "searched_at": search_result["searched_at"],
-            }
-
-            # GitHub Issue作成（オプション）
-            if create_issue:
-                # 月次レポートの調査期間を計算（前日まで）
-                today = datetime.now()
-                yesterday = today - timedelta(days=1)
-                month_ago = yesterday - timedelta(days=29)  # 前日から30日間
-                month_period = f"{month_ago.strftime('%Y-%m-%d')} ~ {yesterday.strftime('%Y-%m-%d')}"
-                issue_body = f"""# 📈 AI Tech Catchup Monthly Report
-
-- レポート日時: `{datetime.now().strftime("%Y-%m-%d %H:%M")}`
-- 調査期間: `{month_period}`
-- 使用モデル: `{self.model_name}`
+        # 実行履歴に記録する生成の統計（実行パラメータの自動調整に使用）
+        usage = search_result.get("usage") or {}
+        tool_calls = (search_result.get("turn_budget") or {}).get("tool_calls")
+        item["stats"] = {
+            "generate_seconds": round(time.perf_counter() - started, 1),
+            "output_tokens": usage.get("output_tokens"),
+            "total_tokens": sum(usage.values()) if usage else None,
+            "num_turns": search_result.get("num_turns"),
+            "tool_calls": sum(tool_calls.values()) if tool_calls is not None else None,
+        }
+        if search_result["status"] != "success":
+            logger.error(f"LLM 検索エラー: {search_result['message']}")
+            item["error"] = search_result["message"]
+            return item
+
+        item["result"] = {
+            "status": "success",
+            "content": search_result["content"],
+            "searched_at": search_result["searched_at"],
+            "run_id": search_result["run_id"],
+        }
+        for key in ("research", "tiers"):
+            if key in search_result:
+                item["result"][key] = search_result[key]
+        return item
+
+    async def _validate_links_stage(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """生成したレポートのリンクを並行して検証し、リンク切れを注記または除外"""
+        if settings.link_validation not in ("annotate", "drop"):
+            return item
+
+        urls = extract_links(item["result"]["content"])
+        if not urls:
+            return item
+
+        results = await self.link_validator.validate(urls)
+        content, broken = apply_link_results(item["result"]["content"], results, action=settings.link_validation)
+        if broken:
+            logger.warning(f"リンク切れの可能性があるリンク ({settings.link_validation}): {broken}")
+        item["result"]["content"] = content
+        item["result"]["link_check"] = {"checked": len(results), "broken": broken}
+        return item
+
+    async def _post_process_stage(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """生成結果から Issue のタイトル・本文・ラベルを作成"""
+        if not item["create_issue"]:
+            return item
+
+        definition = REPORT_DEFINITIONS[item["mode"]]
+        now = datetime.now()
+        topic = item.get("topic") or ""
+        header = [f"- レポート日時: `{now.strftime('%Y-%m-%d %H:%M')}`"]
+        if definition["period_days"]:
+            header.append(f"- 調査期間: `{report_period(definition['period_days'], now)}`")
+        header.append(f"- 使用モデル: `{self.model_name}`")
+        if topic:
+            header.append(f"- トピック: `{topic}`")
+
+        header_text = "\n".join(header)
+        # タイトルの期間は実行キーと同じく生成を開始した時刻から決める
+        item["issue"] = {
+            "title": issue_title(definition, topic, item["started_at"]),
+            "body": f"""{definition["heading"].format(topic=topic)}
+
+{header_text}
 
 > **💡 質疑応答について**
 > このレポート内容について質問したい場合は、コメントで `@claude` または `@gemini-cli` とメンションすると、AI が自動的に回答します。
 
 ---
 
-{search_result["content"]}
+{item["result"]["content"]}
 
 ---
 
 *このレポートは AI Tech Catchup Agent によって自動生成されました。*
-"""
-                issue_result = self.github_client.create_issue(
-                    title=f"📈 AI Tech Catchup Monthly Report - {datetime.now().strftime('%Y年%m月')}",
-                    body=issue_body,
-                    labels=["monthly-report", self.model_name],
+""",
+            "labels": [definition["label"], self.model_name],
+        }
+        return item
+
+    async def _publish_stage(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """生成済みレポートを全ての出力先へ配信"""
+        if "issue" not in item:
+            logger.info("GitHub Issue作成をスキップしました")
+            return item
+
+        logger.info("GitHub Issueを作成中...")
+        report = {
+            "report_type": REPORT_DEFINITIONS[item["mode"]]["report_type"],
+            **item["issue"],
+            "content": item["result"]["content"],
+            "model": self.model_name,
+            "topic": item.get("topic"),
+            "created_at": datetime.now().isoformat(),
+        }
+        with rate_limit_priority(report["report_type"]):
+            publish_result = await self.publisher.publish_async(report)
+        if publish_result["status"] == "error":
+            logger.error(f"Issue作成エラー: {publish_result['message']}")
+            item["error"] = publish_result["message"]
+            return item
+        if publish_result["status"] == "partial":
+            logger.warning(f"一部の出力先への配信に失敗しました: {publish_result.get('message', '')}")
+
+        if publish_result.get("issue_url"):
+            logger.info(f"レポートIssueを作成しました: {publish_result['issue_url']}")
+            item["result"]["issue_url"] = publish_result["issue_url"]
+
+        # 配信したレポートを検索インデックスに追加（Q&A で過去のレポートから関連する部分のみを参照するため）
+        if self.report_index is not None:
+            try:
+                await asyncio.to_thread(
+                    self.report_index.add,
+                    publish_result.get("issue_url") or f"{report['report_type']}:{report.get('topic') or ''}:{report['created_at']}",
+                    report["title"],
+                    report["content"],
+                    {
+                        "url": publish_result.get("issue_url"),
+                        "report_type": report["report_type"],
+                        "topic": report.get("topic"),
+                        "created_at": report["created_at"],
+                    },
                 )
-                if issue_result.get("html_url"):
-                    result["issue_url"] = issue_result.get("html_url", "")
-            else:
-                logger.info("GitHub Issue作成をスキップしました")
-
-            return result
-
-        except Exception as e:
-            logger.error(f"月次レポート生成中にエラー: {e}")
-            return {"status": "error", "message": str(e)}
-
-    def topic_report(self, topic: str, create_issue: bool = True, news_count: Optional[int] = None) -> Dict[str, Any]:
-        """特定トピックのレポートを生成"""
-        logger.info(f"トピックレポート生成を開始... トピック: {topic}")
+            except Exception as e:
+                logger.warning(f"レポート検索インデックスへの追加に失敗: {e}")
+
+        # 配信まで成功した場合のみウォーターマークを進める（Issue を作成しない試行では進めない）
+        if REPORT_DEFINITIONS[item["mode"]]["incremental"]:
+            self.watermarks.update(REPORT_DEFINITIONS[item["mode"]]["report_type"], item.get("topic"), item["started_at"])
+
+        # 実行キーの完了を記録してからロックを解放（完了を待っている同じレポートの実行はスキップになる）
+        if item.get("run_key"):
+            self.run_guard.complete(item["run_key"], item["result"])
+            if publish_result.get("issue_url"):
+                self.issue_lookup.add(REPORT_DEFINITIONS[item["mode"]]["label"], report["title"], publish_result["issue_url"])
+        self._release_runs([item])
+        return item
+
+    def recommend_params(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        実行履歴から、レポート要求をまとめて目標の実行時間（RUN_TARGET_SECONDS）内に生成できる実行パラメータを推奨
+
+        レポートタイプごとの推奨値のうち、タイムアウト・最大出力トークン数・同時実行数の最大値を使用する
+        """
+        counts = Counter(REPORT_DEFINITIONS[item["mode"]]["prompt_type"] for item in items if not item.get("error"))
+        recommendations = [
+            self.run_history.recommend(report_type, self.model_name, settings.run_target_seconds, self.configured_params, items=count)
+            for report_type, count in counts.items()
+        ]
+        if not recommendations:
+            return dict(self.configured_params)
+
+        params: Dict[str, Any] = {"generate_concurrency": max(r["generate_concurrency"] for r in recommendations)}
+        for name in ("generate_timeout", "max_tokens"):
+            values = [r[name] for r in recommendations if r[name] is not None]
+            params[name] = max(values) if values else None
+        return params
+
+    def _record_history(self, items: List[Dict[str, Any]], run_seconds: float) -> None:
+        """生成まで進んだレポートの実行結果を実行履歴に記録（作成済みでスキップしたレポートは除く）"""
+        for item in items:
+            if "stats" not in item:
+                continue
+            self.run_history.record(
+                {
+                    "report_type": REPORT_DEFINITIONS[item["mode"]]["prompt_type"],
+                    "model": self.model_name,
+                    "topic": item.get("topic"),
+                    "status": "error" if item.get("error") else "success",
+                    "failed_stage": item.get("failed_stage"),
+                    **item["stats"],
+                    "items": len(items),
+                    "run_seconds": run_seconds,
+                }
+            )
 
+    @staticmethod
+    def _build_items(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """レポート要求からパイプラインのアイテムを作成"""
+        items: List[Dict[str, Any]] = []
+        for request in requests:
+            mode = request.get("mode") or "report"
+            if mode not in REPORT_DEFINITIONS:
+                mode = "report"
+            items.append(
+                {
+                    "mode": mode,
+                    "topic": request.get("topic"),
+                    "news_count": request.get("news_count"),
+                    "create_issue": request.get("create_issue", True),
+                    "force": request.get("force", False),
+                }
+            )
+            if mode == "topic" and not request.get("topic"):
+                items[-1]["error"] = "トピックモードではトピック名の指定が必要です"
+        return items
+
+    def run_reports(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        複数のレポートをパイプラインで生成（レポート N の後処理・配信とレポート N+1 の生成を並行して実行）
+
+        Args:
+            requests: mode, topic, news_count, create_issue, force（作成済みのレポートも再生成する）を含むレポート要求のリスト
+
+        Returns:
+            要求と同じ順序の実行結果のリスト
+        """
+        items = self._build_items(requests)
+        params = self.configured_params
+        if settings.run_tuning == "auto":
+            params = self.recommend_params(items)
+            logger.info(f"実行履歴から実行パラメータを自動調整しました: {params} (設定値: {self.configured_params})")
+        # 実行パラメータは実行ごとのパイプラインとアイテムで渡す（serve・daemon モードで Agent を共有する他の実行に影響させない）
+        pipeline = self._build_pipeline(params["generate_concurrency"])
+        for item in items:
+            item["params"] = params
+        started = time.perf_counter()
         try:
-            # プロンプトの準備
-            prompt = self.prompt_manager.get_prompt(
-                "topic_report",
-                enabled_mcp_servers=self.enabled_mcp_servers,
-                topic=topic,
-                news_count=str(news_count or settings.news_count),
+            processed = pipeline.run(items)
+            # 他のプロセスが実行中だったレポートは、他のレポートを処理し終えてからその完了を待って処理
+            deferred = [index for index, item in enumerate(processed) if item.pop("deferred", False)]
+            if deferred:
+                for index in deferred:
+                    processed[index]["attach"] = True
+                for index, item in zip(deferred, pipeline.run([processed[index] for index in deferred])):
+                    processed[index] = item
+        except Exception as e:
+            logger.error(f"レポート生成中にエラー: {e}")
+            return [{"status": "error", "message": str(e)} for _ in items]
+        finally:
+            self._release_runs(items)
+        self._record_history(processed, round(time.perf_counter() - started, 3))
+
+        results = []
+        for item in processed:
+            if item.get("error"):
+                results.append({"status": "error", "message": item["error"]})
+            else:
+                results.append(item["result"])
+        return results
+
+    def _submit_batch(self, client: ClaudeClient, key: str, items: List[Dict[str, Any]], params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """プロンプトをレンダリングして Message Batch を送信し、ジョブとして保存（全てのレポートが作成済みの場合は None）"""
+        pending = {f"item-{index}": item for index, item in enumerate(items) if not item.get("error")}
+
+        async def render_all() -> None:
+            for item in pending.values():
+                # バッチはパイプラインで並行して処理しないため、他のプロセスが実行中の同じレポートは後回しにせずに完了を待つ
+                item["attach"] = True
+                await self._render_stage(item)
+
+        asyncio.run(render_all())
+        rendered = {custom_id: item for custom_id, item in pending.items() if not item.get("error") and not item.get("skipped")}
+        if not rendered:
+            if any(item.get("skipped") for item in pending.values()):
+                return None
+            raise RuntimeError("バッチで送信するプロンプトがありません")
+        batch_id = client.submit_batch(
+            {custom_id: item["prompt"] for custom_id, item in rendered.items()},
+            {custom_id: REPORT_DEFINITIONS[item["mode"]]["prompt_type"] for custom_id, item in rendered.items()},
+            max_tokens=params["max_tokens"],
+        )
+        return self.batch_store.create(key, batch_id, self.model_name, rendered)
+
+    async def _publish_batch_results(self, client: ClaudeClient, key: str, job: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """バッチの結果を読み込んだものから順に、生成より後のステージ（リンク検証・後処理・配信）で処理"""
+        results: Dict[str, Dict[str, Any]] = dict(job["results"])
+        stages = [stage for stage in self.pipeline.stages if stage.name not in BATCH_REPLACED_STAGES]
+        entries = client.iter_batch_results(job["batch_id"])
+        while True:
+            entry = await asyncio.to_thread(next, entries, None)
+            if entry is None:
+                break
+            custom_id, search_result = entry
+            # 再開時は配信済みのレポートを再度配信しない
+            if custom_id in results or custom_id not in job["items"]:
+                continue
+
+            request = job["items"][custom_id]
+            search_result["run_id"] = uuid.uuid4().hex[:12]
+            self._record_usage(
+                search_result, REPORT_DEFINITIONS[request["mode"]]["prompt_type"], request.get("topic"), f"{ClaudeClient.__name__}:batch"
             )
-            if not prompt:
-                logger.error("トピックレポートプロンプトを取得できませんでした")
-                return {"status": "error", "message": "プロンプトの取得に失敗しました"}
-
-            # LLM モデル名でレポート生成
-            logger.info(f"入力プロンプト: {prompt}")
-            search_result = self.ai_client.send_message(prompt)
-
+            item: Dict[str, Any] = {**request, "started_at": datetime.fromisoformat(request["started_at"])}
             if search_result["status"] != "success":
-                return {"status": "error", "message": search_result["message"]}
-
-            result = {
-                "status": "success",
-                "content": search_result["content"],
-                "searched_at": search_result["searched_at"],
-            }
-
-            # GitHub Issue作成（オプション）
-            if create_issue:
-                issue_body = f"""# 🎯 AI Tech Catchup Topic Report: {topic}
-
-- レポート日時: `{datetime.now().strftime("%Y-%m-%d %H:%M")}`
-- 使用モデル: `{self.model_name}`
-- トピック: `{topic}`
-
-> **💡 質疑応答について**
-> このレポート内容について質問したい場合は、コメントで `@claude` または `@gemini-cli` とメンションすると、AI が自動的に回答します。
-
----
+                logger.error(f"バッチの生成エラー ({custom_id}): {search_result['message']}")
+                item["error"] = search_result["message"]
+            else:
+                item["result"] = {name: search_result[name] for name in ("status", "content", "searched_at", "run_id")}
+            for stage in stages:
+                if item.get("error"):
+                    break
+                try:
+                    item = await stage.handler(item)
+                except Exception as e:
+                    logger.error(f"バッチの結果の処理中にエラー ({stage.name}): {e}")
+                    item["error"] = str(e)
+                mark_boundary(f"{stage.name}#{custom_id}")
+
+            results[custom_id] = {"status": "error", "message": item["error"]} if item.get("error") else item["result"]
+            self.batch_store.save_result(key, custom_id, results[custom_id])
+        return results
+
+    def run_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Message Batches API で複数のレポートをまとめて生成し、読み込んだ結果から順にリンク検証・後処理・配信
+
+        対話的な応答時間が不要な大量のトピック別レポート向け。ジョブの状態を保存し、同じ要求で再実行した場合は
+        送信済みのバッチを再開して、配信済みのレポートは再度配信しない
+
+        Args:
+            requests: run_reports と同じ形式のレポート要求のリスト
+
+        Returns:
+            要求と同じ順序の実行結果のリスト
+        """
+        if "claude" not in self.model_name.lower():
+            message = f"バッチモードは Claude モデルでのみ使用できます: {self.model_name}"
+            logger.error(message)
+            return [{"status": "error", "message": message} for _ in requests]
+
+        items = self._build_items(requests)
+        key = batch_key(self.model_name, items)
+        if isinstance(self.ai_client, ClaudeClient):
+            client = self.ai_client
+        else:
+            client = ClaudeClient(anthropic_api_key=settings.anthropic_api_key, model_name=self.model_name, max_tokens=self.max_tokens)
+        try:
+            job = self.batch_store.find(key)
+            if job:
+                logger.info(f"実行中のバッチを再開します: {job['batch_id']} (配信済み: {len(job['results'])}/{len(job['items'])} 件)")
+            else:
+                params = self.configured_params
+                if settings.run_tuning == "auto":
+                    params = self.recommend_params(items)
+                    logger.info(f"実行履歴から最大出力トークン数を自動調整しました: {params['max_tokens']} (設定値: {self.configured_params['max_tokens']})")
+                job = self._submit_batch(client, key, items, params)
+            results: Dict[str, Dict[str, Any]] = {}
+            if job:
+                client.wait_batch(job["batch_id"], poll_interval=settings.batch_poll_interval, max_poll_interval=settings.batch_poll_max_interval)
+                results = asyncio.run(self._publish_batch_results(client, key, job))
+        except Exception as e:
+            logger.error(f"バッチ生成中にエラー: {e}")
+            return [{"status": "error", "message": str(e)} for _ in items]
+        finally:
+            self._release_runs(items)
+
+        self.batch_store.complete(key)
+        missing = {"status": "error", "message": "バッチの結果がありません"}
+        outcomes = []
+        for index, item in enumerate(items):
+            if item.get("error"):
+                outcomes.append({"status": "error", "message": item["error"]})
+            elif item.get("skipped"):
+                outcomes.append(item["result"])
+            else:
+                outcomes.append(results.get(f"item-{index}", missing))
+        return outcomes
 
-{search_result["content"]}
+    def run_report(
+        self,
+        mode: Optional[str] = None,
+        topic: Optional[str] = None,
+        news_count: Optional[int] = None,
+        create_issue: bool = True,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        レポートモードに応じたレポートを生成
+
+        Args:
+            mode: レポートモード（weekly, monthly, topic, test。None または report: 最新）
+            topic: トピック名（topic モードで必須）
+            news_count: 重要ニュースの件数
+            create_issue: GitHub Issue を作成するか
+            force: 同じ期間のレポートが作成済み・実行中でも生成するか
+        """
+        return self.run_reports([{"mode": mode, "topic": topic, "news_count": news_count, "create_issue": create_issue, "force": force}])[0]
 
----
+    def run_catchup(
+        self,
+        create_issue: bool = True,
+        news_count: Optional[int] = None,
+        test_mode: bool = False,
+    ) -> Dict[str, Any]:
+        """Claude Codeで最新AI情報をキャッチアップ"""
+        return self.run_report(mode="test" if test_mode else "report", news_count=news_count, create_issue=create_issue)
 
-*このレポートは AI Tech Catchup Agent によって自動生成されました。*
-"""
-                issue_result = self.github_client.create_issue(
-                    title=f"🎯 AI Tech Catchup Topic Report: {topic} - {datetime.now().strftime('%Y-%m-%d')}",
-                    body=issue_body,
-                    labels=["topic-report", self.model_name],
-                )
-                if issue_result.get("html_url"):
-                    result["issue_url"] = issue_result.get("html_url", "")
-            else:
-                logger.info("GitHub Issue作成をスキップしました")
+    def weekly_report(self, create_issue: bool = True) -> Dict[str, Any]:
+        """週次レポートを生成"""
+        return self.run_report(mode="weekly", create_issue=create_issue)
 
-            return result
+    def monthly_report(self, create_issue: bool = True) -> Dict[str, Any]:
+        """月次レポートを生成"""
+        return self.run_report(mode="monthly", create_issue=create_issue)
 
-        except Exception as e:
-            logger.error(f"トピックレポート生成中にエラー: {e}")
-            return {"status": "error", "message": str(e)}
+    def topic_report(self, topic: str, create_issue: bool = True, news_count: Optional[int] = None) -> Dict[str, Any]:
+        """特定トピックのレポートを生成"""
+        return self.run_report(mode="topic", topic=topic, news_count=news_count, create_issue=create_issue)
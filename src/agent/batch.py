@@ -0,0 +1,91 @@
+"""
+バッチジョブモジュール - Message Batches API で送信したレポート生成のジョブ状態を保存し、再起動したプロセスで実行中のバッチを再開
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..utils.json_store import JSONStore
+
+logger = logging.getLogger(__name__)
+
+# ジョブに保存するレポート要求のキー
+JOB_ITEM_KEYS = ("mode", "topic", "news_count", "create_issue", "run_key")
+# ジョブに保存する配信結果のキー
+JOB_RESULT_KEYS = ("status", "message", "issue_url", "run_id", "searched_at")
+
+
+def batch_key(model: str, items: List[Dict[str, Any]]) -> str:
+    """モデルとレポート要求の一覧から、同じ一括生成を識別するキーを作成（同じ引数で再実行した場合に実行中のバッチを再開するため）"""
+    requests = [[item["mode"], (item.get("topic") or "").strip().lower(), item.get("news_count"), item.get("create_issue", True)] for item in items]
+    return hashlib.sha256(json.dumps([model, requests], ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+class BatchJobStore:
+    """バッチジョブの状態（JSON ファイル。キーごとにバッチ ID・レポート要求・配信済みの結果を保存）"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: ジョブの状態を保存する JSON ファイルのパス（STATE_DIR/batches.json）
+        """
+        self.path = Path(path)
+        self._store = JSONStore(path, "バッチジョブ")
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """実行中（全ての結果を配信し終えていない）のジョブを取得"""
+        job: Optional[Dict[str, Any]] = self._store.read().get(key)
+        return job if job and not job.get("completed_at") else None
+
+    def create(self, key: str, batch_id: str, model: str, items: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        送信したバッチをジョブとして保存
+
+        Args:
+            key: 一括生成のキー（batch_key）
+            batch_id: Message Batch の ID
+            model: モデル名
+            items: custom_id ごとのレポート要求（mode, topic, news_count, create_issue, run_key, started_at）
+        """
+        job = {
+            "batch_id": batch_id,
+            "model": model,
+            "submitted_at": datetime.now().isoformat(timespec="seconds"),
+            "items": {
+                custom_id: {
+                    **{k: item.get(k) for k in JOB_ITEM_KEYS},
+                    "started_at": item["started_at"].isoformat(timespec="seconds"),
+                }
+                for custom_id, item in items.items()
+            },
+            "results": {},
+        }
+
+        def apply(data: Dict[str, Any]) -> None:
+            data[key] = job
+
+        self._store.update(apply)
+        logger.info(f"バッチジョブを保存しました: {key} (batch_id={batch_id})")
+        return job
+
+    def save_result(self, key: str, custom_id: str, result: Dict[str, Any]) -> None:
+        """配信まで終えたレポートの結果を保存（再開時に同じレポートを再度配信しないため）"""
+
+        def apply(data: Dict[str, Any]) -> None:
+            if key in data:
+                data[key]["results"][custom_id] = {k: result[k] for k in JOB_RESULT_KEYS if k in result}
+
+        self._store.update(apply)
+
+    def complete(self, key: str) -> None:
+        """全ての結果を配信し終えたジョブを完了にする"""
+
+        def apply(data: Dict[str, Any]) -> None:
+            if key in data:
+                data[key]["completed_at"] = datetime.now().isoformat(timespec="seconds")
+
+        self._store.update(apply)
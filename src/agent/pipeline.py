@@ -0,0 +1,155 @@
+"""
+レポートパイプラインモジュール - 上限付き非同期キューで接続したステージによるレポート生成
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from ..utils.profiler import mark_boundary
+
+logger = logging.getLogger(__name__)
+
+StageHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class PipelineStage:
+    """パイプラインのステージ"""
+
+    def __init__(self, name: str, handler: StageHandler, concurrency: int = 1):
+        """
+        Args:
+            name: ステージ名（render, generate, post_process, publish など）
+            handler: アイテムを受け取り、処理後のアイテムを返す非同期関数。失敗時は例外を送出するか error を設定する
+            concurrency: ステージ内で同時に処理するアイテム数
+        """
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+
+
+class StageMetrics:
+    """ステージごとの処理量と入力キュー深さ（待ち件数）の計測値"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+
+    def sample_queue_depth(self, depth: int) -> None:
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    def to_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "throughput_per_min": round(self.processed / wall_seconds * 60, 3) if wall_seconds > 0 else 0.0,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_queue_depth": round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0.0,
+        }
+
+
+class ReportPipeline:
+    """
+    レポートパイプラインクラス
+
+    各ステージを上限付きの非同期キューで接続し、複数レポートの実行時には、レポート N の後処理・配信と
+    レポート N+1 の生成を並行して進める。error、skipped（作成済みのレポート）または deferred（後回しにするレポート）が設定されたアイテムは
+    以降のステージを素通りする
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 2):
+        """
+        Args:
+            stages: 実行順のステージのリスト
+            queue_size: ステージ間キューの最大長（前段が先行しすぎないように制限）
+        """
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.last_metrics: Dict[str, Any] = {}
+
+    async def _stage_worker(
+        self,
+        stage: PipelineStage,
+        metrics: StageMetrics,
+        inbox: "asyncio.Queue[Dict[str, Any]]",
+        outbox: "asyncio.Queue[Dict[str, Any]]",
+    ) -> None:
+        while True:
+            metrics.sample_queue_depth(inbox.qsize())
+            item = await inbox.get()
+            if not item.get("error") and not item.get("skipped") and not item.get("deferred"):
+                started = time.perf_counter()
+                try:
+                    item = await stage.handler(item)
+                except Exception as e:
+                    logger.error(f"パイプラインのステージでエラー ({stage.name}): {e}")
+                    item["error"] = str(e)
+                metrics.busy_seconds += time.perf_counter() - started
+                mark_boundary(f"{stage.name}#{item.get('_index')}")
+                metrics.processed += 1
+                if item.get("error"):
+                    metrics.failed += 1
+                    item.setdefault("failed_stage", stage.name)
+            await outbox.put(item)
+            inbox.task_done()
+
+    async def run_async(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        アイテムをパイプラインで処理
+
+        Args:
+            items: 処理するアイテム（レポートごとの辞書）のリスト
+
+        Returns:
+            入力と同じ順序の処理済みアイテムのリスト
+        """
+        started = time.perf_counter()
+        metrics = [StageMetrics(stage.name) for stage in self.stages]
+        queues: List["asyncio.Queue[Dict[str, Any]]"] = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        queues.append(asyncio.Queue())
+
+        workers = [
+            asyncio.create_task(self._stage_worker(stage, metrics[index], queues[index], queues[index + 1]))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.concurrency)
+        ]
+
+        async def produce() -> None:
+            for index, item in enumerate(items):
+                item["_index"] = index
+                await queues[0].put(item)
+
+        producer = asyncio.create_task(produce())
+        results: List[Dict[str, Any]] = []
+        try:
+            for _ in items:
+                results.append(await queues[-1].get())
+        finally:
+            producer.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(producer, *workers, return_exceptions=True)
+
+        wall_seconds = time.perf_counter() - started
+        self.last_metrics = {
+            "wall_seconds": round(wall_seconds, 3),
+            "items": len(items),
+            "stages": {stage_metrics.name: stage_metrics.to_dict(wall_seconds) for stage_metrics in metrics},
+        }
+        logger.info(f"パイプラインのメトリクス: {self.last_metrics}")
+
+        results.sort(key=lambda item: item.pop("_index"))
+        return results
+
+    def run(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """アイテムをパイプラインで処理（同期版）"""
+        return asyncio.run(self.run_async(items))
@@ -0,0 +1,165 @@
+"""
+調査結果モジュール - 調査フェーズの成果物（出典・抜粋・日付）を期間ごとにキャッシュして複数のレポートで再利用
+"""
+
+import json
+import logging
+import re
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JSON_BLOCK_PATTERN = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+
+
+def parse_research(text: str) -> List[Dict[str, Any]]:
+    """
+    調査フェーズの応答から調査項目のリストを取得
+
+    Raises:
+        ValueError: 応答に調査項目の JSON が含まれていない場合
+    """
+    match = JSON_BLOCK_PATTERN.search(text)
+    start, end = text.find("{"), text.rfind("}") + 1
+    candidate = match.group(1) if match else text[start:end]
+    try:
+        data = json.loads(candidate)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"調査結果の JSON を解析できません: {e}") from e
+
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise ValueError("調査結果に items がありません")
+    return [item for item in items if isinstance(item, dict) and item.get("url")]
+
+
+class ResearchStore:
+    """
+    期間（開始日〜終了日）をキーとする調査結果のキャッシュ
+
+    作成時点で終了していた期間（終了日より後に作成）の調査結果は期限なく再利用し、作成時点で終了していなかった期間
+    （今日までの期間など）の調査結果は max_age_hours 以内のもののみ再利用する
+    """
+
+    def __init__(self, directory: str, max_age_hours: float = 6):
+        """
+        Args:
+            directory: 調査結果を保存するディレクトリ（STATE_DIR/research）
+            max_age_hours: 作成時点で終了していなかった期間の調査結果を再利用する期間（時間）
+        """
+        self.directory = Path(directory)
+        self.max_age = timedelta(hours=max_age_hours)
+        self._lock = threading.Lock()
+        self._window_locks: Dict[str, threading.Lock] = {}
+
+    def _path(self, start: date, end: date) -> Path:
+        return self.directory / f"{start.isoformat()}_{end.isoformat()}.json"
+
+    def is_fresh(self, artifact: Dict[str, Any], end: date, since: Optional[datetime] = None, now: Optional[datetime] = None) -> bool:
+        """
+        調査結果が期間の終了日までの項目を含むとみなせるか
+
+        Args:
+            artifact: 調査結果
+            end: 要求する期間の終了日
+            since: 要求する期間の開始時刻（ウォーターマーク）。これより前に作成された調査結果は期間の項目を含まない
+            now: 現在時刻（テスト用）
+        """
+        try:
+            created_at = datetime.fromisoformat(artifact["created_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if since is not None and created_at < since:
+            return False
+        if created_at.date() > end:
+            return True
+        return (now or datetime.now()) - created_at <= self.max_age
+
+    def find(self, start: date, end: date, since: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """指定期間を含む再利用可能な（is_fresh）調査結果のうち、最も期間が短いものを取得"""
+        candidates: List[Tuple[int, Path]] = []
+        for path in self.directory.glob("*_*.json"):
+            try:
+                window_start, window_end = (date.fromisoformat(part) for part in path.stem.split("_", 1))
+            except ValueError:
+                continue
+            if window_start <= start and end <= window_end:
+                candidates.append(((window_end - window_start).days, path))
+        for _, path in sorted(candidates):
+            with open(path, "r", encoding="utf-8") as file:
+                artifact: Dict[str, Any] = json.load(file)
+            if self.is_fresh(artifact, end, since):
+                return artifact
+            logger.info(f"調査結果が古いため再利用しません: {path.stem} (作成: {artifact.get('created_at')})")
+        return None
+
+    def save(self, start: date, end: date, artifact: Dict[str, Any]) -> None:
+        """調査結果を保存"""
+        path = self._path(start, end)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(artifact, file, ensure_ascii=False, indent=2)
+        tmp_path.replace(path)
+
+    def get_or_create(
+        self, start: date, end: date, producer: Callable[[], Dict[str, Any]], since: Optional[datetime] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        期間を含む再利用可能な調査結果を取得し、なければ producer で作成して保存
+
+        同じ期間の調査が並行して要求された場合は、最初の 1 件のみが調査を行い、残りはその結果を再利用する
+
+        Args:
+            start: 期間の開始日
+            end: 期間の終了日
+            producer: 調査結果（items などを含む辞書）を作成する関数
+            since: 期間の開始時刻（ウォーターマーク。これより前に作成された調査結果は再利用しない）
+
+        Returns:
+            調査結果と、既存の調査結果を再利用したかどうか
+        """
+        key = f"{start.isoformat()}_{end.isoformat()}"
+        with self._lock:
+            window_lock = self._window_locks.setdefault(key, threading.Lock())
+
+        with window_lock:
+            artifact = self.find(start, end, since)
+            if artifact is not None:
+                logger.info(f"調査結果を再利用します: {artifact['window']['start']} ~ {artifact['window']['end']} ({len(artifact['items'])} 件)")
+                return artifact, True
+
+            artifact = {
+                "window": {"start": start.isoformat(), "end": end.isoformat()},
+                "created_at": datetime.now().isoformat(),
+                **producer(),
+            }
+            self.save(start, end, artifact)
+            logger.info(f"調査結果を保存しました: {key} ({len(artifact['items'])} 件)")
+            return artifact, False
+
+    @staticmethod
+    def select_items(artifact: Dict[str, Any], start: date, end: date, topic: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        調査結果から期間内（公開日が不明なものを含む）の項目を選択し、トピック指定時は関連する項目に絞り込む
+
+        トピックに一致する項目がない場合は、執筆フェーズで判断できるよう期間内の全項目を返す
+        """
+        items = []
+        for item in artifact.get("items", []):
+            try:
+                published = date.fromisoformat(str(item.get("published_at", ""))[:10])
+            except ValueError:
+                published = None
+            if published is None or start <= published <= end:
+                items.append(item)
+
+        if topic:
+            needle = topic.lower()
+            matched = [item for item in items if needle in json.dumps(item, ensure_ascii=False).lower()]
+            if matched:
+                return matched
+        return items
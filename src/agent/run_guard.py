@@ -0,0 +1,164 @@
+"""
+実行ガードモジュール - レポートタイプ・期間・トピックから決まる実行キーで、同じレポートの重複生成を防止
+
+定期実行と手動実行が重なった場合に、ローカルのロックと既存 Issue のキャッシュ付き検索で既存の実行を検出する
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import IO, Any, Dict, Optional
+
+from ..utils.json_store import JSONStore
+
+logger = logging.getLogger(__name__)
+
+# 既存 Issue の検索で取得する期間（日数。月次レポートの期間を含むように 1 か月強）
+ISSUE_LOOKUP_DAYS = 32
+# 実行中の同じレポートの完了を待つ間のロックの確認間隔（秒）
+ATTACH_POLL_INTERVAL = 5.0
+
+
+def run_key(report_type: str, period: str, topic: Optional[str] = None) -> str:
+    """レポートタイプ・期間（日付・週・月）・トピックから実行キーを作成"""
+    return f"{report_type}:{period}:{topic.strip().lower()}" if topic else f"{report_type}:{period}"
+
+
+class RunLock:
+    """実行キーごとのファイルロック（プロセスが終了した場合は OS により解放される）"""
+
+    def __init__(self, key: str, file: IO[str]):
+        self.key = key
+        self._file: Optional[IO[str]] = file
+
+    def release(self) -> None:
+        """ロックを解放（解放済みの場合は何もしない）"""
+        if self._file is None:
+            return
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+class RunGuard:
+    """実行キーごとのロックと完了した実行の記録（STATE_DIR/runs 以下）"""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: ロックファイルと完了した実行の記録（runs.json）を保存するディレクトリ
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / "runs.json"
+        self._store = JSONStore(str(self.path), "実行記録")
+
+    def _lock_path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.lock"
+
+    def try_lock(self, key: str) -> Optional[RunLock]:
+        """ロックを取得（他のプロセスが実行中の場合は None）"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file = open(self._lock_path(key), "w")
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return None
+        file.write(json.dumps({"key": key, "pid": os.getpid(), "started_at": datetime.now().isoformat(timespec="seconds")}))
+        file.flush()
+        return RunLock(key, file)
+
+    def lock(self, key: str, timeout: float) -> Optional[RunLock]:
+        """
+        ロックを取得（他のプロセスが実行中の場合は、その実行が終了するまで待機）
+
+        Args:
+            key: 実行キー
+            timeout: 待機する最大秒数
+
+        Returns:
+            取得したロック（タイムアウトした場合は None）
+        """
+        deadline = time.monotonic() + timeout
+        run_lock = self.try_lock(key)
+        if run_lock is None:
+            logger.info(f"実行中の同じレポートの完了を待機します: {key}")
+        while run_lock is None and time.monotonic() < deadline:
+            time.sleep(min(ATTACH_POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+            run_lock = self.try_lock(key)
+        return run_lock
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """完了した実行の記録を取得（未実行の場合は None）"""
+        record: Optional[Dict[str, Any]] = self._store.read().get(key)
+        return record
+
+    def complete(self, key: str, result: Dict[str, Any]) -> None:
+        """配信まで成功した実行を記録"""
+        record = {
+            "issue_url": result.get("issue_url"),
+            "run_id": result.get("run_id"),
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        def apply(data: Dict[str, Any]) -> None:
+            data[key] = record
+
+        self._store.update(apply)
+
+
+class IssueLookup:
+    """ラベルごとの既存 Issue（タイトル → URL）のキャッシュ（JSON ファイル）"""
+
+    def __init__(self, path: str, ttl: float = 600):
+        """
+        Args:
+            path: キャッシュを保存する JSON ファイルのパス
+            ttl: キャッシュの有効期間（秒）
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self._store = JSONStore(path, "Issue キャッシュ")
+
+    def find(self, github_client: Any, label: str, title: str) -> Optional[str]:
+        """
+        同じタイトルの既存 Issue の URL を取得（キャッシュが有効期間外の場合は GitHub から再取得）
+
+        Args:
+            github_client: GitHubClient
+            label: Issue のラベル
+            title: Issue のタイトル
+
+        Returns:
+            Issue の URL（存在しない場合は None）
+
+        Raises:
+            requests.RequestException: Issue 一覧の取得に失敗した場合
+        """
+        entry = self._store.read().get(label)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            url: Optional[str] = entry["issues"].get(title)
+            return url
+
+        since = (datetime.now() - timedelta(days=ISSUE_LOOKUP_DAYS)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        issues = {issue["title"]: issue["html_url"] for issue in github_client.list_issues(label=label, since=since)}
+
+        def apply(data: Dict[str, Any]) -> None:
+            data[label] = {"fetched_at": time.time(), "issues": issues}
+
+        self._store.update(apply)
+        return issues.get(title)
+
+    def add(self, label: str, title: str, url: str) -> None:
+        """作成した Issue をキャッシュに追加"""
+
+        def apply(data: Dict[str, Any]) -> None:
+            if label in data:
+                data[label]["issues"][title] = url
+
+        self._store.update(apply)
@@ -0,0 +1,199 @@
+"""
+シャーディングモジュール - トピックの一覧を複数のランナーへ決定的に割り当て、シャードごとの結果マニフェストを統合
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# マニフェストに記録する実行結果のキー
+MANIFEST_RESULT_KEYS = ("status", "message", "issue_url", "run_id", "searched_at", "cost_usd", "duration_ms")
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    "i/N" 形式のシャード指定を解析
+
+    Returns:
+        シャード番号（1 始まり）とシャード数
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/", 1))
+    except ValueError as e:
+        raise ValueError(f"シャードは i/N 形式で指定してください: {spec}") from e
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"シャード番号は 1 以上 {count} 以下で指定してください: {spec}")
+    return index, count
+
+
+def _normalize(topic: str) -> str:
+    return topic.strip().lower()
+
+
+def shard_of(topic: str, count: int) -> int:
+    """
+    トピックを割り当てるシャード番号（1 始まり）をランデブーハッシュで決定
+
+    実行環境やトピックの並び順に依存せず、シャード数が変わった場合も移動するトピックは約 1/N に抑えられる
+    """
+    key = _normalize(topic)
+    return max(range(1, count + 1), key=lambda shard: hashlib.sha256(f"{key}\0{shard}".encode("utf-8")).digest())
+
+
+def select_shard(topics: List[str], index: int, count: int) -> List[str]:
+    """トピックの一覧から指定シャードに割り当てられたトピックを元の順序で取得（重複は除外）"""
+    unique: Dict[str, str] = {}
+    for topic in topics:
+        if topic.strip():
+            unique.setdefault(_normalize(topic), topic.strip())
+    return [topic for topic in unique.values() if shard_of(topic, count) == index]
+
+
+def sweep_id(topics: List[str], count: int) -> str:
+    """トピックの一覧とシャード数から、同じ一括実行のシャードを識別する ID を作成"""
+    normalized = sorted({_normalize(topic) for topic in topics if topic.strip()})
+    return hashlib.sha256(json.dumps([normalized, count], ensure_ascii=False).encode("utf-8")).hexdigest()[:12]
+
+
+class ShardManifestStore:
+    """シャードごとの実行結果マニフェスト（JSON ファイル）"""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: マニフェストを保存するディレクトリ（他のランナーのマニフェストを集めて統合する場合も同じ構成）
+        """
+        self.directory = Path(directory)
+
+    def write(self, sweep: str, index: int, count: int, topics: List[str], results: List[Dict[str, Any]]) -> Path:
+        """
+        シャードの実行結果をマニフェストとして保存
+
+        Args:
+            sweep: 一括実行の ID（sweep_id）
+            index: シャード番号
+            count: シャード数
+            topics: このシャードで実行したトピックのリスト
+            results: トピックと同じ順序の実行結果のリスト
+
+        Returns:
+            保存したマニフェストのパス
+        """
+        manifest = {
+            "sweep_id": sweep,
+            "shard": index,
+            "shards": count,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "results": [
+                {"topic": topic, **{key: result[key] for key in MANIFEST_RESULT_KEYS if key in result}} for topic, result in zip(topics, results)
+            ],
+        }
+        path = self.directory / sweep / f"shard-{index}-of-{count}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        logger.info(f"シャードのマニフェストを保存しました: {path} ({len(topics)} 件)")
+        return path
+
+    def _load_all(self) -> List[Dict[str, Any]]:
+        manifests = []
+        for path in sorted(self.directory.rglob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    manifest = json.load(file)
+            except Exception as e:
+                logger.warning(f"マニフェストの読み込みエラー: {path} - {e}")
+                continue
+            if isinstance(manifest, dict) and {"sweep_id", "shard", "shards", "results"} <= manifest.keys():
+                manifests.append(manifest)
+        return manifests
+
+    def merge(self, sweep: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        一括実行のマニフェストを統合（同じシャードのマニフェストが複数ある場合は最新のものを使用）
+
+        Args:
+            sweep: 一括実行の ID（None の場合は最も新しい一括実行）
+
+        Returns:
+            sweep_id, shards, missing_shards, results, succeeded, failed を含む統合結果（マニフェストがない場合は None）
+        """
+        manifests = self._load_all()
+        if sweep is None and manifests:
+            sweep = max(manifests, key=lambda manifest: manifest["created_at"])["sweep_id"]
+        manifests = [manifest for manifest in manifests if manifest["sweep_id"] == sweep]
+        if not manifests:
+            return None
+
+        latest: Dict[int, Dict[str, Any]] = {}
+        for manifest in sorted(manifests, key=lambda manifest: manifest["created_at"]):
+            latest[manifest["shard"]] = manifest
+        count = manifests[0]["shards"]
+        results = sorted((result for manifest in latest.values() for result in manifest["results"]), key=lambda result: _normalize(result["topic"]))
+        succeeded = sum(1 for result in results if result.get("status") == "success")
+        return {
+            "sweep_id": sweep,
+            "shards": count,
+            "missing_shards": [index for index in range(1, count + 1) if index not in latest],
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+        }
+
+    def save_summary(self, merged: Dict[str, Any]) -> Path:
+        """統合結果を一括実行のディレクトリに summary.json として保存"""
+        path = self.directory / str(merged["sweep_id"]) / "summary.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({**merged, "merged_at": datetime.now().isoformat(timespec="seconds")}, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+def build_index_issue(merged: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """統合結果からトピック別レポートの一覧（インデックス Issue）のタイトル・本文・ラベルを作成"""
+    now = now or datetime.now()
+    rows = []
+    for result in merged["results"]:
+        status = "✅" if result.get("status") == "success" else "❌"
+        link = f"[レポート]({result['issue_url']})" if result.get("issue_url") else result.get("message", "").replace("|", "\\|").replace("\n", " ")
+        rows.append(f"| {result['topic']} | {status} | {link} |")
+
+    summary = [
+        f"- レポート日時: `{now.strftime('%Y-%m-%d %H:%M')}`",
+        f"- シャード数: `{merged['shards']}`",
+        f"- トピック数: `{len(merged['results'])}`（成功: {merged['succeeded']} 件, 失敗: {merged['failed']} 件）",
+    ]
+    if merged["missing_shards"]:
+        summary.append(f"- ⚠️ 結果が未登録のシャード: `{', '.join(str(index) for index in merged['missing_shards'])}`")
+
+    summary_text = "\n".join(summary)
+    table_text = "\n".join(rows)
+    return {
+        "title": f"🎯 AI Tech Catchup Topic Reports - {now.strftime('%Y-%m-%d')} ({len(merged['results'])} topics)",
+        "body": f"""# 🎯 AI Tech Catchup Topic Reports
+
+{summary_text}
+
+| トピック | 状態 | レポート |
+| --- | --- | --- |
+{table_text}
+
+---
+
+*このレポートは AI Tech Catchup Agent によって自動生成されました。*
+""",
+        "labels": ["topic-report", "topic-index"],
+    }
@@ -0,0 +1,63 @@
+"""
+ウォーターマークモジュール - レポートタイプ・トピックごとに前回成功したレポートの作成時刻を記録
+"""
+
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..utils.json_store import JSONStore
+
+logger = logging.getLogger(__name__)
+
+
+class WatermarkStore:
+    """レポートタイプ・トピックごとのウォーターマーク（JSON ファイル）"""
+
+    def __init__(self, path: str, max_age_days: int = 7):
+        """
+        Args:
+            path: ウォーターマークを保存する JSON ファイルのパス
+            max_age_days: ウォーターマークとして遡る最大日数（長期間停止していた場合に調査期間が広がりすぎないように制限）
+        """
+        self.path = Path(path)
+        self.max_age_days = max_age_days
+        self._store = JSONStore(path, "ウォーターマーク")
+
+    @staticmethod
+    def _key(report_type: str, topic: Optional[str] = None) -> str:
+        return f"{report_type}:{topic.strip().lower()}" if topic else report_type
+
+    def get(self, report_type: str, topic: Optional[str] = None, now: Optional[datetime] = None) -> Optional[datetime]:
+        """前回成功したレポートの作成時刻を取得（未記録の場合は None、max_age_days より古い場合はその日数前）"""
+        value = self._store.read().get(self._key(report_type, topic))
+        if not value:
+            return None
+        watermark = datetime.fromisoformat(value)
+        oldest = (now or datetime.now()) - timedelta(days=self.max_age_days)
+        return max(watermark, oldest)
+
+    def update(self, report_type: str, topic: Optional[str], timestamp: datetime) -> None:
+        """
+        ウォーターマークを更新（既存の値より新しい場合のみ。複数プロセスからの更新はファイルロックで直列化）
+
+        Args:
+            report_type: レポートタイプ
+            topic: トピック名
+            timestamp: レポートの調査を開始した時刻
+        """
+        key = self._key(report_type, topic)
+        value = timestamp.isoformat(timespec="seconds")
+
+        def apply(data: Dict[str, Any]) -> bool:
+            if key in data and datetime.fromisoformat(data[key]) >= timestamp:
+                return False
+            data[key] = value
+            return True
+
+        try:
+            if self._store.update(apply):
+                logger.info(f"ウォーターマークを更新しました: {key} = {value}")
+        except Exception as e:
+            logger.error(f"ウォーターマークの更新に失敗: {e}")
@@ -2,9 +2,9 @@
 Client modules for AI Tech Catchup Agent
 """
 
-from .claude_client import ClaudeClient
+from .claude_client import ClaudeClient, LocalTool
 from .claude_code_client import ClaudeCodeClient
 from .gemini_client import GeminiClient
 from .github_client import GitHubClient
 
-__all__ = ["ClaudeClient", "ClaudeCodeClient", "GeminiClient", "GitHubClient"]
+__all__ = ["ClaudeClient", "ClaudeCodeClient", "GeminiClient", "GitHubClient", "LocalTool"]
@@ -1,15 +1,51 @@
 """
 Claude Client - Claude APIとの通信を行うクライアント
+
+Claude Code CLI を使わずに Messages API を直接呼び出す（サーバーツールの Web 検索・Web 取得と、ローカルツールのツール使用ループ）
 """
 
+import asyncio
+import concurrent.futures
 import logging
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Coroutine, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import anthropic
 
+from ..utils import MCPServerManager, TurnBudget, UsageBudget, estimate_cost, summarize_payload
+from ..utils.rate_limiter import MAX_RATE_LIMIT_RETRIES, current_priority, get_rate_limiter, usage_tokens
+from .claude_code_client import TOOL_LIMIT_MESSAGE, WRAP_UP_MESSAGE
+
 logger = logging.getLogger(__name__)
 
+# max_tokens が指定されない場合の最大出力トークン数（Messages API では必須）
+DEFAULT_MAX_TOKENS = 8192
+# Message Batches API の料金の割引率（通常料金に対する比率）
+BATCH_COST_RATIO = 0.5
+# Web 取得ツールを使用するためのベータ機能
+WEB_FETCH_BETA = "web-fetch-2025-09-10"
+# サーバーツール名ごとのツールの種類と、ターン予算（report_budgets）でのツール名
+SERVER_TOOLS: Dict[str, Tuple[str, str]] = {
+    "web_search": ("web_search_20250305", "WebSearch"),
+    "web_fetch": ("web_fetch_20250910", "WebFetch"),
+}
+
+
+@dataclass
+class LocalTool:
+    """ツール使用ループでローカルに実行するツール"""
+
+    name: str
+    description: str
+    input_schema: Dict[str, Any]
+    handler: Callable[[Dict[str, Any]], str]
+
+    def to_param(self) -> Dict[str, Any]:
+        return {"name": self.name, "description": self.description, "input_schema": self.input_schema}
+
 
 class ClaudeClient:
     """Claude Client クラス"""
@@ -18,39 +54,160 @@ class ClaudeClient:
         self,
         anthropic_api_key: str,
         model_name: str,
-        max_tokens: int,
+        max_tokens: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        cost_budget: Optional[float] = None,
+        server_tools: Sequence[str] = ("web_search", "web_fetch"),
+        local_tools: Optional[List[LocalTool]] = None,
+        wrap_up_ratio: float = 0.8,
     ):
+        """
+        Claude Client を初期化
+
+        Args:
+            anthropic_api_key: Anthropic API Key
+            model_name: 使用するモデル名
+            max_tokens: 1 回の応答の最大出力トークン数（デフォルト: 8192）
+            token_budget: 1 回の実行で使用できる合計トークン数の上限（デフォルト: None）
+            cost_budget: 1 回の実行で使用できるコスト（USD）の上限（デフォルト: None）
+            server_tools: 使用するサーバーツール（web_search, web_fetch）
+            local_tools: ツール使用ループでローカルに実行するツールのリスト
+            wrap_up_ratio: 最大ターン数に対してこの割合に達した時点でツールの使用を止め、レポートをまとめさせる（デフォルト: 0.8）
+        """
         self.anthropic_api_key = anthropic_api_key
         self.model_name = model_name
-        self.max_tokens = max_tokens
+        self.max_tokens = max_tokens or DEFAULT_MAX_TOKENS
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.server_tools = [name for name in server_tools if name in SERVER_TOOLS]
+        self.local_tools = {tool.name: tool for tool in local_tools or []}
+        self.wrap_up_ratio = wrap_up_ratio
+        self.mcp_manager = MCPServerManager()
+        self.client = anthropic.Anthropic(api_key=anthropic_api_key)
+        # 非同期クライアントは専用のイベントループで呼び出しをまたいで再利用する（接続の再利用のため）
+        self.async_client = anthropic.AsyncAnthropic(api_key=anthropic_api_key)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
 
-    def send_message(self, message: str) -> Dict[str, Any]:
-        """Claude APIにメッセージを送信"""
+    def _run(self, coroutine: Coroutine[Any, Any, Dict[str, Any]], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """専用のイベントループ（バックグラウンドスレッド）でコルーチンを実行し、結果を待つ（タイムアウトした場合はコルーチンをキャンセル）"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="claude-client-loop", daemon=True).start()
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
         try:
-            client = anthropic.Anthropic(api_key=self.anthropic_api_key)
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"タイムアウトしました ({timeout} 秒)")
 
-            response = client.messages.create(
-                model=self.model_name,
-                max_tokens=self.max_tokens,
-                messages=[{"role": "user", "content": message}],
-            )
+    def _server_tools(self, turn_budget: TurnBudget) -> List[Dict[str, Any]]:
+        """サーバーツールの定義（呼び出し回数の上限はターン予算のツールごとの上限）"""
+        tools = []
+        for name in self.server_tools:
+            tool_type, budget_name = SERVER_TOOLS[name]
+            tool: Dict[str, Any] = {"type": tool_type, "name": name}
+            limit = turn_budget.limit_for(budget_name)
+            if limit is not None:
+                tool["max_uses"] = limit
+            tools.append(tool)
+        return tools
 
-            # response.content[0]はTextBlockであることを確認
-            if not response.content or not hasattr(response.content[0], "text"):
-                return {
-                    "status": "error",
-                    "message": "Invalid response format from Claude API",
-                    "searched_at": datetime.now().isoformat(),
-                }
+    def _tools(self, turn_budget: TurnBudget) -> List[Dict[str, Any]]:
+        """サーバーツールとローカルツールの定義"""
+        return self._server_tools(turn_budget) + [tool.to_param() for tool in self.local_tools.values()]
+
+    def _request_params(self, message: str, report_type: Optional[str] = None, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Message Batches API の各リクエストのパラメータ
+
+        ツール使用ループを行えず、ベータ機能も指定できないため、サーバーツールの Web 検索のみ使用する
+        （呼び出し回数の上限はレポートタイプ別のターン予算の上限。最大出力トークン数は None の場合はクライアントの設定値）
+        """
+        params: Dict[str, Any] = {
+            "model": self.model_name,
+            "max_tokens": max_tokens or self.max_tokens,
+            "messages": [{"role": "user", "content": message}],
+        }
+        report_budget = self.mcp_manager.get_report_budget(report_type)
+        tools = [tool for tool in self._server_tools(TurnBudget(report_budget["max_turns"], report_budget["tools"])) if tool["name"] == "web_search"]
+        if tools:
+            params["tools"] = tools
+        return params
+
+    @staticmethod
+    def _extract_usage(response: Any) -> Dict[str, int]:
+        return {
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens,
+            "cache_read_input_tokens": response.usage.cache_read_input_tokens or 0,
+            "cache_creation_input_tokens": response.usage.cache_creation_input_tokens or 0,
+        }
 
-            result = {
-                "status": "success",
-                "content": response.content[0].text,
+    @staticmethod
+    def _final_text(content: List[Any]) -> Tuple[str, bool]:
+        """
+        応答の最後のツール呼び出し・ツール結果より後のテキストブロックを連結（Web 検索の結果を引用する場合はテキストが複数のブロックに分かれる）
+
+        Returns:
+            テキストと、応答にツール呼び出し・ツール結果が含まれていたか（それより前のテキストはツール呼び出しの間の説明のため除外）
+        """
+        parts: List[str] = []
+        used_tools = False
+        for block in content:
+            block_type = getattr(block, "type", None) or ""
+            if block_type.endswith("tool_use") or block_type.endswith("tool_result"):
+                parts = []
+                used_tools = True
+            elif block_type == "text":
+                parts.append(block.text)
+        return "".join(parts), used_tools
+
+    @classmethod
+    def _extract_text(cls, content: List[Any]) -> str:
+        """応答の最後のツール呼び出し・ツール結果より後のテキスト"""
+        return cls._final_text(content)[0]
+
+    def _to_result(self, response: Any, cost_ratio: float = 1.0) -> Dict[str, Any]:
+        """Messages API の応答を send_message の実行結果の形式に変換"""
+        content = self._extract_text(response.content or [])
+        if not content:
+            return {
+                "status": "error",
+                "message": "Invalid response format from Claude API",
                 "searched_at": datetime.now().isoformat(),
-                "model": self.model_name,
             }
-            logger.info("Claude API呼び出しが正常に完了しました")
-            return result
+
+        usage = self._extract_usage(response)
+        cost = estimate_cost(self.model_name, usage)
+        return {
+            "status": "success",
+            "content": content,
+            "searched_at": datetime.now().isoformat(),
+            "model": self.model_name,
+            "usage": usage,
+            "cost_usd": cost * cost_ratio if cost is not None else None,
+        }
+
+    def send_message(
+        self, message: str, report_type: Optional[str] = None, timeout: Optional[float] = None, max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Claude APIにメッセージを送信し、サーバーツール・ローカルツールを使用しながら応答を生成
+
+        Args:
+            message: 送信するメッセージ
+            report_type: レポートタイプ（レポートタイプ別のターン数・ツール呼び出し回数の予算の選択に使用）
+            timeout: タイムアウト時間（秒、None で無制限）
+            max_tokens: この呼び出しの 1 回の応答の最大出力トークン数（None の場合はクライアントの設定値）
+
+        Returns:
+            Claude APIからの応答
+        """
+        try:
+            logger.info(f"プロンプト: {summarize_payload(message)}")
+            return self._run(self._send_message_async(message, report_type, current_priority(), max_tokens or self.max_tokens), timeout)
 
         except Exception as e:
             logger.error(f"Claude API呼び出しエラー: {e}")
@@ -59,3 +216,219 @@ class ClaudeClient:
                 "message": str(e),
                 "searched_at": datetime.now().isoformat(),
             }
+
+    async def _stream_turn(self, params: Dict[str, Any], estimated_tokens: int, priority: Optional[int]) -> Any:
+        """
+        1 ターン分の応答をストリーミングで受信（レート制限の許可を取得し、レスポンスヘッダのレート制限情報を反映）
+
+        Returns:
+            ターンの最終的な応答メッセージ
+        """
+        limiter = get_rate_limiter()
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            await asyncio.to_thread(limiter.acquire, "anthropic", estimated_tokens, priority)
+            try:
+                async with self.async_client.beta.messages.stream(**params) as stream:
+                    limiter.update_from_headers("anthropic", stream.response.headers, stream.response.status_code)
+                    async for event in stream:
+                        if event.type == "content_block_start" and event.content_block.type == "server_tool_use":
+                            logger.debug(f"サーバーツールを実行中: {event.content_block.name}")
+                    response = await stream.get_final_message()
+                limiter.record("anthropic", tokens=usage_tokens(self._extract_usage(response)) - estimated_tokens)
+                return response
+            except anthropic.RateLimitError as e:
+                limiter.update_from_headers("anthropic", e.response.headers, e.status_code)
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                logger.warning(f"Claude API のレート制限により再試行します ({attempt + 1}/{MAX_RATE_LIMIT_RETRIES})")
+        raise RuntimeError("Claude API のレート制限により生成できませんでした")
+
+    async def _run_local_tools(self, content: List[Any], turn_budget: TurnBudget) -> List[Dict[str, Any]]:
+        """応答のツール呼び出しをローカルで実行し、ツール結果のブロックを作成（予算の上限に達した呼び出しは拒否）"""
+        results: List[Dict[str, Any]] = []
+        for block in content:
+            if getattr(block, "type", None) != "tool_use":
+                continue
+            deny_reason = turn_budget.check_tool(block.id, block.name)
+            tool = self.local_tools.get(block.name)
+            if deny_reason or tool is None:
+                if deny_reason:
+                    logger.warning(f"ツール呼び出しを拒否しました: {block.name} ({deny_reason})")
+                text = TOOL_LIMIT_MESSAGE if deny_reason else f"未対応のツールです: {block.name}"
+                results.append({"type": "tool_result", "tool_use_id": block.id, "content": text, "is_error": True})
+                continue
+            try:
+                output = await asyncio.to_thread(tool.handler, dict(block.input))
+                results.append({"type": "tool_result", "tool_use_id": block.id, "content": output})
+            except Exception as e:
+                logger.warning(f"ローカルツールの実行エラー ({block.name}): {e}")
+                results.append({"type": "tool_result", "tool_use_id": block.id, "content": str(e), "is_error": True})
+        if turn_budget.wrap_up_reason:
+            results.append({"type": "text", "text": WRAP_UP_MESSAGE})
+        return results
+
+    async def _send_message_async(self, message: str, report_type: Optional[str], priority: Optional[int], max_tokens: int) -> Dict[str, Any]:
+        """
+        ツール使用ループでメッセージを送信
+
+        サーバーツールは API 側で実行され、長引いた場合（pause_turn）は応答をそのまま送り返して続きを依頼する。
+        ローカルツールの呼び出し（tool_use）は実行結果を送り返し、ツールを呼び出さない応答になるまで繰り返す
+        """
+        started = time.perf_counter()
+        budget = UsageBudget(self.model_name, max_tokens=self.token_budget, max_cost_usd=self.cost_budget)
+        report_budget = self.mcp_manager.get_report_budget(report_type)
+        turn_budget = TurnBudget(report_budget["max_turns"], report_budget["tools"], wrap_up_ratio=self.wrap_up_ratio)
+        params: Dict[str, Any] = {"model": self.model_name, "max_tokens": max_tokens, "tools": self._tools(turn_budget)}
+        if "web_fetch" in self.server_tools:
+            params["betas"] = [WEB_FETCH_BETA]
+
+        messages: List[Dict[str, Any]] = [{"role": "user", "content": message}]
+        content_parts: List[str] = []
+        budget_exceeded: Optional[str] = None
+        estimated_tokens = len(message) // 4 + max_tokens
+        server_tool_use: Dict[str, int] = {}
+        while True:
+            wrap_up_reason = turn_budget.start_turn()
+            if wrap_up_reason:
+                logger.warning(f"{wrap_up_reason}。以降のツール呼び出しを拒否し、レポートをまとめさせます")
+            # まとめに入った後はツールを呼び出させない（履歴にツールのブロックが含まれるため、ツールの定義は残す）
+            tool_choice = {"tool_choice": {"type": "none"}} if turn_budget.wrap_up_reason and params["tools"] else {}
+            response = await self._stream_turn({**params, **tool_choice, "messages": messages}, estimated_tokens, priority)
+
+            usage = self._extract_usage(response)
+            budget.add(**usage)
+            # 次のターンの入力はこのターンの入力と出力を含む
+            estimated_tokens = usage_tokens(usage) + max_tokens
+            if getattr(response.usage, "server_tool_use", None) is not None:
+                for name, count in response.usage.server_tool_use.model_dump().items():
+                    server_tool_use[name] = server_tool_use.get(name, 0) + (count or 0)
+            for block in response.content:
+                if getattr(block, "type", None) == "server_tool_use":
+                    turn_budget.record_tool(block.id, SERVER_TOOLS.get(block.name, ("", block.name))[1])
+                    logger.info(f"{block.name}: {block.input}")
+            # レポートは最後のツール呼び出し以降のテキスト（pause_turn で続きを生成した場合は段落として連結）
+            text, used_tools = self._final_text(response.content)
+            if used_tools:
+                content_parts = []
+            if text.strip():
+                content_parts.append(text.strip())
+            logger.info(f"生成中: {turn_budget.describe()}")
+
+            budget_exceeded = budget.exceeded()
+            if budget_exceeded:
+                logger.warning(f"{budget_exceeded}。生成を中断します")
+                break
+            messages.append({"role": "assistant", "content": response.content})
+            if response.stop_reason == "pause_turn":
+                continue
+            if response.stop_reason != "tool_use":
+                break
+            messages.append({"role": "user", "content": await self._run_local_tools(response.content, turn_budget)})
+
+        content = "\n\n".join(content_parts)
+        usage_info = {
+            "usage": budget.usage,
+            "cost_usd": budget.cost_usd,
+            "num_turns": turn_budget.turns,
+            "duration_ms": int((time.perf_counter() - started) * 1000),
+            "turn_budget": turn_budget.summary(),
+            "server_tool_use": server_tool_use,
+        }
+        logger.info(f"ターン・ツール呼び出し: {turn_budget.describe()}")
+
+        if budget_exceeded:
+            return {
+                "status": "error",
+                "message": budget_exceeded,
+                "budget_exceeded": True,
+                "content": content,
+                "searched_at": datetime.now().isoformat(),
+                "model": self.model_name,
+                **usage_info,
+            }
+
+        if not content:
+            logger.warning("Claude APIからの応答が空です")
+            return {
+                "status": "error",
+                "message": "Claude APIからの応答が空です",
+                "searched_at": datetime.now().isoformat(),
+                **usage_info,
+            }
+
+        logger.info("Claude API呼び出しが正常に完了しました")
+        return {
+            "status": "success",
+            "content": content,
+            "searched_at": datetime.now().isoformat(),
+            "model": self.model_name,
+            **usage_info,
+        }
+
+    def submit_batch(self, messages: Dict[str, str], report_types: Optional[Dict[str, str]] = None, max_tokens: Optional[int] = None) -> str:
+        """
+        複数のメッセージを 1 つの Message Batch として送信
+
+        Args:
+            messages: custom_id（英数字・_・- の 64 文字以内）ごとのメッセージ
+            report_types: custom_id ごとのレポートタイプ（ツールの呼び出し回数の上限の選択に使用）
+            max_tokens: 各リクエストの最大出力トークン数（None の場合はクライアントの設定値）
+
+        Returns:
+            バッチ ID
+        """
+        get_rate_limiter().acquire("anthropic")
+        report_types = report_types or {}
+        requests: List[Any] = [
+            {"custom_id": custom_id, "params": self._request_params(message, report_types.get(custom_id), max_tokens)}
+            for custom_id, message in messages.items()
+        ]
+        batch = self.client.messages.batches.create(requests=requests)
+        logger.info(f"Message Batch を送信しました: {batch.id} ({len(messages)} 件)")
+        return batch.id
+
+    def wait_batch(self, batch_id: str, poll_interval: float = 30.0, max_poll_interval: float = 300.0) -> Dict[str, int]:
+        """
+        Message Batch の処理が終了するまで待機（ポーリング間隔は max_poll_interval まで倍増）
+
+        Message Batches API はバッチ全体の処理が終了するまで結果を取得できないため、成功したリクエストの結果も
+        バッチの終了後にまとめて処理される
+
+        Returns:
+            終了時のリクエスト数の内訳（succeeded, errored, canceled, expired）
+        """
+        interval = poll_interval
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            logger.info(
+                f"Message Batch の処理状況: {batch_id} {batch.processing_status} "
+                f"(処理中: {counts.processing}, 成功: {counts.succeeded}, エラー: {counts.errored}, 期限切れ: {counts.expired})"
+            )
+            if batch.processing_status == "ended":
+                return {"succeeded": counts.succeeded, "errored": counts.errored, "canceled": counts.canceled, "expired": counts.expired}
+            time.sleep(interval)
+            interval = min(interval * 2, max_poll_interval)
+
+    def iter_batch_results(self, batch_id: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        処理が終了した Message Batch の結果を 1 件ずつ取得（結果ファイルをストリーミングで読み込む）
+
+        Yields:
+            custom_id と send_message の実行結果の形式の結果（コストはバッチ料金で概算）
+        """
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded" and entry.result.message.stop_reason == "pause_turn":
+                # サーバーツールの実行が長引いて中断された応答（バッチでは続きを依頼できないため、途中までの内容は配信しない）
+                yield entry.custom_id, {
+                    "status": "error",
+                    "message": "サーバーツールの実行中に応答が中断されたため、レポートが完成していません (pause_turn)",
+                    "searched_at": datetime.now().isoformat(),
+                }
+                continue
+            if entry.result.type == "succeeded":
+                yield entry.custom_id, self._to_result(entry.result.message, cost_ratio=BATCH_COST_RATIO)
+                continue
+            error = getattr(entry.result, "error", None)
+            message = getattr(getattr(error, "error", None), "message", None) or f"バッチのリクエストが完了しませんでした ({entry.result.type})"
+            yield entry.custom_id, {"status": "error", "message": message, "searched_at": datetime.now().isoformat()}
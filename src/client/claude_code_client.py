@@ -1,14 +1,34 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from claude_code_sdk import ClaudeCodeOptions, ClaudeSDKClient
+from claude_code_sdk import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    ClaudeSDKClient,
+    HookContext,
+    HookMatcher,
+    ResultMessage,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+from claude_code_sdk.types import HookJSONOutput, StreamEvent
 
-from ..utils import MCPServerManager
+from ..utils import MCPServerManager, TurnBudget, UsageBudget, summarize_payload
+from ..utils.cassette import RecordingSDKClient, ReplaySDKClient, get_cassette
+from ..utils.rate_limiter import get_rate_limiter, usage_tokens
+from ..utils.source_registry import SourceRegistry
 
 logger = logging.getLogger(__name__)
 
+# ターン予算の上限に近づいた・達した場合に、収集済みの情報でレポートをまとめるよう依頼するメッセージ
+WRAP_UP_MESSAGE = "調査に使用できるターン数・ツール呼び出し回数の予算を使い切りました。" "これ以上ツールを使用せず、ここまでに収集した情報のみで、指定された形式のレポートを最後まで作成してください。"
+# ツールごとの呼び出し回数の上限に達した場合のメッセージ
+TOOL_LIMIT_MESSAGE = "このツールはこれ以上使用できません。他のツールまたは収集済みの情報を活用してください。"
+
 
 class ClaudeCodeClient:
     """Claude Code Client クラス"""
@@ -18,6 +38,10 @@ class ClaudeCodeClient:
         model_name: str = "claude-sonnet-4-20250514",
         max_tokens: int | None = None,
         enabled_mcp_servers: Optional[List[str]] = None,
+        token_budget: Optional[int] = None,
+        cost_budget: Optional[float] = None,
+        source_registry: Optional[SourceRegistry] = None,
+        wrap_up_ratio: float = 0.8,
     ):
         """
         Claude Code Client を初期化
@@ -26,28 +50,64 @@ class ClaudeCodeClient:
             model_name: 使用するモデル名（デフォルト: claude-sonnet-4-20250514）
             max_tokens: 最大トークン数（デフォルト: None）
             enabled_mcp_servers: 有効にする MCP サーバー名のリスト（例: ["github", "filesystem"]）
+            token_budget: 1 回の実行で使用できる合計トークン数の上限（デフォルト: None）
+            cost_budget: 1 回の実行で使用できるコスト（USD）の上限（デフォルト: None）
+            source_registry: WebFetch のレイテンシ・エラーを記録する情報源レジストリ（デフォルト: None）
+            wrap_up_ratio: 最大ターン数に対してこの割合に達した時点でツールの使用を止め、レポートをまとめさせる（デフォルト: 0.8）
         """
         self.model_name = model_name
         self.max_tokens = max_tokens
         self.enabled_mcp_servers = enabled_mcp_servers or []
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.source_registry = source_registry
+        self.wrap_up_ratio = wrap_up_ratio
         self.mcp_manager = MCPServerManager()
 
-    def send_message(self, message: str, timeout: int = 3600) -> Dict[str, Any]:
+    def send_message(
+        self, message: str, timeout: Optional[float] = 3600, report_type: Optional[str] = None, max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Claude Codeにメッセージを送信してWeb Search機能を使用
 
         Args:
             message: 送信するメッセージ
-            timeout: タイムアウト時間（秒）
+            timeout: タイムアウト時間（秒、None で無制限）
+            report_type: レポートタイプ（レポートタイプ別の MCP ツール許可リストの選択に使用）
+            max_tokens: この呼び出しの最大出力トークン数（None の場合はクライアントの設定値）
 
         Returns:
             Claude Codeからの応答
         """
         try:
-            logger.info(f"プロンプト: {message}")
+            logger.info(f"プロンプト: {summarize_payload(message)}")
+
+            # レート制限の許可を取得（入力は 4 文字 = 1 トークンで概算。カセット再生時は API を呼ばないため不要）
+            cassette = get_cassette()
+            rate_limited = not (cassette and cassette.replaying)
+            max_tokens = max_tokens if max_tokens is not None else self.max_tokens
+            estimated_tokens = len(message) // 4 + (max_tokens or 0)
+            if rate_limited:
+                get_rate_limiter().acquire("anthropic", tokens=estimated_tokens)
 
             # 非同期関数を同期的に実行
-            return asyncio.run(self._send_message_async(message, timeout))
+            try:
+                result = asyncio.run(asyncio.wait_for(self._send_message_async(message, timeout, report_type, max_tokens), timeout))
+            except asyncio.TimeoutError:
+                logger.error(f"Claude Code の実行がタイムアウトしました ({timeout} 秒)")
+                result = {"status": "error", "message": f"タイムアウトしました ({timeout} 秒)", "searched_at": datetime.now().isoformat()}
+
+            # 2 ターン目以降のリクエスト数と実際のトークン数をレート制限に反映
+            if rate_limited:
+                limiter = get_rate_limiter()
+                limiter.record(
+                    "anthropic",
+                    requests=max(0, int(result.get("num_turns") or 1) - 1),
+                    tokens=usage_tokens(result.get("usage") or {}) - estimated_tokens,
+                )
+                if result["status"] == "error" and "rate_limit" in str(result.get("message", "")).lower():
+                    limiter.block("anthropic", 60)
+            return result
 
         except Exception as e:
             logger.error(f"Claude Code実行中にエラー: {e}")
@@ -57,13 +117,34 @@ class ClaudeCodeClient:
                 "searched_at": datetime.now().isoformat(),
             }
 
-    async def _send_message_async(self, message: str, timeout: int) -> Dict[str, Any]:
+    @staticmethod
+    def _summarize_usage(result_messages: List[ResultMessage], budget: UsageBudget) -> Dict[str, Any]:
+        """最終結果メッセージ（まとめの追加依頼分を含む）から利用量を集計（ない場合はストリーミングイベントの集計値）"""
+        if not result_messages:
+            return {"usage": budget.usage, "cost_usd": budget.cost_usd}
+        usage = dict(budget.usage)
+        for key in usage:
+            reported = [msg.usage[key] for msg in result_messages if msg.usage and key in msg.usage]
+            if reported:
+                usage[key] = sum(reported)
+        costs = [msg.total_cost_usd for msg in result_messages if msg.total_cost_usd is not None]
+        return {
+            "usage": usage,
+            "cost_usd": sum(costs) if costs else budget.cost_usd,
+            "num_turns": sum(msg.num_turns for msg in result_messages),
+            "duration_ms": sum(msg.duration_ms for msg in result_messages),
+        }
+
+    async def _send_message_async(
+        self, message: str, timeout: Optional[float], report_type: Optional[str] = None, max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         非同期でClaude Codeにメッセージを送信
 
         Args:
             message: 送信するメッセージ
             timeout: タイムアウト時間（秒）
+            report_type: レポートタイプ
 
         Returns:
             Claude Codeからの応答
@@ -74,47 +155,169 @@ class ClaudeCodeClient:
 
             # MCP サーバー設定を構築
             mcp_servers = {}
+            disallowed_tools: List[str] = []
+            mcp_tool_usage: Dict[str, Any] = {}
             if self.enabled_mcp_servers:
                 logger.info(f"MCP サーバーを有効化: {', '.join(self.enabled_mcp_servers)}")
                 mcp_servers = self.mcp_manager.build_mcp_config(self.enabled_mcp_servers)
 
                 # 有効な MCP サーバーのツールを許可リストに追加
-                mcp_tools = self.mcp_manager.get_allowed_tools(self.enabled_mcp_servers)
+                mcp_tools = self.mcp_manager.get_allowed_tools(self.enabled_mcp_servers, report_type)
                 allowed_tools.extend(mcp_tools)
                 logger.info(f"MCP ツールを許可リストに追加: {mcp_tools}")
 
+                # 許可リスト外の MCP ツールを無効化し、ツール定義によるコンテキストの増加を抑える
+                disallowed_tools = self.mcp_manager.get_disallowed_tools(self.enabled_mcp_servers, report_type)
+                mcp_tool_usage = self.mcp_manager.estimate_tool_tokens(self.enabled_mcp_servers, report_type)
+                if mcp_tool_usage["cataloged"]:
+                    logger.info(
+                        f"MCP ツール定義: {mcp_tool_usage['exposed_tools']}個 (推定 {mcp_tool_usage['estimated_tokens']} トークン/ターン), "
+                        f"無効化: {len(disallowed_tools)}個"
+                    )
+                else:
+                    logger.info("MCP ツールカタログが未作成のため、ツール定義のトークン数は計測できません（`mcp tools` で作成）")
+
+            budget = UsageBudget(self.model_name, max_tokens=self.token_budget, max_cost_usd=self.cost_budget)
+            report_budget = self.mcp_manager.get_report_budget(report_type)
+            turn_budget = TurnBudget(report_budget["max_turns"], report_budget["tools"], wrap_up_ratio=self.wrap_up_ratio)
+
+            async def limit_tool_use(input_data: Dict[str, Any], tool_use_id: Optional[str], context: HookContext) -> HookJSONOutput:
+                """予算を超えるツール呼び出しを拒否し、収集済みの情報でレポートをまとめるよう指示"""
+                tool_name = input_data.get("tool_name", "")
+                reason = turn_budget.check_tool(tool_use_id or f"hook-{len(turn_budget.tool_calls)}", tool_name)
+                if reason is None:
+                    return {}
+                logger.warning(f"ツール呼び出しを拒否しました: {tool_name} ({reason})")
+                instruction = WRAP_UP_MESSAGE if turn_budget.wrap_up_reason else TOOL_LIMIT_MESSAGE
+                return {
+                    "hookSpecificOutput": {
+                        "hookEventName": "PreToolUse",
+                        "permissionDecision": "deny",
+                        "permissionDecisionReason": f"{reason}。{instruction}",
+                    }
+                }
+
             # Claude Code SDKオプションを設定
             env_vars = {}
-            if self.max_tokens is not None:
-                env_vars["CLAUDE_CODE_MAX_OUTPUT_TOKENS"] = str(self.max_tokens)
+            if max_tokens is not None:
+                env_vars["CLAUDE_CODE_MAX_OUTPUT_TOKENS"] = str(max_tokens)
 
             options = ClaudeCodeOptions(
                 model=self.model_name,
                 allowed_tools=allowed_tools,
                 permission_mode="acceptEdits",
                 mcp_servers=mcp_servers if mcp_servers else None,  # type: ignore[arg-type]
+                disallowed_tools=disallowed_tools,
                 env=env_vars if env_vars else {},
+                # 予算が設定されている場合はストリーミングイベントからトークン数を逐次集計する
+                include_partial_messages=budget.enabled,
+                # ターン数の上限（まとめに入る前に到達した場合は、ツールを使わずにまとめるよう追加で依頼する）
+                max_turns=turn_budget.max_turns,
+                hooks={"PreToolUse": [HookMatcher(hooks=[limit_tool_use])]} if turn_budget.enabled else None,
             )
 
-            # Claude Code SDKクライアントを使用
-            async with ClaudeSDKClient(options=options) as client:
+            # Claude Code SDKクライアントを使用（カセット使用時はストリームを記録・再生）
+            cassette = get_cassette()
+            sdk_client: Any
+            if cassette and cassette.replaying:
+                sdk_client = ReplaySDKClient(cassette, report_type or "default")
+            else:
+                sdk_client = ClaudeSDKClient(options=options)
+                if cassette and cassette.recording:
+                    sdk_client = RecordingSDKClient(sdk_client, cassette, report_type or "default")
+
+            async with sdk_client as client:
                 logger.info("Claude Code SDKで実行中...")
 
                 # メッセージを送信
                 await client.query(message)
 
                 # レスポンスを収集
-                content_parts = []
-                async for msg in client.receive_response():
-                    if hasattr(msg, "content"):
-                        for block in msg.content:
-                            if hasattr(block, "text"):
-                                content_parts.append(block.text)
-                    # 最終結果メッセージをチェック
-                    if type(msg).__name__ == "ResultMessage":
-                        break
+                budget_exceeded: Optional[str] = None
+                message_output_tokens = 0
+                pending_fetches: Dict[str, Any] = {}
+                in_turn = False
+
+                async def receive(parts: List[str]) -> Optional[ResultMessage]:
+                    """応答を 1 回分受信してテキストを parts に追加し、最終結果メッセージを返す"""
+                    nonlocal budget_exceeded, message_output_tokens, in_turn
+                    async for msg in client.receive_response():
+                        # アシスタントの応答からツール結果を受け取るまでを 1 ターンとして集計
+                        if isinstance(msg, AssistantMessage) and not in_turn:
+                            in_turn = True
+                            wrap_up_reason = turn_budget.start_turn()
+                            logger.info(f"生成中: {turn_budget.describe()}")
+                            if wrap_up_reason:
+                                logger.warning(f"{wrap_up_reason}。以降のツール呼び出しを拒否し、レポートをまとめさせます")
+                        elif isinstance(msg, UserMessage):
+                            in_turn = False
+
+                        if hasattr(msg, "content"):
+                            for block in msg.content:
+                                if hasattr(block, "text"):
+                                    parts.append(block.text)
+                                elif isinstance(block, ToolUseBlock):
+                                    turn_budget.record_tool(block.id, block.name)
+                                    # WebFetch の呼び出しから結果までの時間を情報源ごとに記録
+                                    if block.name == "WebFetch" and block.input.get("url"):
+                                        pending_fetches[block.id] = (block.input["url"], time.perf_counter())
+                                elif isinstance(block, ToolResultBlock) and block.tool_use_id in pending_fetches and self.source_registry:
+                                    url, started = pending_fetches.pop(block.tool_use_id)
+                                    self.source_registry.record_fetch(url, (time.perf_counter() - started) * 1000, not block.is_error)
+
+                        # ストリーミングイベントからトークン数を集計し、予算超過時は生成を中断
+                        if isinstance(msg, StreamEvent):
+                            event = msg.event
+                            if event.get("type") == "message_start":
+                                usage = event.get("message", {}).get("usage", {})
+                                message_output_tokens = usage.get("output_tokens", 0)
+                                budget.add(**usage)
+                            elif event.get("type") == "message_delta":
+                                output_tokens = event.get("usage", {}).get("output_tokens", 0)
+                                budget.add(output_tokens=max(0, output_tokens - message_output_tokens))
+                                message_output_tokens = max(message_output_tokens, output_tokens)
+                            if budget_exceeded is None and budget.exceeded():
+                                budget_exceeded = budget.exceeded()
+                                logger.warning(f"{budget_exceeded}。生成を中断します")
+                                await client.interrupt()
+
+                        # 最終結果メッセージをチェック
+                        if isinstance(msg, ResultMessage):
+                            return msg
+                    return None
+
+                content_parts: List[str] = []
+                result_messages = [await receive(content_parts)]
+
+                # 最大ターン数に達して打ち切られた場合は、ツールを使わずに収集済みの情報でまとめるよう追加で依頼
+                if budget_exceeded is None and result_messages[0] is not None and result_messages[0].subtype == "error_max_turns":
+                    turn_budget.wrap_up_reason = turn_budget.wrap_up_reason or f"最大ターン数に達しました ({turn_budget.max_turns})"
+                    logger.warning(f"{turn_budget.wrap_up_reason}。収集済みの情報でレポートをまとめるよう依頼します")
+                    wrap_up_parts: List[str] = []
+                    await client.query(WRAP_UP_MESSAGE)
+                    result_messages.append(await receive(wrap_up_parts))
+                    if "".join(wrap_up_parts).strip():
+                        content_parts = wrap_up_parts
 
                 content = "".join(content_parts).strip()
+                if self.source_registry:
+                    self.source_registry.save()
+                usage_info = {
+                    **self._summarize_usage([msg for msg in result_messages if msg is not None], budget),
+                    "turn_budget": turn_budget.summary(),
+                }
+                logger.info(f"ターン・ツール呼び出し: {turn_budget.describe()}")
+
+                if budget_exceeded:
+                    return {
+                        "status": "error",
+                        "message": budget_exceeded,
+                        "budget_exceeded": True,
+                        "content": content,
+                        "searched_at": datetime.now().isoformat(),
+                        "model": self.model_name,
+                        **usage_info,
+                    }
 
                 if not content:
                     logger.warning("Claude Codeからの応答が空です")
@@ -122,6 +325,7 @@ class ClaudeCodeClient:
                         "status": "error",
                         "message": "Claude Codeからの応答が空です",
                         "searched_at": datetime.now().isoformat(),
+                        **usage_info,
                     }
 
                 logger.info("Claude Code実行が正常に完了しました")
@@ -130,6 +334,8 @@ class ClaudeCodeClient:
                     "content": content,
                     "searched_at": datetime.now().isoformat(),
                     "model": self.model_name,
+                    "mcp_tools": mcp_tool_usage,
+                    **usage_info,
                 }
 
             # async with文の後に到達した場合のフォールバック
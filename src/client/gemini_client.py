@@ -1,8 +1,15 @@
 import logging
+import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+
+from ..utils import UsageBudget
+from ..utils.cassette import fingerprint, get_cassette
+from ..utils.rate_limiter import MAX_RATE_LIMIT_RETRIES, get_rate_limiter, usage_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +17,14 @@ logger = logging.getLogger(__name__)
 class GeminiClient:
     """Gemini Client クラス"""
 
-    def __init__(self, google_api_key: str, model_name: str = "gemini-2.5-flash", max_tokens: int | None = None):
+    def __init__(
+        self,
+        google_api_key: str,
+        model_name: str = "gemini-2.5-flash",
+        max_tokens: int | None = None,
+        token_budget: Optional[int] = None,
+        cost_budget: Optional[float] = None,
+    ):
         """
         Gemini Client を初期化
 
@@ -18,26 +32,115 @@ class GeminiClient:
             google_api_key: Google API Key
             model_name: 使用するモデル名（デフォルト: gemini-2.5-flash）
             max_tokens: 最大トークン数（デフォルト: None）
+            token_budget: 1 回の実行で使用できる合計トークン数の上限（デフォルト: None）
+            cost_budget: 1 回の実行で使用できるコスト（USD）の上限（デフォルト: None）
         """
         self.google_api_key = google_api_key
         self.model_name = model_name
         self.max_tokens = max_tokens
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+
+    @staticmethod
+    def _extract_usage(response: Any) -> Dict[str, int]:
+        """レスポンスの usage_metadata から利用量を取得"""
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is None:
+            return {}
+        cached = metadata.cached_content_token_count or 0
+        return {
+            "input_tokens": (metadata.prompt_token_count or 0) - cached + (metadata.tool_use_prompt_token_count or 0),
+            "output_tokens": (metadata.candidates_token_count or 0) + (metadata.thoughts_token_count or 0),
+            "cache_read_input_tokens": cached,
+        }
+
+    @staticmethod
+    def _retry_delay(error: genai_errors.APIError) -> float:
+        """429 エラーの RetryInfo から再試行までの待機時間（秒）を取得（ない場合は 60 秒）"""
+        details = (error.details or {}).get("error", {}).get("details", []) if isinstance(error.details, dict) else []
+        for detail in details:
+            delay = str(detail.get("retryDelay", "")).rstrip("s")
+            if delay.replace(".", "", 1).isdigit():
+                return float(delay)
+        return 60.0
+
+    def _generate_content(self, client: genai.Client, message: str, max_output_tokens: Optional[int]) -> Any:
+        """レート制限の許可を取得して生成（429 の場合は RetryInfo の時間だけ停止して再試行）"""
+        limiter = get_rate_limiter()
+        estimated_tokens = len(message) // 4 + (max_output_tokens or 0)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            limiter.acquire("gemini", tokens=estimated_tokens)
+            try:
+                response = client.models.generate_content(
+                    model=self.model_name,
+                    contents=message,
+                    config={
+                        "tools": [{"google_search": {}}],
+                        "max_output_tokens": max_output_tokens,
+                    },
+                )
+                limiter.record("gemini", tokens=usage_tokens(self._extract_usage(response)) - estimated_tokens)
+                return response
+            except genai_errors.ClientError as e:
+                if e.code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                limiter.block("gemini", self._retry_delay(e))
+                logger.warning(f"Gemini API のレート制限により再試行します ({attempt + 1}/{MAX_RATE_LIMIT_RETRIES})")
+        raise RuntimeError("Gemini API のレート制限により生成できませんでした")
+
+    def send_message(
+        self, message: str, report_type: Optional[str] = None, timeout: Optional[float] = None, max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Gemini APIにメッセージを送信
 
-    def send_message(self, message: str) -> Dict[str, Any]:
-        """Gemini APIにメッセージを送信"""
+        Args:
+            message: 送信するメッセージ
+            report_type: レポートタイプ（Gemini では MCP ツールを使用しないため未使用）
+            timeout: リクエストのタイムアウト時間（秒、None で無制限）
+            max_tokens: この呼び出しの最大出力トークン数（None の場合はクライアントの設定値）
+        """
         try:
             # Geminiモデルの初期化
-            client = genai.Client(api_key=self.google_api_key)
-
-            # メッセージを送信
-            response = client.models.generate_content(
-                model=self.model_name,
-                contents=message,
-                config={
-                    "tools": [{"google_search": {}}],
-                    "max_output_tokens": self.max_tokens,
-                },
-            )
+            http_options = genai_types.HttpOptions(timeout=int(timeout * 1000)) if timeout else None
+            client = genai.Client(api_key=self.google_api_key, http_options=http_options)
+
+            # 予算が設定されている場合は、入力分を差し引いた残りを出力トークン数の上限にする（入力は 4 文字 = 1 トークンで概算）
+            budget = UsageBudget(self.model_name, max_tokens=self.token_budget, max_cost_usd=self.cost_budget)
+            max_output_tokens = max_tokens if max_tokens is not None else self.max_tokens
+            remaining = budget.remaining_output_tokens(len(message) // 4)
+            if remaining is not None:
+                if remaining <= 0:
+                    logger.error("実行予算が不足しているため生成を行いません")
+                    return {
+                        "status": "error",
+                        "message": "実行予算が不足しているため生成を行いません",
+                        "budget_exceeded": True,
+                        "searched_at": datetime.now().isoformat(),
+                    }
+                max_output_tokens = min(max_output_tokens, remaining) if max_output_tokens else remaining
+
+            # メッセージを送信（カセット使用時は応答を記録・再生）
+            cassette = get_cassette()
+            if cassette and cassette.replaying:
+                interaction = cassette.next("gemini", report_type or "default", fingerprint(message))
+                cassette.wait(interaction["elapsed"])
+                response = genai_types.GenerateContentResponse.model_validate(interaction["response"])
+            else:
+                started = time.monotonic()
+                response = self._generate_content(client, message, max_output_tokens)
+                if cassette and cassette.recording:
+                    cassette.record(
+                        "gemini",
+                        report_type or "default",
+                        {
+                            "fingerprint": fingerprint(message),
+                            "elapsed": round(time.monotonic() - started, 4),
+                            "response": response.model_dump(mode="json", exclude_none=True),
+                        },
+                    )
+            budget.add(**self._extract_usage(response))
+            usage_info = {"usage": budget.usage, "cost_usd": budget.cost_usd}
 
             # レスポンスの確認
             if not response.text:
@@ -45,6 +148,7 @@ class GeminiClient:
                     "status": "error",
                     "message": "Geminiからの応答が空です",
                     "searched_at": datetime.now().isoformat(),
+                    **usage_info,
                 }
 
             return {
@@ -52,6 +156,7 @@ class GeminiClient:
                 "content": response.text,
                 "searched_at": datetime.now().isoformat(),
                 "model": self.model_name,
+                **usage_info,
             }
 
         except Exception as e:
@@ -1,11 +1,30 @@
 import json
 import logging
-from typing import Any, Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
 import requests
+from requests.structures import CaseInsensitiveDict
+
+from ..utils.cassette import fingerprint, get_cassette
+from ..utils.rate_limiter import MAX_RATE_LIMIT_RETRIES, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# GitHub のラベル名の最大長
+MAX_LABEL_LENGTH = 50
+
+# Issue 作成とラベル付けを 1 リクエストで行う GraphQL ミューテーション
+CREATE_ISSUE_MUTATION = """
+mutation($repositoryId: ID!, $title: String!, $body: String!, $labelIds: [ID!]) {
+  createIssue(input: {repositoryId: $repositoryId, title: $title, body: $body, labelIds: $labelIds}) {
+    issue { id number url }
+  }
+}
+"""
+
 
 class GitHubClient:
     """GitHubクライアントクラス"""
@@ -19,6 +38,183 @@ class GitHubClient:
             "Content-Type": "application/json",
         }
         self.base_url = f"https://api.github.com/repos/{repo}"
+        self.graphql_url = "https://api.github.com/graphql"
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+
+        # ラベルキャッシュ（小文字のラベル名 -> ラベル情報）と、ページごとの URL・ETag・ラベル一覧
+        self._labels_cache: Dict[str, Dict[str, Any]] = {}
+        self._label_pages: List[Dict[str, Any]] = []
+        self._repository_id: Optional[str] = None
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        GitHub API へリクエストを送信（カセット使用時はリクエスト・レスポンスを記録・再生）
+
+        レート制限の許可を取得してから送信し、レスポンスヘッダのレート制限情報を反映する（セカンダリレート制限で拒否された場合は再試行）
+        """
+        cassette = get_cassette()
+        request_fingerprint = fingerprint(kwargs.get("params"), kwargs.get("data"))
+        if cassette and cassette.replaying:
+            interaction = cassette.next("github", f"{method} {url}", request_fingerprint)
+            cassette.wait(interaction["elapsed"])
+            response = requests.Response()
+            response.status_code = interaction["status_code"]
+            response.headers = CaseInsensitiveDict(interaction["headers"])
+            response._content = interaction["body"].encode("utf-8")
+            response.encoding = "utf-8"
+            response.url = url
+            return response
+
+        limiter = get_rate_limiter()
+        started = time.monotonic()
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            limiter.acquire("github")
+            response = self.session.request(method, url, **kwargs)
+            if not limiter.update_from_headers("github", response.headers, response.status_code) or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            logger.warning(f"GitHub API のレート制限により再試行します ({attempt + 1}/{MAX_RATE_LIMIT_RETRIES}): {method} {url}")
+        if cassette and cassette.recording:
+            cassette.record(
+                "github",
+                f"{method} {url}",
+                {
+                    "fingerprint": request_fingerprint,
+                    "elapsed": round(time.monotonic() - started, 4),
+                    "status_code": response.status_code,
+                    "headers": dict(response.headers),
+                    "body": response.text,
+                },
+            )
+        return response
+
+    @staticmethod
+    def normalize_label(label: str) -> str:
+        """GitHub のラベル名の制約に合わせて正規化"""
+        return str(label).strip()[:MAX_LABEL_LENGTH]
+
+    def get_repository_id(self) -> Optional[str]:
+        """GraphQL 用のレポジトリのノードIDを取得（キャッシュあり）"""
+        if self._repository_id:
+            return self._repository_id
+        try:
+            response = self._request("GET", self.base_url)
+            response.raise_for_status()
+            self._repository_id = response.json().get("node_id")
+            return self._repository_id
+        except Exception as e:
+            logger.warning(f"レポジトリIDの取得に失敗: {e}")
+            return None
+
+    def get_labels(self) -> Dict[str, Dict[str, Any]]:
+        """
+        レポジトリのラベル一覧を取得
+
+        ページごとの ETag で毎回検証し、変更がないページ (304) はキャッシュしたラベル一覧を使用する
+
+        Returns:
+            小文字のラベル名をキーとするラベル情報の辞書
+        """
+        try:
+            pages: List[Dict[str, Any]] = []
+            url: Optional[str] = f"{self.base_url}/labels"
+            while url:
+                cached = self._label_pages[len(pages)] if len(pages) < len(self._label_pages) else None
+                if cached and cached["url"] != url:
+                    cached = None
+                headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {}
+                params = {"per_page": 100} if not pages else None
+                response = self._request("GET", url, params=params, headers=headers)
+                if response.status_code == 304 and cached:
+                    page = cached
+                else:
+                    response.raise_for_status()
+                    page = {
+                        "url": url,
+                        "etag": response.headers.get("ETag"),
+                        "labels": response.json(),
+                        "next": response.links.get("next", {}).get("url"),
+                    }
+                pages.append(page)
+                url = page["next"]
+
+            modified = len(pages) != len(self._label_pages) or any(page is not cached for page, cached in zip(pages, self._label_pages))
+            self._label_pages = pages
+            self._labels_cache = {label["name"].lower(): label for page in pages for label in page["labels"]}
+            if modified:
+                logger.info(f"ラベル一覧を取得しました: {len(self._labels_cache)}件")
+            else:
+                logger.debug("ラベルキャッシュは最新です (304 Not Modified)")
+        except Exception as e:
+            logger.warning(f"ラベル一覧の取得に失敗（キャッシュを使用）: {e}")
+        return self._labels_cache
+
+    def _create_label(self, name: str) -> Optional[Dict[str, Any]]:
+        """ラベルを 1 件作成"""
+        try:
+            response = self._request("POST", f"{self.base_url}/labels", data=json.dumps({"name": name, "color": "ededed"}))
+            if response.status_code == 201:
+                label: Dict[str, Any] = response.json()
+                logger.info(f"ラベルを作成しました: {name}")
+                return label
+            # 並行実行などで既に存在する場合
+            if response.status_code == 422:
+                logger.info(f"ラベルは既に存在します: {name}")
+                return None
+            logger.warning(f"ラベル作成に失敗: {name} - {response.status_code} {response.text}")
+        except Exception as e:
+            logger.warning(f"ラベル作成に失敗: {name} - {e}")
+        return None
+
+    def ensure_labels(self, labels: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        指定したラベルが存在することを保証し、不足分をまとめて事前作成
+
+        Args:
+            labels: ラベル名のリスト
+
+        Returns:
+            ラベル名をキーとするラベル情報の辞書（作成に失敗したラベルは含まない）
+        """
+        names = list(dict.fromkeys(self.normalize_label(label) for label in labels if label))
+        if not names:
+            return {}
+
+        # キャッシュがある場合も ETag で再検証（変更がなければ 304 のみ）
+        cache = self.get_labels()
+        missing = [name for name in names if name.lower() not in cache]
+        if missing:
+            # 不足ラベルを並行して作成
+            with ThreadPoolExecutor(max_workers=min(len(missing), 4)) as executor:
+                created = list(executor.map(self._create_label, missing))
+            for label in created:
+                if label:
+                    self._labels_cache[label["name"].lower()] = label
+            # 既に存在していた（422）ラベルがあればキャッシュを再検証
+            if any(label is None for label in created):
+                self.get_labels()
+
+        return {name: self._labels_cache[name.lower()] for name in names if name.lower() in self._labels_cache}
+
+    def _create_issue_graphql(self, title: str, body: str, label_ids: List[str]) -> Optional[Dict[str, Any]]:
+        """GraphQL の 1 リクエストで Issue 作成とラベル付けを実行"""
+        repository_id = self.get_repository_id()
+        if not repository_id:
+            return None
+
+        variables = {"repositoryId": repository_id, "title": title, "body": body, "labelIds": label_ids}
+        response = self._request("POST", self.graphql_url, data=json.dumps({"query": CREATE_ISSUE_MUTATION, "variables": variables}))
+        if response.status_code != 200:
+            logger.warning(f"GraphQL でのIssue作成に失敗: {response.status_code} - {response.text}")
+            return None
+
+        payload = response.json()
+        if payload.get("errors"):
+            logger.warning(f"GraphQL でのIssue作成に失敗: {payload['errors']}")
+            return None
+
+        issue = payload["data"]["createIssue"]["issue"]
+        return {"number": issue["number"], "html_url": issue["url"], "node_id": issue["id"]}
 
     def create_issue(
         self,
@@ -28,13 +224,29 @@ class GitHubClient:
     ) -> Dict[str, Any]:
         """GitHub Issueを作成"""
         try:
+            # ラベルを事前に用意し、可能であれば GraphQL の 1 リクエストで作成
+            label_info = self.ensure_labels(labels or [])
+            if label_info or not labels:
+                try:
+                    issue = self._create_issue_graphql(title, body, [label["node_id"] for label in label_info.values()])
+                    if issue:
+                        logger.info(f"Issue created: {issue['html_url']}")
+                        return issue
+                except Exception as e:
+                    logger.warning(f"GraphQL でのIssue作成に失敗、REST API で再試行します: {e}")
+                # タイムアウトや 5xx の場合は作成済みの可能性があるため、REST API で再作成する前に同じタイトルの Issue を確認
+                existing = self.find_issue(title)
+                if existing:
+                    logger.info(f"作成済みのIssueを使用します: {existing['html_url']}")
+                    return existing
+
             data = {
                 "title": title,
                 "body": body,
-                "labels": labels or [],
+                "labels": list(label_info.keys()) if label_info else [self.normalize_label(label) for label in labels or []],
             }
 
-            response = requests.post(f"{self.base_url}/issues", headers=self.headers, data=json.dumps(data))
+            response = self._request("POST", f"{self.base_url}/issues", data=json.dumps(data))
 
             if response.status_code != 201:
                 error_detail = response.text
@@ -45,11 +257,7 @@ class GitHubClient:
                 if response.status_code == 422:
                     logger.info("ラベルなしでIssue作成を再試行します...")
                     data_without_labels = {"title": title, "body": body}
-                    retry_response = requests.post(
-                        f"{self.base_url}/issues",
-                        headers=self.headers,
-                        data=json.dumps(data_without_labels),
-                    )
+                    retry_response = self._request("POST", f"{self.base_url}/issues", data=json.dumps(data_without_labels))
                     if retry_response.status_code == 201:
                         retry_data: Dict[str, Any] = retry_response.json()
                         logger.info(f"ラベルなしでIssue作成成功: {retry_data['html_url']}")
@@ -66,16 +274,59 @@ class GitHubClient:
             logger.error(f"Issue作成に失敗: {e}")
             return {"error": str(e)}
 
+    def find_issue(self, title: str, label: Optional[str] = None, since_hours: int = 24) -> Optional[Dict[str, Any]]:
+        """
+        直近に更新された Issue から同じタイトルの Issue を検索（作成の再試行で重複した Issue を作成しないため）
+
+        Returns:
+            Issue 情報（見つからない場合や取得に失敗した場合は None）
+        """
+        since = (datetime.now(timezone.utc) - timedelta(hours=since_hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        try:
+            issues = self.list_issues(label=self.normalize_label(label) if label else None, since=since)
+        except Exception as e:
+            logger.warning(f"Issue の検索に失敗: {e}")
+            return None
+        return next((issue for issue in issues if issue["title"] == title), None)
+
+    def list_issues(self, label: Optional[str] = None, since: Optional[str] = None, state: str = "all") -> List[Dict[str, Any]]:
+        """
+        Issue 一覧を取得（Pull Request を除く）
+
+        Args:
+            label: ラベルで絞り込み
+            since: この時刻（ISO 8601）以降に更新された Issue に絞り込み
+            state: open, closed, all
+
+        Returns:
+            Issue 情報のリスト
+
+        Raises:
+            requests.RequestException: 取得に失敗した場合
+        """
+        params: Dict[str, Any] = {"state": state, "per_page": 100}
+        if label:
+            params["labels"] = label
+        if since:
+            params["since"] = since
+
+        response = self._request("GET", f"{self.base_url}/issues", params=params)
+        response.raise_for_status()
+        issues: List[Dict[str, Any]] = response.json()
+        next_url = response.links.get("next", {}).get("url")
+        while next_url:
+            page = self._request("GET", next_url)
+            page.raise_for_status()
+            issues.extend(page.json())
+            next_url = page.links.get("next", {}).get("url")
+        return [issue for issue in issues if "pull_request" not in issue]
+
     def update_issue(self, issue_number: int, body: str) -> Dict[str, Any]:
         """Issueを更新"""
         try:
             data = {"body": body}
 
-            response = requests.patch(
-                f"{self.base_url}/issues/{issue_number}",
-                headers=self.headers,
-                data=json.dumps(data),
-            )
+            response = self._request("PATCH", f"{self.base_url}/issues/{issue_number}", data=json.dumps(data))
             response.raise_for_status()
 
             result: Dict[str, Any] = response.json()
@@ -20,13 +20,126 @@ class Settings(BaseSettings):
     model_name: str = os.getenv("MODEL_NAME", "claude-sonnet-4-20250514")
     max_tokens: Optional[int] = int(os.getenv("MAX_TOKENS")) if os.getenv("MAX_TOKENS") else None  # type: ignore[arg-type]
 
+    # 実行ごとの予算設定（超過した場合は生成を中断）
+    run_token_budget: Optional[int] = int(os.getenv("RUN_TOKEN_BUDGET")) if os.getenv("RUN_TOKEN_BUDGET") else None  # type: ignore[arg-type]
+    run_cost_budget: Optional[float] = float(os.getenv("RUN_COST_BUDGET")) if os.getenv("RUN_COST_BUDGET") else None  # type: ignore[arg-type]
+
+    # レポート検索インデックス設定（配信したレポートを STATE_DIR/report_index に追加するか、ベクトル検索に使用する Gemini の埋め込みモデル。空の場合は BM25 のみ）
+    report_index: bool = os.getenv("REPORT_INDEX", "true").lower() == "true"
+    report_index_embedding_model: str = os.getenv("REPORT_INDEX_EMBEDDING_MODEL", "")
+
+    # シャーディング設定（シャードごとの結果マニフェストの保存先。未指定の場合は STATE_DIR/shards）
+    shard_manifest_dir: str = os.getenv("SHARD_MANIFEST_DIR", "")
+
+    # ターン予算設定（レポートタイプ別の上限は mcp/mcp_servers.yaml の report_budgets。最大ターン数に対してこの割合に達するとレポートをまとめさせる）
+    turn_budget_wrap_up_ratio: float = float(os.getenv("TURN_BUDGET_WRAP_UP_RATIO", "0.8"))
+
     # GitHub設定
     github_token: str = os.getenv("GITHUB_TOKEN", "")
     github_repo: str = os.getenv("GITHUB_REPOSITORY", "Yagami360/ai-tech-catchup-agent")
 
+    # 配信設定
+    # 追加で配信する GitHub レポジトリ（カンマ区切り、例: "owner/repo1,owner/repo2"）
+    publish_github_repos: str = os.getenv("PUBLISH_GITHUB_REPOS", "")
+    # レポートを Markdown / JSON で保存するローカルディレクトリ
+    publish_archive_dir: str = os.getenv("PUBLISH_ARCHIVE_DIR", "")
+    # レポートを JSON で POST する Webhook URL（カンマ区切り）
+    publish_webhook_urls: str = os.getenv("PUBLISH_WEBHOOK_URLS", "")
+    publish_max_retries: int = int(os.getenv("PUBLISH_MAX_RETRIES", "3"))
+
     # MCP設定
     # カンマ区切りで有効にする MCP サーバーを指定（例: "github,slack"）
     enabled_mcp_servers: str = os.getenv("ENABLED_MCP_SERVERS", "")
+    # daemon / serve モードで MCP サーバーを常駐させ、セッション間で共有するか
+    mcp_shared_servers: bool = os.getenv("MCP_SHARED_SERVERS", "false").lower() == "true"
+
+    # 状態保存設定（ジョブ状態やキャッシュなどの保存先ディレクトリ）
+    state_dir: str = os.getenv("STATE_DIR", ".state")
+
+    # ログ設定
+    log_file: str = os.getenv("LOG_FILE", "ai_agent.log")
+    log_max_bytes: int = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    log_backup_count: int = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    # ログファイルの形式（json: JSON Lines, text: テキスト）
+    log_format: str = os.getenv("LOG_FORMAT", "json")
+    # プロンプトや応答の全文をコンテンツストア（STATE_DIR/log_content）に保存するか
+    log_spill_content: bool = os.getenv("LOG_SPILL_CONTENT", "false").lower() == "true"
+
+    # デーモン設定
+    daemon_schedule_file: str = os.getenv("DAEMON_SCHEDULE_FILE", "schedules/schedules.yaml")
+    daemon_max_concurrency: int = int(os.getenv("DAEMON_MAX_CONCURRENCY", "1"))
+    daemon_poll_interval: float = float(os.getenv("DAEMON_POLL_INTERVAL", "30"))
+
+    # API サーバー設定（serve モード）
+    serve_host: str = os.getenv("SERVE_HOST", "127.0.0.1")
+    serve_port: int = int(os.getenv("SERVE_PORT", "8080"))
+    serve_max_workers: int = int(os.getenv("SERVE_MAX_WORKERS", "2"))
+    serve_max_pending: int = int(os.getenv("SERVE_MAX_PENDING", "16"))
+    serve_result_ttl: float = float(os.getenv("SERVE_RESULT_TTL", "3600"))
+
+    # レポートパイプライン設定（generate ステージの同時実行数、ステージ間キューの最大長）
+    pipeline_generate_concurrency: int = int(os.getenv("PIPELINE_GENERATE_CONCURRENCY", "1"))
+    pipeline_queue_size: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+
+    # 調査・執筆の分割設定（期間ごとの調査結果を複数のレポートで再利用、レポートの出力言語）
+    research_reuse: bool = os.getenv("RESEARCH_REUSE", "false").lower() == "true"
+    # 作成時点で終了していなかった期間（今日までの期間など）の調査結果を再利用する期間（時間）
+    research_max_age_hours: float = float(os.getenv("RESEARCH_MAX_AGE_HOURS", "6"))
+    report_language: str = os.getenv("REPORT_LANGUAGE", "日本語")
+    # 2 階層モード（調査フェーズを高速・低コストのモデルで実行し、MODEL_NAME のモデルは候補のリストから執筆のみ行う。空で無効）
+    tiered_gather_model: str = os.getenv("TIERED_GATHER_MODEL", "")
+
+    # ウォーターマーク設定（前回成功したレポート以降を調査期間とする場合に遡る最大日数）
+    watermark_max_days: int = int(os.getenv("WATERMARK_MAX_DAYS", "7"))
+
+    # 情報源レジストリ設定（停止中とみなす連続エラー回数、常駐モードのヘルスチェック間隔（秒、0 で無効）、同時実行数、優先表示する件数）
+    source_down_threshold: int = int(os.getenv("SOURCE_DOWN_THRESHOLD", "3"))
+    source_probe_interval: float = float(os.getenv("SOURCE_PROBE_INTERVAL", "3600"))
+    source_probe_concurrency: int = int(os.getenv("SOURCE_PROBE_CONCURRENCY", "8"))
+    source_rank_top_n: int = int(os.getenv("SOURCE_RANK_TOP_N", "10"))
+
+    # リンク検証設定（annotate: リンク切れに注記, drop: リンク切れを含む項目を削除, off: 検証しない）
+    link_validation: str = os.getenv("LINK_VALIDATION", "annotate")
+    link_validation_concurrency: int = int(os.getenv("LINK_VALIDATION_CONCURRENCY", "32"))
+    link_validation_per_host: int = int(os.getenv("LINK_VALIDATION_PER_HOST", "2"))
+    link_validation_timeout: float = float(os.getenv("LINK_VALIDATION_TIMEOUT", "10"))
+    link_cache_ttl: float = float(os.getenv("LINK_CACHE_TTL", "86400"))
+
+    # レート制限設定（プロバイダごとの 1 分あたりのリクエスト数・トークン数（0 で制限なし）、複数プロセスで共有する状態ファイル（空で共有しない）、
+    # レポートタイプ別の優先度（小さいほど優先））
+    rate_limit_anthropic_rpm: float = float(os.getenv("RATE_LIMIT_ANTHROPIC_RPM", "50"))
+    rate_limit_anthropic_tpm: float = float(os.getenv("RATE_LIMIT_ANTHROPIC_TPM", "0"))
+    rate_limit_gemini_rpm: float = float(os.getenv("RATE_LIMIT_GEMINI_RPM", "0"))
+    rate_limit_gemini_tpm: float = float(os.getenv("RATE_LIMIT_GEMINI_TPM", "0"))
+    rate_limit_github_rpm: float = float(os.getenv("RATE_LIMIT_GITHUB_RPM", "80"))
+    rate_limit_state_file: str = os.getenv("RATE_LIMIT_STATE_FILE", "")
+    rate_limit_priorities: str = os.getenv(
+        "RATE_LIMIT_PRIORITIES", "report:0,test_report:0,weekly_report:1,monthly_report:1,research:1,topic_report:2,topic_index:2"
+    )
+
+    # Claude のバックエンド（code: Claude Code CLI, api: Claude API を直接呼び出し（サーバーツールの Web 検索・Web 取得）,
+    # auto: MCP サーバーを使用しない場合のみ api）
+    claude_backend: str = os.getenv("CLAUDE_BACKEND", "code")
+
+    # バッチモード設定（Message Batch の処理状況のポーリング間隔（秒）。終了するまで最大間隔まで倍増）
+    batch_poll_interval: float = float(os.getenv("BATCH_POLL_INTERVAL", "30"))
+    batch_poll_max_interval: float = float(os.getenv("BATCH_POLL_MAX_INTERVAL", "300"))
+
+    # 重複実行の防止設定（同じ期間のレポートが作成済み・実行中の場合に生成しないか、実行中の同じレポートの完了を待つ最大秒数、
+    # 既存 Issue の検索結果のキャッシュの有効期間（秒））
+    run_guard: bool = os.getenv("RUN_GUARD", "true").lower() == "true"
+    run_attach_timeout: float = float(os.getenv("RUN_ATTACH_TIMEOUT", "3600"))
+    issue_lookup_ttl: float = float(os.getenv("ISSUE_LOOKUP_TTL", "600"))
+
+    # 実行パラメータ設定（1 回の生成のタイムアウト（秒、0 で無制限）、manual: 設定値を使用, auto: 実行履歴から generate ステージの同時実行数・
+    # タイムアウト・最大出力トークン数を自動調整、自動調整で目標とする 1 回の実行の所要時間（秒））
+    generate_timeout: float = float(os.getenv("GENERATE_TIMEOUT", "3600"))
+    run_tuning: str = os.getenv("RUN_TUNING", "manual")
+    run_target_seconds: float = float(os.getenv("RUN_TARGET_SECONDS", "1800"))
+
+    # プロファイル設定（--profile の結果の保存先（未設定の場合は STATE_DIR/profiles）、スタックのサンプリング間隔（秒））
+    profile_dir: str = os.getenv("PROFILE_DIR", "")
+    profile_interval: float = float(os.getenv("PROFILE_INTERVAL", "0.005"))
 
     # プロンプト設定（レポートタイプ別のニュース件数）
     news_count: int = int(os.getenv("NEWS_COUNT", "10"))
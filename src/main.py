@@ -3,27 +3,280 @@ AI Tech Catchup Agent メインアプリケーション
 """
 
 import argparse
+import asyncio
+import atexit
 import logging
 import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
 
-from .agent import AITechCatchupAgent
+from .agent import AITechCatchupAgent, ShardManifestStore, build_index_issue, parse_shard, select_shard, sweep_id
+from .agent.ai_tech_catchup_agent import create_report_index, sync_report_index
+from .client import GitHubClient
 from .config import settings
+from .publisher import create_default_publisher
+from .scheduler import ReportScheduler
+from .server import ReportIndexMCPServer, ReportJobService, run_server
+from .utils import (
+    Cassette,
+    MCPServerManager,
+    Profiler,
+    PromptManager,
+    RunHistory,
+    SourceRegistry,
+    UsageLedger,
+    setup_logging,
+    summarize_payload,
+    use_cassette,
+    use_profiler,
+    use_stderr_console,
+)
+from .utils.report_index import format_results
 
-# ログ設定
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("ai_agent.log"), logging.StreamHandler(sys.stdout)],
+# ログ設定（バックグラウンドスレッドで書き込み、サイズでローテーション）
+setup_logging(
+    log_file=settings.log_file,
+    max_bytes=settings.log_max_bytes,
+    backup_count=settings.log_backup_count,
+    log_format=settings.log_format,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def run_resident(args: argparse.Namespace, enabled_mcp_servers: list, create_issue: bool) -> None:
+    """常駐モード（daemon: スケジューラ, serve: HTTP API サーバー）を実行"""
+    # MCP サーバーを常駐させてセッション間で共有
+    mcp_manager = None
+    if settings.mcp_shared_servers and enabled_mcp_servers:
+        mcp_manager = MCPServerManager()
+        mcp_manager.start_shared_servers(enabled_mcp_servers)
+
+    # key_urls の情報源を定期的にヘルスチェック
+    source_registry = None
+    if settings.source_probe_interval > 0:
+        source_registry = SourceRegistry(str(Path(settings.state_dir) / "sources.json"), down_threshold=settings.source_down_threshold)
+        source_registry.start_background_probes(
+            PromptManager().get_source_urls(), interval=settings.source_probe_interval, concurrency=settings.source_probe_concurrency
+        )
+
+    try:
+        if args.mode == "daemon":
+            scheduler = ReportScheduler(
+                schedule_path=args.schedule_file,
+                state_path=str(Path(settings.state_dir) / "scheduler_state.json"),
+                max_concurrency=args.max_concurrency,
+                poll_interval=settings.daemon_poll_interval,
+                enabled_mcp_servers=enabled_mcp_servers,
+                create_issue=create_issue,
+                model=args.model,
+                max_tokens=args.max_tokens,
+            )
+            try:
+                asyncio.run(scheduler.run_forever())
+            except KeyboardInterrupt:
+                logger.info("スケジューラを停止しました")
+        else:
+            service = ReportJobService(
+                max_workers=settings.serve_max_workers,
+                max_pending=settings.serve_max_pending,
+                result_ttl=settings.serve_result_ttl,
+                enabled_mcp_servers=enabled_mcp_servers,
+                model=args.model,
+                max_tokens=args.max_tokens,
+                create_issue=create_issue,
+            )
+            run_server(service, host=args.host, port=args.port)
+    finally:
+        if mcp_manager is not None:
+            mcp_manager.stop_shared_servers()
+        if source_registry is not None:
+            source_registry.stop_background_probes()
+
+
+def run_mcp_command(action: str, enabled_mcp_servers: list, force: bool = False) -> None:
+    """MCP サーバー管理コマンドを実行"""
+    mcp_manager = MCPServerManager()
+    server_names = enabled_mcp_servers or mcp_manager.list_available_servers()
+
+    if action == "serve":
+        started = mcp_manager.start_shared_servers(server_names)
+        if not started:
+            logger.error("shared_port が設定された stdio の MCP サーバーがありません")
+            sys.exit(1)
+        logger.info(f"共有 MCP サーバーを常駐起動しました: {', '.join(started)}（Ctrl+C で停止）")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            mcp_manager.stop_shared_servers()
+        return
+
+    if action == "tools":
+        catalog = mcp_manager.build_tool_catalog(server_names)
+        for name in server_names:
+            if name not in catalog:
+                continue
+            logger.info(f"[{name}] {len(catalog[name]['tools'])} tools, 推定 {catalog[name]['total_tokens']} トークン")
+            for tool in catalog[name]["tools"]:
+                logger.info(f"  {tool['full_name']}: {tool['schema_chars']} chars (推定 {tool['estimated_tokens']} トークン)")
+        # レポートタイプ別に実行時のコンテキストへ追加されるツール定義のトークン数
+        for report_type in ("report", "weekly_report", "monthly_report", "topic_report", "test_report"):
+            usage = mcp_manager.estimate_tool_tokens(server_names, report_type)
+            logger.info(f"[{report_type}] 公開ツール {usage['exposed_tools']}個, 推定 {usage['estimated_tokens']} トークン/ターン")
+        return
+
+    if action == "warmup":
+        results = mcp_manager.warmup(server_names, force=force)
+    else:
+        results = {name: mcp_manager.measure_latency(name) for name in server_names}
+
+    for name, result in results.items():
+        if result["status"] == "success":
+            timings = ", ".join(f"{key}={result[key]}" for key in ("spawn_ms", "handshake_ms", "total_ms", "connect_ms") if key in result)
+            installed = "installed" if mcp_manager.is_installed(name) else "not installed"
+            logger.info(f"[{name}] {timings} ({installed})")
+        else:
+            logger.error(f"[{name}] {result['message']}")
+    sys.exit(0 if all(result["status"] == "success" for result in results.values()) else 1)
+
+
+def run_sources_command() -> None:
+    """key_urls の情報源をヘルスチェックし、優先順位と停止中の情報源を表示"""
+    registry = SourceRegistry(str(Path(settings.state_dir) / "sources.json"), down_threshold=settings.source_down_threshold)
+    urls = PromptManager().get_source_urls()
+    registry.probe_all(urls, concurrency=settings.source_probe_concurrency)
+
+    ranked, suppressed = registry.rank(urls)
+    for url in ranked + suppressed:
+        stats = registry.stats(url)
+        score = f"{stats['score']:.3f}" if stats["score"] is not None else "-"
+        logger.info(
+            f"{'[DOWN] ' if stats['down'] else ''}{url}: score={score}, latency={stats['latency_ms']}ms, "
+            f"error_rate={stats['error_rate']}, cadence={stats['cadence_hours']}h"
+        )
+
+
+def run_index_command(action: str, query: Optional[str], k: int) -> None:
+    """レポート検索インデックスの操作（sync: GitHub の Issue から差分同期, search: 検索, serve: stdio の MCP サーバーとして起動）"""
+    report_index = create_report_index()
+
+    if action == "serve":
+        ReportIndexMCPServer(report_index, default_k=k).serve()
+        return
+
+    if action == "search":
+        if not query:
+            logger.error("search を使用する場合は --query オプションで検索クエリを指定してください")
+            sys.exit(1)
+        results = report_index.search(query, k=k)
+        for line in format_results(results).splitlines():
+            logger.info(line)
+        return
+
+    result = sync_report_index(report_index, GitHubClient(token=settings.github_token, repo=settings.github_repo))
+    if result["status"] != "success":
+        sys.exit(1)
+    logger.info(f"レポート検索インデックスを同期しました: 追加・更新 {result['synced']} 件 (合計 {result['reports']} 件, {result['chunks']} チャンク)")
+
+
+def load_topics(topic: Optional[str], topic_file: Optional[str]) -> List[str]:
+    """--topic（カンマ区切り）と --topic-file（1 行 1 トピック、# 以降はコメント）からトピックの一覧を取得"""
+    topics = [t.strip() for t in topic.split(",") if t.strip()] if topic else []
+    if topic_file:
+        for line in Path(topic_file).read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                topics.append(line)
+    return topics
+
+
+def run_merge_shards_command(manifest_dir: str, sweep: Optional[str], create_issue: bool) -> None:
+    """シャードごとの結果マニフェストを統合し、トピック別レポートの一覧（インデックス Issue）を作成"""
+    store = ShardManifestStore(manifest_dir)
+    merged = store.merge(sweep)
+    if merged is None:
+        logger.error(f"統合するマニフェストがありません: {manifest_dir}")
+        sys.exit(1)
+
+    summary_path = store.save_summary(merged)
+    logger.info(
+        f"シャードの結果を統合しました: sweep={merged['sweep_id']}, シャード {merged['shards'] - len(merged['missing_shards'])}/{merged['shards']}, "
+        f"成功 {merged['succeeded']} 件, 失敗 {merged['failed']} 件 ({summary_path})"
+    )
+    if merged["missing_shards"]:
+        logger.warning(f"結果が未登録のシャード: {merged['missing_shards']}")
+    for result in merged["results"]:
+        if result.get("status") != "success":
+            logger.warning(f"[{result['topic']}] {result.get('message', '')}")
+
+    published = True
+    if create_issue:
+        issue = build_index_issue(merged)
+        publisher = create_default_publisher(GitHubClient(token=settings.github_token, repo=settings.github_repo))
+        publish_result = publisher.publish(
+            {"report_type": "topic_index", **issue, "content": issue["body"], "topic": None, "created_at": datetime.now().isoformat()}
+        )
+        published = publish_result["status"] != "error"
+        if publish_result.get("issue_url"):
+            logger.info(f"インデックスIssueを作成しました: {publish_result['issue_url']}")
+        elif not published:
+            logger.error(f"インデックスIssue作成エラー: {publish_result['message']}")
+
+    sys.exit(0 if published and not merged["missing_shards"] and merged["failed"] == 0 else 1)
+
+
+def show_usage_summary(group_by: list, since: Optional[str]) -> None:
+    """利用量台帳の集計を表示"""
+    ledger = UsageLedger(str(Path(settings.state_dir) / "usage_ledger.jsonl"))
+    rows = ledger.summarize(group_by=[key.strip() for key in group_by], since=since)
+    if not rows:
+        logger.info("利用量の記録がありません")
+        return
+
+    total_cost = 0.0
+    for row in rows:
+        keys = " / ".join(str(row[key.strip()]) for key in group_by)
+        latency = f", avg_latency={row['avg_latency_ms'] / 1000:.1f}s" if row["avg_latency_ms"] is not None else ""
+        logger.info(
+            f"{keys}: runs={row['runs']}, input={row['input_tokens']}, output={row['output_tokens']}, "
+            f"cache_read={row['cache_read_input_tokens']}, cache_write={row['cache_creation_input_tokens']}, cost=${row['cost_usd']:.4f}{latency}"
+        )
+        total_cost += row["cost_usd"]
+    logger.info(f"合計コスト: ${total_cost:.4f}")
+
+
+def show_tuning(model: Optional[str]) -> None:
+    """実行履歴の統計と、レポートタイプ・モデルごとの実行パラメータの推奨値と設定値を表示"""
+    history = RunHistory(str(Path(settings.state_dir) / "run_history.jsonl"))
+    keys = [(report_type, model_name) for report_type, model_name in history.keys() if not model or model_name == model]
+    if not keys:
+        logger.info("実行履歴がありません")
+        return
+
+    configured = {
+        "generate_concurrency": settings.pipeline_generate_concurrency,
+        "generate_timeout": settings.generate_timeout or None,
+        "max_tokens": settings.max_tokens,
+    }
+    for report_type, model_name in keys:
+        stats = history.stats(report_type, model_name)
+        logger.info(
+            f"{report_type} / {model_name}: runs={stats['runs']}, failure_rate={stats['failure_rate']}, "
+            f"generate p50={stats['generate_p50']}s p95={stats['generate_p95']}s, output_tokens p95={stats['output_tokens_p95']}, "
+            f"avg_tool_calls={stats['avg_tool_calls']}, items_per_run={stats['items_per_run']}"
+        )
+        recommended = history.recommend(report_type, model_name, settings.run_target_seconds, configured)
+        for name, value in configured.items():
+            mark = " *" if recommended[name] != value else ""
+            logger.info(f"    {name}: 推奨 {recommended[name]} / 設定値 {value if value is not None else '未設定'}{mark}")
+    logger.info(f"RUN_TUNING={settings.run_tuning}, 目標実行時間 RUN_TARGET_SECONDS={settings.run_target_seconds} 秒（* は設定値と異なる推奨値）")
+
+
 def main() -> None:
     """メイン関数"""
-    logger.info("Started AI Tech Catchup Agent")
-    logger.debug(f"settings: {settings}")
-
     parser = argparse.ArgumentParser(
         description="AI Tech Catchup Agent - 最新AI技術動向レポート生成ツール",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -31,8 +284,16 @@ def main() -> None:
     parser.add_argument(
         "mode",
         nargs="?",
-        choices=["weekly", "monthly", "topic", "test"],
-        help="レポートモード (weekly: 週次, monthly: 月次, topic: トピック別, test: テスト。指定なし: 最新)",
+        choices=["weekly", "monthly", "topic", "test", "daemon", "serve", "mcp", "usage", "tune", "sources", "merge-shards", "index"],
+        help="レポートモード (weekly: 週次, monthly: 月次, topic: トピック別, test: テスト, daemon: 常駐スケジューラ, serve: HTTP API サーバー, "
+        "mcp: MCP サーバー管理, usage: 利用量の集計, tune: 実行パラメータの推奨値と設定値の比較, sources: 情報源のヘルスチェック, merge-shards: シャードの結果の統合, index: レポート検索インデックス。指定なし: 最新)",
+    )
+    parser.add_argument(
+        "mcp_action",
+        nargs="?",
+        choices=["warmup", "status", "serve", "tools", "sync", "search"],
+        help="mcp モードの操作 (warmup: 事前インストールとレイテンシ計測, status: レイテンシ計測, serve: 共有 MCP サーバーを常駐起動, tools: ツール一覧とスキーマサイズ), "
+        "index モードの操作 (sync: GitHub の Issue から差分同期, search: 検索, serve: 検索ツールを stdio の MCP サーバーとして起動)",
     )
     parser.add_argument(
         "--model",
@@ -58,7 +319,42 @@ def main() -> None:
         "--topic",
         type=str,
         default=None,
-        help="トピック別レポートのトピック名（例: RAG, Claude Code, Vision-Language Models）",
+        help="トピック別レポートのトピック名（例: RAG, Claude Code, Vision-Language Models）。カンマ区切りで複数指定するとパイプラインでまとめて生成",
+    )
+    parser.add_argument(
+        "--topic-file",
+        type=str,
+        default=None,
+        help="トピック別レポートのトピック一覧ファイル（1 行 1 トピック、# 以降はコメント）",
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        metavar="I/N",
+        help="トピック一覧を N 個のシャードに分割し、I 番目（1 始まり）のシャードのみを実行して結果マニフェストを保存",
+    )
+    parser.add_argument(
+        "--manifest-dir",
+        type=str,
+        default=settings.shard_manifest_dir or str(Path(settings.state_dir) / "shards"),
+        help="シャードの結果マニフェストの保存先（merge-shards モードでは統合するマニフェストのディレクトリ）",
+    )
+    parser.add_argument(
+        "--sweep",
+        type=str,
+        default=None,
+        help="merge-shards モードで統合する一括実行の ID（デフォルト: 最新の一括実行）",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Message Batches API でまとめて生成（Claude モデルのみ。中断した場合は同じ引数で再実行すると送信済みのバッチを再開）",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="同じ期間のレポートが作成済み・実行中でも生成する（定期実行と手動実行の重複防止を無効化）。mcp warmup ではウォームアップ済みのサーバーも再解決・再インストールする",
     )
     parser.add_argument(
         "--no-issue",
@@ -71,9 +367,98 @@ def main() -> None:
         default=None,
         help="有効にする MCP サーバー（カンマ区切り、例: github,slack",
     )
+    parser.add_argument(
+        "--schedule-file",
+        type=str,
+        default=settings.daemon_schedule_file,
+        help=f"daemon モードのスケジュール設定ファイル (デフォルト: {settings.daemon_schedule_file})",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=settings.daemon_max_concurrency,
+        help=f"daemon モードの同時実行数の上限 (デフォルト: {settings.daemon_max_concurrency})",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default=settings.serve_host,
+        help=f"serve モードの待ち受けアドレス (デフォルト: {settings.serve_host})",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=settings.serve_port,
+        help=f"serve モードの待ち受けポート (デフォルト: {settings.serve_port})",
+    )
+    parser.add_argument(
+        "--group-by",
+        type=str,
+        default="day,report_type,model",
+        help="usage モードの集計キー（カンマ区切り、day, report_type, model, topic, backend, tier）",
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="usage モードで集計する開始日（YYYY-MM-DD）",
+    )
+    parser.add_argument(
+        "--query",
+        type=str,
+        default=None,
+        help="index search の検索クエリ",
+    )
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=5,
+        help="index search / serve で取得するチャンク数 (デフォルト: 5)",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        metavar="CASSETTE",
+        help="LLM・GitHub API とのやり取りをカセットファイルに記録",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        metavar="CASSETTE",
+        help="カセットファイルのやり取りを再生（API を呼ばずにオフラインで実行）",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="サンプリングプロファイラ（asyncio タスク単位）と tracemalloc でプロセスの CPU・メモリ使用箇所を計測し、collapsed stack（フレームグラフ用）と割り当てレポートを PROFILE_DIR に保存",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        choices=["realtime", "max"],
+        default="realtime",
+        help="再生速度 (realtime: 記録時と同じ間隔, max: 待ち時間なし)",
+    )
     args = parser.parse_args()
     create_issue = not args.no_issue
 
+    # stdio の MCP サーバーとして起動する場合、標準出力は MCP の通信に使用するため、ログは標準エラー出力へ
+    if args.mode == "index" and args.mcp_action == "serve":
+        use_stderr_console()
+
+    logger.info("Started AI Tech Catchup Agent")
+
+    # プロファイル（終了時に結果を保存するため、以降のどの経路で終了しても停止する）
+    if args.profile:
+        profiler = Profiler(
+            settings.profile_dir or str(Path(settings.state_dir) / "profiles"), interval=settings.profile_interval, name=args.mode or "report"
+        )
+        profiler.start()
+        use_profiler(profiler)
+        atexit.register(profiler.stop)
+    logger.debug(f"settings: {settings}")
+
     # MCP サーバーの有効化（CLI引数または環境変数）
     enabled_mcp_servers = []
     if args.mcp_servers:
@@ -81,29 +466,107 @@ def main() -> None:
     elif settings.enabled_mcp_servers:
         enabled_mcp_servers = [s.strip() for s in settings.enabled_mcp_servers.split(",")]
 
+    # 利用量の集計
+    if args.mode == "usage":
+        show_usage_summary(args.group_by.split(","), args.since)
+        return
+
+    # 実行パラメータの推奨値
+    if args.mode == "tune":
+        show_tuning(args.model)
+        return
+
+    # レポート検索インデックス
+    if args.mode == "index":
+        if args.mcp_action not in (None, "sync", "search", "serve"):
+            logger.error(f"index モードでは {args.mcp_action} は使用できません")
+            sys.exit(1)
+        run_index_command(args.mcp_action or "sync", args.query, args.k)
+        return
+
+    # シャードの結果の統合
+    if args.mode == "merge-shards":
+        run_merge_shards_command(args.manifest_dir, args.sweep, create_issue)
+        return
+
+    # 情報源のヘルスチェック
+    if args.mode == "sources":
+        run_sources_command()
+        return
+
+    # MCP サーバー管理
+    if args.mode == "mcp":
+        if args.mcp_action in ("sync", "search"):
+            logger.error(f"mcp モードでは {args.mcp_action} は使用できません")
+            sys.exit(1)
+        run_mcp_command(args.mcp_action or "status", enabled_mcp_servers, force=args.force)
+        return
+
+    # 常駐モード実行（daemon / serve）
+    if args.mode in ("daemon", "serve"):
+        run_resident(args, enabled_mcp_servers, create_issue)
+        return
+
     # Agent 実行
+    topics: List[Optional[str]] = [args.topic]
+    all_topics: List[str] = []
+    if args.mode == "topic":
+        all_topics = load_topics(args.topic, args.topic_file)
+        if not all_topics:
+            logger.error("トピックモードを使用する場合は --topic または --topic-file オプションでトピック名を指定してください")
+            sys.exit(1)
+        topics = list(all_topics)
+
+    # シャーディング（トピック一覧のうち、このシャードに割り当てられたトピックのみを実行）
+    shard = None
+    if args.shard:
+        if args.mode != "topic":
+            logger.error("--shard はトピックモードでのみ指定できます")
+            sys.exit(1)
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+        topics = list(select_shard(all_topics, *shard))
+        logger.info(f"シャード {shard[0]}/{shard[1]}: {len(topics)}/{len(all_topics)} 件のトピックを実行します")
+
+    # カセットの記録・再生
+    if args.record and args.replay:
+        logger.error("--record と --replay は同時に指定できません")
+        sys.exit(1)
+    if args.batch and (args.record or args.replay):
+        logger.error("--batch と --record / --replay は同時に指定できません")
+        sys.exit(1)
+    cassette = None
+    if args.record or args.replay:
+        cassette = Cassette(args.record or args.replay, mode="record" if args.record else "replay", speed=args.replay_speed)
+        use_cassette(cassette)
+
     agent = AITechCatchupAgent(
         model=args.model,
         max_tokens=args.max_tokens,
         enabled_mcp_servers=enabled_mcp_servers,
     )
-    if args.mode == "weekly":
-        result = agent.weekly_report(create_issue=create_issue)
-    elif args.mode == "monthly":
-        result = agent.monthly_report(create_issue=create_issue)
-    elif args.mode == "topic":
-        if not args.topic:
-            logger.error("トピックモードを使用する場合は --topic オプションでトピック名を指定してください")
-            sys.exit(1)
-        result = agent.topic_report(topic=args.topic, create_issue=create_issue, news_count=args.news_count)
-    elif args.mode == "test":
-        result = agent.run_catchup(create_issue=create_issue, news_count=args.news_count, test_mode=True)
-    else:
-        result = agent.run_catchup(create_issue=create_issue, news_count=args.news_count, test_mode=False)
+    requests = [
+        {"mode": args.mode, "topic": topic, "news_count": args.news_count, "create_issue": create_issue, "force": args.force} for topic in topics
+    ]
+    try:
+        results = agent.run_batch(requests) if args.batch else agent.run_reports(requests)
+    finally:
+        if cassette:
+            cassette.save()
+
+    if shard:
+        ShardManifestStore(args.manifest_dir).write(sweep_id(all_topics, shard[1]), shard[0], shard[1], [str(topic) for topic in topics], results)
 
     # 結果を出力
-    logger.info(f"実行結果: {result}")
-    if result["status"] == "success":
+    for item in results:
+        log_result = dict(item)
+        if "content" in log_result:
+            log_result["content"] = summarize_payload(log_result["content"])
+        logger.info(f"実行結果: {log_result}")
+    if all(item["status"] == "success" for item in results):
         sys.exit(0)
     else:
         sys.exit(1)
@@ -0,0 +1,8 @@
+"""
+Publisher modules for AI Tech Catchup Agent
+"""
+
+from .report_publisher import ReportPublisher, create_default_publisher
+from .sinks import GitHubIssueSink, LocalArchiveSink, ReportSink, WebhookSink
+
+__all__ = ["ReportPublisher", "create_default_publisher", "ReportSink", "GitHubIssueSink", "LocalArchiveSink", "WebhookSink"]
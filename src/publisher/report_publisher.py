@@ -0,0 +1,111 @@
+"""
+レポート配信モジュール - 生成済みレポートを複数の出力先へ並行配信
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from ..client import GitHubClient
+from ..config import settings
+from .sinks import GitHubIssueSink, LocalArchiveSink, ReportSink, WebhookSink
+
+logger = logging.getLogger(__name__)
+
+
+class ReportPublisher:
+    """複数の出力先へレポートを並行配信するクラス"""
+
+    def __init__(self, sinks: List[ReportSink], max_retries: int = 3, retry_backoff: float = 2.0):
+        """
+        Args:
+            sinks: 出力先のリスト（先頭が主たる出力先）
+            max_retries: 出力先ごとの最大リトライ回数
+            retry_backoff: リトライ間隔の初期値（秒）。リトライごとに倍増
+        """
+        self.sinks = sinks
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    async def _publish_to_sink(self, sink: ReportSink, report: Dict[str, Any]) -> Dict[str, Any]:
+        """1 つの出力先へ配信（出力先ごとに独立してリトライ）"""
+        last_error = ""
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                result = await asyncio.to_thread(sink.publish, report)
+                logger.info(f"レポートを配信しました: {sink.name}")
+                return {"status": "success", "attempts": attempt, **result}
+            except Exception as e:
+                last_error = str(e)
+                if attempt <= self.max_retries:
+                    delay = self.retry_backoff * (2 ** (attempt - 1))
+                    logger.warning(f"配信に失敗、{delay:.1f}秒後に再試行します ({sink.name}, {attempt}回目): {e}")
+                    await asyncio.sleep(delay)
+
+        logger.error(f"配信に失敗しました: {sink.name} - {last_error}")
+        return {"status": "error", "attempts": self.max_retries + 1, "message": last_error}
+
+    async def publish_async(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        全出力先へ並行配信
+
+        Returns:
+            status: success（全成功）/ partial（一部失敗）/ error（全失敗）
+            results: 出力先名をキーとする配信結果
+            issue_url: 最初に成功した GitHub Issue の URL
+        """
+        if not self.sinks:
+            return {"status": "success", "results": {}}
+
+        outcomes = await asyncio.gather(*(self._publish_to_sink(sink, report) for sink in self.sinks))
+        results = {sink.name: outcome for sink, outcome in zip(self.sinks, outcomes)}
+
+        succeeded = [outcome for outcome in outcomes if outcome["status"] == "success"]
+        status = "success" if len(succeeded) == len(outcomes) else ("partial" if succeeded else "error")
+        publish_result: Dict[str, Any] = {"status": status, "results": results}
+
+        issue_url = next((outcome["html_url"] for outcome in succeeded if outcome.get("html_url")), None)
+        if issue_url:
+            publish_result["issue_url"] = issue_url
+        if status != "success":
+            publish_result["message"] = "; ".join(f"{name}: {r['message']}" for name, r in results.items() if r["status"] == "error")
+        return publish_result
+
+    def publish(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """全出力先へ並行配信（同期版）"""
+        return asyncio.run(self.publish_async(report))
+
+
+def _split_csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def create_default_publisher(github_client: Optional[GitHubClient] = None) -> ReportPublisher:
+    """
+    設定値から出力先を構築した ReportPublisher を作成
+
+    Args:
+        github_client: 主たる GitHub レポジトリのクライアント（先頭の出力先になる）
+    """
+    sinks: List[ReportSink] = []
+    if github_client is not None:
+        sinks.append(GitHubIssueSink(github_client))
+
+    primary_repo = github_client.repo if github_client is not None else None
+    for repo in _split_csv(settings.publish_github_repos):
+        if repo != primary_repo:
+            sinks.append(GitHubIssueSink(GitHubClient(token=settings.github_token, repo=repo)))
+
+    if settings.publish_archive_dir:
+        sinks.append(LocalArchiveSink(settings.publish_archive_dir))
+
+    # Webhook は "URL" または "名前=URL" で指定
+    for entry in _split_csv(settings.publish_webhook_urls):
+        name, separator, url = entry.partition("=")
+        if separator and not name.startswith(("http://", "https://")):
+            sinks.append(WebhookSink(url.strip(), name=name.strip()))
+        else:
+            sinks.append(WebhookSink(entry))
+
+    logger.info(f"レポートの出力先: {', '.join(sink.name for sink in sinks) or 'なし'}")
+    return ReportPublisher(sinks, max_retries=settings.publish_max_retries)
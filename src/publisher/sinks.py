@@ -0,0 +1,118 @@
+"""
+レポート出力先（シンク）モジュール - GitHub Issue、ローカルアーカイブ、Webhook への出力
+"""
+
+import hashlib
+import json
+import logging
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+
+from ..client import GitHubClient
+
+logger = logging.getLogger(__name__)
+
+
+class ReportSink(ABC):
+    """レポート出力先の基底クラス"""
+
+    name: str = "sink"
+
+    @abstractmethod
+    def publish(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        レポートを出力
+
+        Args:
+            report: レポート情報（title, body, labels, content, report_type など）
+
+        Returns:
+            出力結果。失敗時は例外を送出する（呼び出し側でリトライされる）
+        """
+
+
+class GitHubIssueSink(ReportSink):
+    """GitHub Issue 出力先"""
+
+    def __init__(self, github_client: GitHubClient):
+        self.github_client = github_client
+        self.name = f"github:{github_client.repo}"
+        # 作成に失敗したレポートのタイトル（再試行時に作成済みかを確認する）
+        self._failed_titles: Set[str] = set()
+
+    def publish(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        # タイムアウトや 5xx で失敗した場合も Issue は作成済みの可能性があるため、再試行時は同じタイトルの Issue を先に確認
+        if report["title"] in self._failed_titles:
+            labels = report.get("labels") or []
+            existing = self.github_client.find_issue(report["title"], label=labels[0] if labels else None)
+            if existing:
+                self._failed_titles.discard(report["title"])
+                logger.info(f"作成済みのIssueを使用します: {existing['html_url']}")
+                return {"html_url": existing.get("html_url", ""), "number": existing.get("number")}
+
+        issue_result = self.github_client.create_issue(
+            title=report["title"],
+            body=report["body"],
+            labels=report.get("labels"),
+        )
+        if "error" in issue_result:
+            self._failed_titles.add(report["title"])
+            raise RuntimeError(issue_result["error"])
+        self._failed_titles.discard(report["title"])
+        return {"html_url": issue_result.get("html_url", ""), "number": issue_result.get("number")}
+
+
+class LocalArchiveSink(ReportSink):
+    """ローカルディレクトリへの Markdown / JSON 出力先"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.name = f"archive:{directory}"
+
+    @staticmethod
+    def _slugify(text: str) -> str:
+        slug = re.sub(r"[^\w\-]+", "-", text, flags=re.UNICODE).strip("-").lower()
+        return slug[:60] or "report"
+
+    def publish(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        created_at = datetime.fromisoformat(report["created_at"]) if report.get("created_at") else datetime.now()
+        day_dir = self.directory / created_at.strftime("%Y-%m-%d")
+        day_dir.mkdir(parents=True, exist_ok=True)
+
+        stem = f"{created_at.strftime('%H%M%S')}-{report.get('report_type', 'report')}"
+        if report.get("topic"):
+            stem += f"-{self._slugify(report['topic'])}"
+
+        markdown_path = day_dir / f"{stem}.md"
+        json_path = day_dir / f"{stem}.json"
+        markdown_path.write_text(report["body"], encoding="utf-8")
+        json_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        return {"path": str(markdown_path), "json_path": str(json_path)}
+
+
+class WebhookSink(ReportSink):
+    """汎用 Webhook（JSON POST）出力先"""
+
+    def __init__(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0, name: Optional[str] = None):
+        """
+        Args:
+            url: POST 先の URL
+            headers: 追加のリクエストヘッダ
+            timeout: タイムアウト（秒）
+            name: 出力先名（未指定の場合はホスト名と URL のハッシュ。URL にトークンを含む Webhook があるため URL 全体は使用しない）
+        """
+        self.url = url
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+        self.name = f"webhook:{name}" if name else f"webhook:{urlparse(url).netloc}#{hashlib.sha256(url.encode('utf-8')).hexdigest()[:8]}"
+
+    def publish(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        response = requests.post(self.url, headers=self.headers, data=json.dumps(report, ensure_ascii=False).encode("utf-8"), timeout=self.timeout)
+        response.raise_for_status()
+        return {"status_code": response.status_code}
@@ -0,0 +1,8 @@
+"""
+Scheduler modules for AI Tech Catchup Agent
+"""
+
+from .cron import CronExpression
+from .report_scheduler import ReportScheduler
+
+__all__ = ["CronExpression", "ReportScheduler"]
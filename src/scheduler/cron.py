@@ -0,0 +1,103 @@
+"""
+cron 式モジュール - 5 フィールド形式（分 時 日 月 曜日）の cron 式を解析
+"""
+
+from datetime import datetime, timedelta
+from typing import Set
+
+# 探索の上限（閏年の 2/29 などを考慮して 5 年分）
+_SEARCH_LIMIT = timedelta(days=366 * 5)
+
+
+class CronExpression:
+    """cron 式クラス（ローカル時刻で評価）"""
+
+    def __init__(self, expression: str):
+        """
+        Args:
+            expression: cron 式（例: "0 9 * * 1" = 毎週月曜 9:00）。*, */n, a-b, a-b/n, カンマ区切りに対応
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 式は 5 フィールドで指定してください: {expression}")
+
+        self.expression = expression
+        self.minutes = self._parse_field(fields[0], 0, 59)
+        self.hours = self._parse_field(fields[1], 0, 23)
+        self.days = self._parse_field(fields[2], 1, 31)
+        self.months = self._parse_field(fields[3], 1, 12)
+        # 曜日は 0 と 7 をどちらも日曜日として扱う
+        self.weekdays = {day % 7 for day in self._parse_field(fields[4], 0, 7)}
+        self.day_restricted = fields[2] != "*"
+        self.weekday_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, minimum: int, maximum: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"cron 式のステップが不正です: {field}")
+
+            if part == "*":
+                start, end = minimum, maximum
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = maximum if step > 1 else start
+
+            if start < minimum or end > maximum or start > end:
+                raise ValueError(f"cron 式の値が範囲外です: {field} ({minimum}-{maximum})")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        # cron の慣例: 日と曜日の両方が指定された場合はどちらかに一致すればよい
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.isoweekday() % 7) in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def matches(self, dt: datetime) -> bool:
+        """指定時刻（分単位）が cron 式に一致するか"""
+        return dt.minute in self.minutes and dt.hour in self.hours and dt.month in self.months and self._day_matches(dt)
+
+    def next_after(self, dt: datetime) -> datetime:
+        """指定時刻より後の最初の実行時刻を取得"""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + _SEARCH_LIMIT
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"cron 式に一致する時刻が見つかりません: {self.expression}")
+
+    def previous_at_or_before(self, dt: datetime) -> datetime:
+        """指定時刻以前の直近の実行時刻を取得"""
+        t = dt.replace(second=0, microsecond=0)
+        limit = t - _SEARCH_LIMIT
+        while t > limit:
+            if t.month not in self.months:
+                t = t.replace(day=1, hour=0, minute=0) - timedelta(minutes=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) - timedelta(minutes=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) - timedelta(minutes=1)
+            elif t.minute not in self.minutes:
+                t -= timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"cron 式に一致する時刻が見つかりません: {self.expression}")
@@ -0,0 +1,183 @@
+"""
+レポートスケジューラモジュール - 常駐プロセス内で cron 形式のスケジュールに従いレポートを生成
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import yaml
+
+from ..agent import AITechCatchupAgent
+from ..utils.json_store import JSONStore
+from .cron import CronExpression
+
+logger = logging.getLogger(__name__)
+
+
+class ReportScheduler:
+    """
+    レポートスケジューラクラス
+
+    Agent（AI クライアント、GitHub クライアント、プロンプトテンプレート、各種キャッシュ）をワーカーごとにジョブ間で使い回し、
+    グローバルな同時実行数の上限付きのジョブキューで実行する（Agent は実行中の状態を持つため、ワーカー間では共有しない）。
+    ジョブの状態はファイルに永続化し、再起動時に同じ実行を重複させたり、停止中に予定されていた実行を取りこぼしたりしないようにする。
+    """
+
+    def __init__(
+        self,
+        schedule_path: str,
+        state_path: str,
+        max_concurrency: int = 1,
+        poll_interval: float = 30.0,
+        enabled_mcp_servers: Optional[List[str]] = None,
+        create_issue: bool = True,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        """
+        Args:
+            schedule_path: スケジュール設定ファイル（YAML）のパス
+            state_path: ジョブ状態を保存する JSON ファイルのパス
+            max_concurrency: 全ジョブ共通の同時実行数の上限
+            poll_interval: スケジュールの確認間隔（秒）
+            enabled_mcp_servers: 有効にする MCP サーバー名のリスト
+            create_issue: GitHub Issue を作成するか
+            model: ジョブでモデルが指定されていない場合に使用するモデル名
+            max_tokens: 最大トークン数
+        """
+        self.schedule_path = Path(schedule_path)
+        self.state_path = Path(state_path)
+        self.max_concurrency = max(1, max_concurrency)
+        self.poll_interval = poll_interval
+        self.enabled_mcp_servers = enabled_mcp_servers or []
+        self.create_issue = create_issue
+        self.model = model
+        self.max_tokens = max_tokens
+
+        self.jobs = self._load_jobs()
+        self._state_store = JSONStore(str(self.state_path), "ジョブ状態ファイル")
+        self.state = self._load_state()
+        self._agents: Dict[Tuple[str, int], AITechCatchupAgent] = {}
+        self._agents_lock = threading.Lock()
+        self._in_flight: Set[str] = set()
+
+    def _load_jobs(self) -> Dict[str, Dict[str, Any]]:
+        """スケジュール設定ファイルを読み込み"""
+        if not self.schedule_path.exists():
+            raise FileNotFoundError(f"スケジュール設定ファイルが見つかりません: {self.schedule_path}")
+
+        with open(self.schedule_path, "r", encoding="utf-8") as file:
+            config = yaml.safe_load(file) or {}
+
+        jobs: Dict[str, Dict[str, Any]] = {}
+        for name, job in (config.get("jobs") or {}).items():
+            if not job.get("enabled", True):
+                continue
+            if job.get("mode") == "topic" and not job.get("topic"):
+                logger.error(f"トピックジョブにはトピック名が必要です: {name}")
+                continue
+            jobs[name] = {**job, "cron": CronExpression(job["cron"])}
+        logger.info(f"スケジュールを読み込みました: {', '.join(jobs) or 'なし'}")
+        return jobs
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        """ジョブ状態ファイルを読み込み"""
+        return self._state_store.read()
+
+    def _save_state(self) -> None:
+        """ジョブ状態ファイルを保存（一時ファイル経由で原子的に置き換え）"""
+        self._state_store.write(self.state)
+
+    def _get_agent(self, model: Optional[str], worker: int) -> AITechCatchupAgent:
+        """ワーカー・モデルごとの Agent を取得（同じワーカーのジョブ間で使い回す）"""
+        model = model or self.model
+        key = (model or "", worker)
+        with self._agents_lock:
+            if key not in self._agents:
+                self._agents[key] = AITechCatchupAgent(model=model, max_tokens=self.max_tokens, enabled_mcp_servers=self.enabled_mcp_servers)
+            return self._agents[key]
+
+    def due_jobs(self, now: datetime) -> List[Tuple[str, datetime]]:
+        """
+        実行予定時刻を過ぎた未実行のジョブを取得
+
+        停止中に複数回の実行予定があった場合も、直近の 1 回分のみ実行する
+        """
+        due = []
+        for name, job in self.jobs.items():
+            if name in self._in_flight:
+                continue
+            scheduled_at = job["cron"].previous_at_or_before(now)
+            job_state = self.state.setdefault(name, {})
+            last_completed = job_state.get("last_completed_schedule")
+            if last_completed is None:
+                # 初回起動時は現在以降の実行予定から開始する
+                job_state["last_completed_schedule"] = scheduled_at.isoformat()
+                continue
+            if datetime.fromisoformat(last_completed) < scheduled_at:
+                due.append((name, scheduled_at))
+        return due
+
+    def _run_job(self, name: str, worker: int) -> Dict[str, Any]:
+        """ジョブを実行（ワーカースレッド内で呼び出される）"""
+        job = self.jobs[name]
+        agent = self._get_agent(job.get("model"), worker)
+        return agent.run_report(
+            mode=job.get("mode", "report"),
+            topic=job.get("topic"),
+            news_count=job.get("news_count"),
+            create_issue=job.get("create_issue", self.create_issue),
+        )
+
+    async def _worker(self, queue: "asyncio.Queue[Tuple[str, datetime]]", worker: int) -> None:
+        """ジョブキューからジョブを取り出して実行"""
+        while True:
+            name, scheduled_at = await queue.get()
+            job_state = self.state.setdefault(name, {})
+            job_state.update({"status": "running", "running_schedule": scheduled_at.isoformat(), "started_at": datetime.now().isoformat()})
+            self._save_state()
+            logger.info(f"ジョブを開始します: {name} (予定時刻: {scheduled_at.isoformat()})")
+
+            try:
+                result = await asyncio.to_thread(self._run_job, name, worker)
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+
+            job_state.update({"status": result["status"], "finished_at": datetime.now().isoformat(), "message": result.get("message", "")})
+            # 成功・失敗に関わらず同じ予定時刻では再実行しない（失敗時は次回の予定時刻で再実行）
+            job_state["last_completed_schedule"] = scheduled_at.isoformat()
+            job_state.pop("running_schedule", None)
+            if result.get("issue_url"):
+                job_state["issue_url"] = result["issue_url"]
+            self._save_state()
+            self._in_flight.discard(name)
+            logger.info(f"ジョブが終了しました: {name} ({result['status']})")
+            queue.task_done()
+
+    async def run_forever(self) -> None:
+        """スケジューラを起動（停止されるまで実行し続ける）"""
+        if not self.jobs:
+            logger.error("実行可能なジョブがありません")
+            return
+
+        queue: "asyncio.Queue[Tuple[str, datetime]]" = asyncio.Queue()
+        workers = [asyncio.create_task(self._worker(queue, index)) for index in range(self.max_concurrency)]
+        logger.info(f"スケジューラを起動しました (同時実行数: {self.max_concurrency}, 確認間隔: {self.poll_interval}秒)")
+
+        try:
+            while True:
+                for name, scheduled_at in self.due_jobs(datetime.now()):
+                    self._in_flight.add(name)
+                    self.state[name]["status"] = "queued"
+                    await queue.put((name, scheduled_at))
+                    logger.info(f"ジョブをキューに追加しました: {name} (待機数: {queue.qsize()})")
+                self._save_state()
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,9 @@
+"""
+Server modules for AI Tech Catchup Agent
+"""
+
+from .http_server import run_server
+from .report_index_mcp import ReportIndexMCPServer
+from .report_service import ReportJobService
+
+__all__ = ["ReportJobService", "ReportIndexMCPServer", "run_server"]
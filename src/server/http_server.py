@@ -0,0 +1,123 @@
+"""
+HTTP API サーバーモジュール - オンデマンドのレポート生成 API を提供
+
+エンドポイント:
+    POST /reports                 レポート生成ジョブを登録（JSON: mode, topic, news_count, create_issue）
+    GET  /reports                 ジョブ一覧を取得
+    GET  /reports/<job_id>        ジョブの状態と結果を取得
+    GET  /reports/<job_id>/events ジョブの状態変化を Server-Sent Events で配信
+    GET  /health                  ヘルスチェック
+"""
+
+import json
+import logging
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from .report_service import ReportJobService
+
+logger = logging.getLogger(__name__)
+
+# SSE のキープアライブ間隔（秒）
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """レポート API のリクエストハンドラ"""
+
+    service: ReportJobService
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+        if parts == ["health"]:
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif parts == ["reports"]:
+            self._send_json(HTTPStatus.OK, {"jobs": self.service.list_jobs()})
+        elif len(parts) == 2 and parts[0] == "reports":
+            try:
+                self._send_json(HTTPStatus.OK, self.service.get_job(parts[1]))
+            except KeyError:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"ジョブが見つかりません: {parts[1]}"})
+        elif len(parts) == 3 and parts[0] == "reports" and parts[2] == "events":
+            self._stream_events(parts[1])
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not Found"})
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/reports":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not Found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("リクエストボディは JSON オブジェクトで指定してください")
+            job = self.service.submit(request)
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except OverflowError as e:
+            self._send_json(HTTPStatus.TOO_MANY_REQUESTS, {"error": str(e)})
+            return
+
+        status = HTTPStatus.OK if job.get("cached") else HTTPStatus.ACCEPTED
+        self._send_json(status, job)
+
+    def _stream_events(self, job_id: str) -> None:
+        """ジョブが完了するまで状態変化を Server-Sent Events で送信"""
+        try:
+            job = self.service.get_job(job_id)
+        except KeyError:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"ジョブが見つかりません: {job_id}"})
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        try:
+            while True:
+                self.wfile.write(f"event: status\ndata: {json.dumps(job, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if job["status"] in ("success", "error"):
+                    break
+
+                version = job["version"]
+                job = self.service.wait_for_update(job_id, version, timeout=SSE_KEEPALIVE_INTERVAL)
+                while job["version"] == version:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    job = self.service.wait_for_update(job_id, version, timeout=SSE_KEEPALIVE_INTERVAL)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info(f"イベントストリームのクライアントが切断しました: {job_id}")
+        except KeyError:
+            logger.info(f"ジョブがメモリから削除されました: {job_id}")
+
+
+def run_server(service: ReportJobService, host: str = "127.0.0.1", port: int = 8080) -> None:
+    """HTTP API サーバーを起動（停止されるまでブロック）"""
+    handler = type("BoundReportRequestHandler", (ReportRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    logger.info(f"レポート API サーバーを起動しました: http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("レポート API サーバーを停止しました")
+    finally:
+        server.server_close()
+        service.shutdown()
@@ -0,0 +1,83 @@
+"""
+レポート検索 MCP サーバーモジュール - レポート検索インデックスを stdio の MCP ツール（search_reports）として提供
+
+Q&A で過去のレポート全文ではなく、質問に関連するチャンクと Issue へのリンクのみをコンテキストに含めるために使用する
+"""
+
+import json
+import logging
+import sys
+from typing import Any, Dict, Optional, TextIO
+
+from ..utils.mcp_session import MCP_PROTOCOL_VERSION
+from ..utils.report_index import SEARCH_TOOL, ReportIndex, run_search_tool
+
+logger = logging.getLogger(__name__)
+
+
+class ReportIndexMCPServer:
+    """レポート検索インデックスの stdio MCP サーバー（JSON-RPC を 1 行 1 メッセージで送受信）"""
+
+    def __init__(self, report_index: ReportIndex, default_k: int = 5):
+        """
+        Args:
+            report_index: レポート検索インデックス
+            default_k: k が指定されない場合に取得するチャンク数
+        """
+        self.report_index = report_index
+        self.default_k = default_k
+
+    def _call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if name != SEARCH_TOOL["name"]:
+            return {"content": [{"type": "text", "text": f"未対応のツールです: {name}"}], "isError": True}
+        return {"content": [{"type": "text", "text": run_search_tool(self.report_index, arguments, self.default_k)}]}
+
+    def handle(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        JSON-RPC メッセージを処理
+
+        Returns:
+            応答メッセージ（通知の場合は None）
+        """
+        method = message.get("method")
+        if "id" not in message:
+            return None
+
+        result: Dict[str, Any]
+        try:
+            if method == "initialize":
+                result = {
+                    "protocolVersion": MCP_PROTOCOL_VERSION,
+                    "capabilities": {"tools": {}},
+                    "serverInfo": {"name": "ai-tech-catchup-reports", "version": "1.0.0"},
+                }
+            elif method == "ping":
+                result = {}
+            elif method == "tools/list":
+                result = {"tools": [SEARCH_TOOL]}
+            elif method == "tools/call":
+                params = message.get("params", {})
+                result = self._call_tool(params.get("name", ""), params.get("arguments") or {})
+            else:
+                return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        except Exception as e:
+            logger.error(f"MCP リクエストの処理中にエラー: {e}")
+            return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32603, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    def serve(self, stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout) -> None:
+        """標準入力からリクエストを読み込み、標準出力に応答（標準入力が閉じられるまで）"""
+        logger.info(f"レポート検索 MCP サーバーを起動しました: {self.report_index.stats()}")
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"不正な JSON-RPC メッセージを無視します: {line[:200]}")
+                continue
+            response = self.handle(message)
+            if response is not None:
+                stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+                stdout.flush()
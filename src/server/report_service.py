@@ -0,0 +1,238 @@
+"""
+レポートジョブ管理モジュール - オンデマンドのレポート生成ジョブを管理
+"""
+
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..agent import AITechCatchupAgent
+
+logger = logging.getLogger(__name__)
+
+REPORT_MODES = ("report", "weekly", "monthly", "topic", "test")
+
+
+class ReportJobService:
+    """
+    レポートジョブ管理クラス
+
+    上限付きのワーカープールで AITechCatchupAgent を実行する（Agent は実行中の状態を持つため、ワーカーごとに作成してジョブ間で使い回す）。
+    同じモード・正規化済みトピック・期間・件数のリクエストは実行中の 1 つの生成にまとめ（リクエストの合流）、直近の結果はメモリから返す。
+    期間は常にモードごとの現在の期間（default_window）で、過去の期間の生成には対応しない。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 16,
+        result_ttl: float = 3600.0,
+        max_cached_results: int = 128,
+        enabled_mcp_servers: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        create_issue: bool = True,
+    ):
+        """
+        Args:
+            max_workers: 同時に実行する生成ジョブ数の上限
+            max_pending: 待機中・実行中のジョブ数の上限（超えた場合は受け付けない）
+            result_ttl: 完了したジョブの結果をメモリから返す期間（秒）
+            max_cached_results: メモリに保持する完了ジョブ数の上限
+            enabled_mcp_servers: 有効にする MCP サーバー名のリスト
+            model: 使用するモデル名
+            max_tokens: 最大トークン数
+            create_issue: リクエストで指定がない場合に GitHub Issue を作成するか
+        """
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.max_cached_results = max_cached_results
+        self.create_issue = create_issue
+        self.model = model
+        self.max_tokens = max_tokens
+        self.enabled_mcp_servers = enabled_mcp_servers
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="report-worker")
+
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[Any, ...], str] = {}
+        self._recent: Dict[Tuple[Any, ...], str] = {}
+        self._condition = threading.Condition()
+        self._agents: Dict[str, AITechCatchupAgent] = {}
+        self._agents_lock = threading.Lock()
+
+    @staticmethod
+    def normalize_topic(topic: Optional[str]) -> str:
+        """トピック名を正規化（大文字小文字・空白・記号の揺れを吸収）"""
+        if not topic:
+            return ""
+        return re.sub(r"[\s_\-]+", " ", topic).strip().casefold()
+
+    @staticmethod
+    def default_window(mode: str, now: Optional[datetime] = None) -> str:
+        """レポートモードに応じた既定の調査期間キーを取得"""
+        now = now or datetime.now()
+        if mode == "weekly":
+            # 週次レポートは前日までの 7 日間
+            yesterday = now - timedelta(days=1)
+            return f"{(yesterday - timedelta(days=6)).strftime('%Y-%m-%d')}~{yesterday.strftime('%Y-%m-%d')}"
+        if mode == "monthly":
+            return now.strftime("%Y-%m")
+        return now.strftime("%Y-%m-%d")
+
+    def _job_key(self, request: Dict[str, Any]) -> Tuple[Any, ...]:
+        mode = request["mode"]
+        return (
+            mode,
+            self.normalize_topic(request.get("topic")),
+            self.default_window(mode),
+            request.get("news_count"),
+            request["create_issue"],
+        )
+
+    def _get_agent(self) -> AITechCatchupAgent:
+        """実行中のワーカースレッドの Agent を取得（同じワーカーのジョブ間で使い回す）"""
+        worker = threading.current_thread().name
+        with self._agents_lock:
+            if worker not in self._agents:
+                self._agents[worker] = AITechCatchupAgent(model=self.model, max_tokens=self.max_tokens, enabled_mcp_servers=self.enabled_mcp_servers)
+            return self._agents[worker]
+
+    def _evict_expired(self) -> None:
+        """期限切れ・上限超過の完了ジョブをメモリから削除（ロック取得済みで呼び出す）"""
+        now = time.time()
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in ("success", "error")]
+        expired = [job_id for job_id in finished if now - self._jobs[job_id]["finished_ts"] > self.result_ttl]
+        overflow = max(0, len(finished) - len(expired) - self.max_cached_results)
+        expired += [job_id for job_id in finished if job_id not in expired][:overflow]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._recent.get(job["key"]) == job_id:
+                del self._recent[job["key"]]
+
+    def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        レポート生成ジョブを登録
+
+        Args:
+            request: mode, topic, news_count, create_issue を含むリクエスト
+                （window は現在の期間と一致する場合のみ指定可能）
+
+        Returns:
+            ジョブ情報。coalesced（実行中のジョブに合流）または cached（直近の結果を返却）を含む
+        """
+        mode = request.get("mode") or "report"
+        if mode not in REPORT_MODES:
+            raise ValueError(f"未対応のレポートモードです: {mode}")
+        if mode == "topic" and not request.get("topic"):
+            raise ValueError("トピックモードではトピック名の指定が必要です")
+        window = request.get("window")
+        if window and window != self.default_window(mode):
+            raise ValueError(f"現在の期間 ({self.default_window(mode)}) 以外の期間は指定できません: {window}")
+        request = {**request, "mode": mode, "create_issue": bool(request.get("create_issue", self.create_issue))}
+        key = self._job_key(request)
+
+        with self._condition:
+            self._evict_expired()
+
+            recent_id = self._recent.get(key)
+            if recent_id and self._jobs[recent_id]["status"] == "success":
+                logger.info(f"直近の結果を返します: {recent_id}")
+                return {**self.get_job(recent_id, include_content=False), "cached": True}
+
+            in_flight_id = self._in_flight.get(key)
+            if in_flight_id:
+                self._jobs[in_flight_id]["subscribers"] += 1
+                logger.info(f"実行中のジョブに合流します: {in_flight_id}")
+                return {**self.get_job(in_flight_id, include_content=False), "coalesced": True}
+
+            pending = sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+            if pending >= self.max_pending:
+                raise OverflowError(f"待機中のジョブが上限 ({self.max_pending}) に達しています")
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "key": key,
+                "mode": mode,
+                "topic": request.get("topic"),
+                "window": key[2],
+                "status": "queued",
+                "subscribers": 1,
+                "created_at": datetime.now().isoformat(),
+                "version": 0,
+            }
+            self._in_flight[key] = job_id
+
+        self.executor.submit(self._run_job, job_id, request)
+        logger.info(f"ジョブを登録しました: {job_id} ({mode} {request.get('topic') or ''})")
+        return {**self.get_job(job_id, include_content=False), "coalesced": False, "cached": False}
+
+    def _update_job(self, job_id: str, **fields: Any) -> None:
+        with self._condition:
+            job = self._jobs[job_id]
+            job.update(fields)
+            job["version"] += 1
+            self._condition.notify_all()
+
+    def _run_job(self, job_id: str, request: Dict[str, Any]) -> None:
+        """ワーカースレッドでレポートを生成"""
+        self._update_job(job_id, status="running", started_at=datetime.now().isoformat())
+        try:
+            result = self._get_agent().run_report(
+                mode=request["mode"],
+                topic=request.get("topic"),
+                news_count=request.get("news_count"),
+                create_issue=request["create_issue"],
+            )
+        except Exception as e:
+            logger.error(f"ジョブの実行中にエラー: {job_id} - {e}")
+            result = {"status": "error", "message": str(e)}
+
+        with self._condition:
+            key = self._jobs[job_id]["key"]
+            self._in_flight.pop(key, None)
+            if result["status"] == "success":
+                self._recent[key] = job_id
+        self._update_job(
+            job_id,
+            status=result["status"],
+            result=result,
+            finished_at=datetime.now().isoformat(),
+            finished_ts=time.time(),
+        )
+
+    def get_job(self, job_id: str, include_content: bool = True) -> Dict[str, Any]:
+        """ジョブ情報を取得"""
+        with self._condition:
+            if job_id not in self._jobs:
+                raise KeyError(job_id)
+            job = {k: v for k, v in self._jobs[job_id].items() if k not in ("key", "result", "finished_ts")}
+            result = self._jobs[job_id].get("result")
+        if result:
+            job["issue_url"] = result.get("issue_url")
+            job["message"] = result.get("message")
+            if include_content:
+                job["content"] = result.get("content")
+        return job
+
+    def wait_for_update(self, job_id: str, version: int, timeout: float) -> Dict[str, Any]:
+        """ジョブが更新されるまで待機して最新のジョブ情報を取得"""
+        with self._condition:
+            self._condition.wait_for(lambda: job_id not in self._jobs or self._jobs[job_id]["version"] != version, timeout=timeout)
+        return self.get_job(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """全ジョブの概要を取得"""
+        with self._condition:
+            job_ids = list(self._jobs)
+        return [self.get_job(job_id, include_content=False) for job_id in reversed(job_ids)]
+
+    def shutdown(self) -> None:
+        """ワーカープールを停止"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -2,7 +2,42 @@
 Utility modules for AI Tech Catchup Agent
 """
 
+from .cassette import Cassette, get_cassette, use_cassette
+from .json_store import JSONStore
+from .link_validator import LinkValidator
+from .logging_setup import setup_logging, summarize_payload, use_stderr_console
 from .mcp_manager import MCPServerManager
+from .profiler import Profiler, get_profiler, use_profiler
 from .prompt_manager import PromptManager
+from .rate_limiter import RateLimiter, get_rate_limiter, rate_limit_priority
+from .report_index import ReportIndex
+from .run_history import RunHistory
+from .source_registry import SourceRegistry
+from .turn_budget import TurnBudget
+from .usage_ledger import UsageBudget, UsageLedger, estimate_cost
 
-__all__ = ["PromptManager", "MCPServerManager"]
+__all__ = [
+    "PromptManager",
+    "MCPServerManager",
+    "UsageBudget",
+    "TurnBudget",
+    "UsageLedger",
+    "estimate_cost",
+    "setup_logging",
+    "use_stderr_console",
+    "summarize_payload",
+    "Cassette",
+    "get_cassette",
+    "use_cassette",
+    "SourceRegistry",
+    "LinkValidator",
+    "ReportIndex",
+    "RateLimiter",
+    "get_rate_limiter",
+    "rate_limit_priority",
+    "RunHistory",
+    "JSONStore",
+    "Profiler",
+    "get_profiler",
+    "use_profiler",
+]
@@ -0,0 +1,232 @@
+"""
+カセットモジュール - LLM・GitHub API との通信を記録し、オフラインで再生
+
+記録モードでは ClaudeSDKClient のメッセージストリーム（タイミング付き）、Gemini の応答、GitHub API の
+リクエスト・レスポンスをカセットファイル（JSON）に保存する。再生モードではカセットの内容を同じクライアントに
+流し込み、ストリーム処理・後処理・配信の性能を API を呼ばずに再現する
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+_active: Optional["Cassette"] = None
+
+
+def fingerprint(*parts: Any) -> str:
+    """リクエスト内容の照合用ハッシュ"""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def serialize_message(obj: Any) -> Any:
+    """claude_code_sdk のメッセージ（dataclass）を型名付きの JSON 互換の値に変換"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {"__type__": type(obj).__name__, **{field.name: serialize_message(getattr(obj, field.name)) for field in dataclasses.fields(obj)}}
+    if isinstance(obj, (list, tuple)):
+        return [serialize_message(value) for value in obj]
+    if isinstance(obj, dict):
+        return {key: serialize_message(value) for key, value in obj.items()}
+    return obj
+
+
+def deserialize_message(value: Any) -> Any:
+    """serialize_message で変換した値を claude_code_sdk のメッセージに復元"""
+    from claude_code_sdk import types as sdk_types
+
+    if isinstance(value, list):
+        return [deserialize_message(item) for item in value]
+    if isinstance(value, dict):
+        fields = {key: deserialize_message(item) for key, item in value.items() if key != "__type__"}
+        if "__type__" in value:
+            return getattr(sdk_types, value["__type__"])(**fields)
+        return fields
+    return value
+
+
+class Cassette:
+    """記録・再生するやり取りを保持するカセット"""
+
+    def __init__(self, path: str, mode: str = "record", speed: str = "realtime"):
+        """
+        Args:
+            path: カセットファイルのパス
+            mode: record（記録）または replay（再生）
+            speed: 再生速度（realtime: 記録時と同じ間隔, max: 待ち時間なし）
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"未対応のカセットモードです: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._interactions: List[Dict[str, Any]] = []
+        self._pending: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+        if mode == "replay":
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            for interaction in data.get("interactions", []):
+                self._pending[interaction["channel"]].append(interaction)
+            logger.info(f"カセットを読み込みました: {self.path} ({len(data.get('interactions', []))} 件)")
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def record(self, channel: str, key: str, interaction: Dict[str, Any]) -> None:
+        """
+        やり取りを 1 件記録
+
+        Args:
+            channel: 通信の種類（claude_code, gemini, github）
+            key: 再生時の照合キー（レポートタイプ、HTTP メソッドと URL など）
+            interaction: 記録する内容（fingerprint を含めると再生時に同じ内容のやり取りを優先して照合）
+        """
+        with self._lock:
+            self._interactions.append({"channel": channel, "key": key, **interaction})
+
+    def next(self, channel: str, key: str, request_fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """
+        再生するやり取りを取得（同じキーのうち fingerprint が一致するもの、なければ最も古いもの）
+
+        Raises:
+            LookupError: 該当するやり取りがカセットにない場合
+        """
+        with self._lock:
+            candidates = [interaction for interaction in self._pending[channel] if interaction["key"] == key]
+            if not candidates:
+                raise LookupError(f"カセットに記録がありません: {channel} {key}")
+            matched = next((c for c in candidates if request_fingerprint and c.get("fingerprint") == request_fingerprint), candidates[0])
+            self._pending[channel].remove(matched)
+            return matched
+
+    def delay(self, seconds: float) -> float:
+        """再生速度に応じた待ち時間（秒）"""
+        return max(0.0, seconds) if self.speed == "realtime" else 0.0
+
+    def wait(self, seconds: float) -> None:
+        """記録時の所要時間だけ待機（max の場合は待機しない）"""
+        delay = self.delay(seconds)
+        if delay:
+            time.sleep(delay)
+
+    def save(self) -> None:
+        """記録したやり取りをカセットファイルに保存"""
+        if not self.recording:
+            return
+        with self._lock:
+            interactions = list(self._interactions)
+        data = {"version": CASSETTE_VERSION, "created_at": datetime.now().isoformat(), "interactions": interactions}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+        logger.info(f"カセットを保存しました: {self.path} ({len(interactions)} 件)")
+
+
+def use_cassette(cassette: Optional[Cassette]) -> None:
+    """プロセス全体で使用するカセットを設定（None で解除）"""
+    global _active
+    _active = cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    """使用中のカセットを取得"""
+    return _active
+
+
+class RecordingSDKClient:
+    """
+    ClaudeSDKClient のメッセージストリームをタイミング付きで記録するラッパー
+
+    同じセッションで複数回 query する場合（最大ターン数に達した後のまとめの依頼など）は、query ごとに 1 件のやり取りとして記録する
+    （fingerprint はセッション内のそれまでのプロンプトを含めて作成し、再生時に同じレポートのまとめの依頼と照合する）
+    """
+
+    def __init__(self, client: Any, cassette: Cassette, key: str):
+        self.client = client
+        self.cassette = cassette
+        self.key = key
+        self.prompts: List[str] = []
+        self.events: List[Dict[str, Any]] = []
+        self._started = time.monotonic()
+
+    async def __aenter__(self) -> "RecordingSDKClient":
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> Any:
+        self._flush()
+        return await self.client.__aexit__(*exc)
+
+    def _flush(self) -> None:
+        """直前の query のメッセージストリームを記録"""
+        if self.prompts:
+            self.cassette.record("claude_code", self.key, {"fingerprint": fingerprint(*self.prompts), "events": self.events})
+        self.events = []
+
+    async def query(self, prompt: str) -> None:
+        self._flush()
+        self.prompts.append(prompt)
+        self._started = time.monotonic()
+        await self.client.query(prompt)
+
+    async def receive_response(self) -> AsyncIterator[Any]:
+        async for message in self.client.receive_response():
+            self.events.append({"t": round(time.monotonic() - self._started, 4), "message": serialize_message(message)})
+            yield message
+
+    async def interrupt(self) -> None:
+        self.events.append({"t": round(time.monotonic() - self._started, 4), "interrupt": True})
+        await self.client.interrupt()
+
+
+class ReplaySDKClient:
+    """カセットに記録したメッセージストリームを ClaudeSDKClient の代わりに再生するクライアント"""
+
+    def __init__(self, cassette: Cassette, key: str):
+        self.cassette = cassette
+        self.key = key
+        self.prompts: List[str] = []
+        self.events: List[Dict[str, Any]] = []
+        self._started = time.monotonic()
+
+    async def __aenter__(self) -> "ReplaySDKClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def query(self, prompt: str) -> None:
+        self.prompts.append(prompt)
+        self.events = self.cassette.next("claude_code", self.key, fingerprint(*self.prompts))["events"]
+        self._started = time.monotonic()
+
+    async def receive_response(self) -> AsyncIterator[Any]:
+        for event in self.events:
+            if "message" not in event:
+                continue
+            delay = self.cassette.delay(self._started + event["t"] - time.monotonic())
+            if delay:
+                await asyncio.sleep(delay)
+            yield deserialize_message(event["message"])
+
+    async def interrupt(self) -> None:
+        logger.info("再生中のため中断要求は記録済みのストリームに従います")
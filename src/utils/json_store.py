@@ -0,0 +1,74 @@
+"""
+JSON ストアモジュール - 複数プロセスから更新される状態ファイル（JSON）の読み込みと、ファイルロックで直列化したアトミックな更新
+"""
+
+import fcntl
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class JSONStore:
+    """ロックファイル（<path>.lock）で更新を直列化し、一時ファイル（<path>.tmp）からの置き換えでアトミックに保存する JSON ファイル"""
+
+    def __init__(self, path: str, description: str = "状態ファイル", default: Callable[[], Dict[str, Any]] = dict, indent: Optional[int] = 2):
+        """
+        Args:
+            path: JSON ファイルのパス
+            description: ログ出力用の名前（例: ウォーターマーク）
+            default: ファイルが存在しない・読み込めない場合の内容を作成する関数
+            indent: 保存時のインデント（None で改行なし）
+        """
+        self.path = Path(path)
+        self.description = description
+        self.default = default
+        self.indent = indent
+
+    def read(self) -> Dict[str, Any]:
+        """内容を読み込み（ファイルが存在しない・読み込めない場合は default の内容）"""
+        if not self.path.exists():
+            return self.default()
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data: Dict[str, Any] = json.load(file)
+                return data
+        except Exception as e:
+            logger.error(f"{self.description}の読み込みエラー: {e}")
+            return self.default()
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=self.indent)
+        os.replace(tmp_path, self.path)
+
+    def update(self, apply: Callable[[Dict[str, Any]], T]) -> T:
+        """
+        ファイルロックを取得して最新の内容を読み込み、apply で変更した内容を保存
+
+        Args:
+            apply: 読み込んだ内容をその場で変更する関数
+
+        Returns:
+            apply の戻り値
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            data = self.read()
+            result = apply(data)
+            self._write(data)
+            return result
+
+    def write(self, data: Dict[str, Any]) -> None:
+        """内容全体を置き換えて保存（ファイルロックで他の更新と直列化）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._write(data)
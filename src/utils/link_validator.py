@@ -0,0 +1,218 @@
+"""
+リンク検証モジュール - 生成したレポートのリンクを並行して検証し、リンク切れを注記または除外
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from .json_store import JSONStore
+
+logger = logging.getLogger(__name__)
+
+MARKDOWN_LINK_PATTERN = re.compile(r"\[([^\]]*)\]\((https?://[^\s)]+)\)")
+BARE_URL_PATTERN = re.compile(r"(?<![(\[<])https?://[^\s)\]>]+")
+LIST_ITEM_PATTERN = re.compile(r"^(\s*)(?:[-*+]|\d+\.)\s")
+
+# ボット対策などで拒否されることが多く、リンク切れとは判断できないステータスコード
+UNVERIFIABLE_STATUS = {401, 403, 429, 999}
+
+BROKEN_LINK_NOTE = " ⚠️（リンク切れの可能性）"
+
+
+def extract_links(markdown: str) -> List[str]:
+    """Markdown に含まれるリンク（[text](url) 形式と URL のみの形式）を出現順に重複なく取得"""
+    urls = [match.group(2) for match in MARKDOWN_LINK_PATTERN.finditer(markdown)]
+    urls += [url.rstrip(".,;:、。") for url in BARE_URL_PATTERN.findall(MARKDOWN_LINK_PATTERN.sub("", markdown))]
+    return list(dict.fromkeys(urls))
+
+
+class LinkValidator:
+    """上限付きの並行数・ホストごとのレート制限・実行間で共有する TTL キャッシュ付きのリンク検証"""
+
+    def __init__(
+        self,
+        cache_path: str,
+        concurrency: int = 32,
+        per_host_limit: int = 2,
+        per_host_interval: float = 0.2,
+        timeout: float = 10.0,
+        ttl: float = 86400.0,
+        failure_ttl: float = 3600.0,
+    ):
+        """
+        Args:
+            cache_path: 検証結果のキャッシュ（JSON ファイル）のパス
+            concurrency: 全体の同時検証数の上限
+            per_host_limit: ホストごとの同時検証数の上限
+            per_host_interval: 同一ホストへのリクエストの最小間隔（秒）
+            timeout: 1 リクエストのタイムアウト（秒）
+            ttl: 有効なリンクの検証結果を再利用する期間（秒）
+            failure_ttl: リンク切れの検証結果を再利用する期間（秒）
+        """
+        self.cache_path = Path(cache_path)
+        self.concurrency = max(1, concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.per_host_interval = per_host_interval
+        self.timeout = timeout
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._session = requests.Session()
+        self._session.headers.update({"User-Agent": "Mozilla/5.0 (compatible; ai-tech-catchup-agent)"})
+        self._cache_lock = threading.Lock()
+        self._cache = JSONStore(cache_path, "リンク検証キャッシュ", indent=None)
+
+    def _write_cache(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """検証結果をキャッシュに追加（期限切れの結果は削除。複数プロセスからの更新はファイルロックで直列化）"""
+        if not updates:
+            return
+
+        def apply(data: Dict[str, Any]) -> None:
+            for url in [url for url, entry in data.items() if not self._is_fresh(entry)]:
+                del data[url]
+            data.update(updates)
+
+        try:
+            with self._cache_lock:
+                self._cache.update(apply)
+        except Exception as e:
+            logger.warning(f"リンク検証キャッシュの保存に失敗: {e}")
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        ttl = self.ttl if entry.get("ok") else self.failure_ttl
+        return datetime.fromisoformat(entry["checked_at"]) + timedelta(seconds=ttl) > datetime.now()
+
+    def _check(self, url: str) -> Dict[str, Any]:
+        """HEAD で検証し、HEAD が使えない・拒否された場合は GET で再検証"""
+        started = time.perf_counter()
+        status: Optional[int] = None
+        error: Optional[str] = None
+        for method in ("HEAD", "GET"):
+            try:
+                with self._session.request(method, url, timeout=self.timeout, allow_redirects=True, stream=True) as response:
+                    status = response.status_code
+                error = None
+                if status < 400:
+                    break
+            except requests.RequestException as e:
+                status, error = None, str(e)
+
+        ok = status is not None and (status < 400 or status in UNVERIFIABLE_STATUS)
+        return {
+            "ok": ok,
+            "status": status,
+            "error": error,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    async def validate(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        リンクを並行して検証
+
+        Args:
+            urls: 検証する URL のリスト
+
+        Returns:
+            URL ごとの検証結果（ok, status, error, latency_ms, checked_at, cached）
+        """
+        cache = self._cache.read()
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            entry = cache.get(url)
+            if entry and self._is_fresh(entry):
+                results[url] = {**entry, "cached": True}
+            else:
+                pending.append(url)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        host_last_request: Dict[str, float] = {}
+
+        async def check(url: str) -> None:
+            host = urlparse(url).netloc.lower()
+            host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+            async with semaphore, host_semaphore:
+                # 同一ホストへのリクエスト間隔を空ける
+                wait = host_last_request.get(host, 0.0) + self.per_host_interval - time.monotonic()
+                host_last_request[host] = time.monotonic() + max(0.0, wait)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                results[url] = {**await asyncio.to_thread(self._check, url), "cached": False}
+
+        started = time.perf_counter()
+        await asyncio.gather(*(check(url) for url in pending))
+        self._write_cache({url: {k: v for k, v in results[url].items() if k != "cached"} for url in pending})
+
+        broken = sum(1 for result in results.values() if not result["ok"])
+        logger.info(
+            f"リンク検証が完了しました: {len(results)} 件 " f"(キャッシュ: {len(results) - len(pending)} 件, リンク切れ: {broken} 件, {time.perf_counter() - started:.1f} 秒)"
+        )
+        return results
+
+
+def apply_link_results(markdown: str, results: Dict[str, Dict[str, Any]], action: str = "annotate") -> Tuple[str, List[str]]:
+    """
+    リンクの検証結果を Markdown に反映
+
+    Args:
+        markdown: レポートの Markdown
+        results: URL ごとの検証結果
+        action: annotate（リンク切れに注記を付ける）または drop（リンク切れを含む箇条書きの項目を子項目ごと削除し、
+            箇条書き以外ではリンクを外す）
+
+    Returns:
+        反映後の Markdown と、リンク切れの URL のリスト
+    """
+    broken = [url for url, result in results.items() if not result["ok"]]
+    if not broken:
+        return markdown, []
+    broken_set = set(broken)
+
+    def replace_markdown_link(match: "re.Match[str]") -> str:
+        if match.group(2) not in broken_set:
+            return match.group(0)
+        return match.group(0) + BROKEN_LINK_NOTE if action == "annotate" else match.group(1)
+
+    def replace_bare_url(match: "re.Match[str]") -> str:
+        url = match.group(0).rstrip(".,;:、。")
+        trailing = match.group(0).removeprefix(url)
+        if url not in broken_set:
+            return match.group(0)
+        return (url + BROKEN_LINK_NOTE if action == "annotate" else "") + trailing
+
+    lines: List[str] = []
+    drop_indent: Optional[int] = None
+    for line in markdown.splitlines():
+        indent = len(line) - len(line.lstrip())
+        if drop_indent is not None:
+            if line.strip() and indent > drop_indent:
+                continue
+            drop_indent = None
+
+        has_broken = any(url in broken_set for url in extract_links(line))
+        list_item = LIST_ITEM_PATTERN.match(line)
+        if has_broken and action == "drop" and list_item:
+            drop_indent = len(list_item.group(1))
+            continue
+        if has_broken:
+            # [text](url) 形式の部分とそれ以外の部分を分けて置換（リンク内の URL を二重に処理しないため）
+            parts, position = [], 0
+            for match in MARKDOWN_LINK_PATTERN.finditer(line):
+                start = match.start()
+                parts.append(BARE_URL_PATTERN.sub(replace_bare_url, line[position:start]))
+                parts.append(replace_markdown_link(match))
+                position = match.end()
+            parts.append(BARE_URL_PATTERN.sub(replace_bare_url, line[position:]))
+            line = "".join(parts)
+        lines.append(line)
+    return "\n".join(lines), broken
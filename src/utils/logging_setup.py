@@ -0,0 +1,119 @@
+"""
+ログ設定モジュール - キュー経由の非同期ログ出力、ローテーション、JSON Lines 形式、大きなペイロードの要約
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from ..config import settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """1 レコード 1 行の JSON 形式のフォーマッタ"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(
+    log_file: str = "ai_agent.log",
+    level: int = logging.INFO,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    log_format: str = "json",
+) -> None:
+    """
+    ログ出力を設定
+
+    ログ呼び出し側はキューへの追加のみを行い、ファイル・標準出力への書き込みはバックグラウンドスレッドで行う。
+    ファイルはサイズでローテーションする
+
+    Args:
+        log_file: ログファイルのパス
+        level: ログレベル
+        max_bytes: ローテーションするファイルサイズ（バイト）
+        backup_count: 保持する過去ログファイル数
+        log_format: ログファイルの形式（json: JSON Lines, text: テキスト）
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(JsonLinesFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def use_stderr_console() -> None:
+    """標準出力へのログを標準エラー出力に切り替え（標準出力で通信する stdio の MCP サーバーとして動作する場合）"""
+    if _listener is None:
+        return
+    for handler in _listener.handlers:
+        if isinstance(handler, logging.StreamHandler) and getattr(handler, "stream", None) is sys.stdout:
+            handler.setStream(sys.stderr)
+
+
+def shutdown_logging() -> None:
+    """キューに残ったログを書き出してバックグラウンドスレッドを停止"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def summarize_payload(text: Optional[str]) -> str:
+    """
+    プロンプトや応答などの大きなペイロードを、ログ用にハッシュと長さへ要約
+
+    LOG_SPILL_CONTENT が有効な場合は、全文をハッシュをキーとするコンテンツストアに保存する
+
+    Args:
+        text: 要約するテキスト
+
+    Returns:
+        "sha256=<先頭16桁> len=<文字数>" 形式の文字列
+    """
+    if text is None:
+        return "None"
+
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    if settings.log_spill_content:
+        path = Path(settings.state_dir) / "log_content" / digest[:2] / f"{digest}.txt"
+        try:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(text, encoding="utf-8")
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"ログのペイロードの保存に失敗: {e}")
+    return f"sha256={digest[:16]} len={len(text)}"
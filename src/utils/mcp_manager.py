@@ -2,15 +2,31 @@
 MCP サーバー管理モジュール - MCP サーバー設定の読み込みと管理
 """
 
+import fnmatch
+import json
 import logging
 import os
+import shlex
+import subprocess
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
+import requests
 import yaml
 
+from ..config import settings
+from .mcp_session import MCPStdioSession
+
 logger = logging.getLogger(__name__)
 
+# 共有 MCP サーバーのヘルスチェック結果のキャッシュ期間（秒）
+SHARED_HEALTH_CACHE_SECONDS = 10.0
+
+# ツール定義のトークン数を推定する際の 1 トークンあたりの文字数
+CHARS_PER_TOKEN = 4
+
 
 class MCPServerManager:
     """MCP サーバー管理クラス"""
@@ -18,6 +34,15 @@ class MCPServerManager:
     def __init__(self, config_path: str = "mcp/mcp_servers.yaml"):
         self.config_path = Path(config_path)
         self.servers_config = self._load_config()
+        self.install_root = Path(settings.state_dir) / "mcp"
+        # ウォームアップ中のサーバーの解決済みバージョン（マーカーの書き込み前に {version} の展開に使用）
+        self._resolving: Dict[str, str] = {}
+
+        # 共有 MCP サーバー（sse/http で複数セッションから利用する常駐プロセス）
+        self._shared_processes: Dict[str, subprocess.Popen] = {}
+        self._shared_health: Dict[str, Tuple[float, bool]] = {}
+        self._monitor_stop = threading.Event()
+        self._monitor_thread: Optional[threading.Thread] = None
 
     def _load_config(self) -> Dict[str, Any]:
         """MCP サーバー設定ファイルを読み込み"""
@@ -65,10 +90,104 @@ class MCPServerManager:
 
         return enabled_servers
 
+    def _resolve_env(self, server_config: Dict[str, Any]) -> Dict[str, str]:
+        """サーバー設定の環境変数を展開（${VAR_NAME} 形式）"""
+        env = {}
+        for key, value in server_config.get("env", {}).items():
+            if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
+                env[key] = os.getenv(value[2:-1], "")
+            else:
+                env[key] = value
+        return env
+
+    def _format(self, server_name: str, value: Any, version: Optional[str] = None) -> Any:
+        """設定値中の {version}（既定は解決済みのバージョン）/ {install_dir} を置換"""
+        if not isinstance(value, str):
+            return value
+        version = self.resolved_version(server_name) if version is None else version
+        return value.replace("{version}", version).replace("{install_dir}", str(self.install_root / server_name))
+
+    def _marker_path(self, server_name: str) -> Path:
+        return self.install_root / server_name / ".installed"
+
+    def _read_marker(self, server_name: str) -> Optional[Dict[str, str]]:
+        """ウォームアップのマーカー（設定のバージョンと解決済みのバージョン）を読み込み"""
+        marker = self._marker_path(server_name)
+        if not marker.exists():
+            return None
+        text = marker.read_text(encoding="utf-8").strip()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            # 旧形式（設定のバージョンのみ）
+            return {"version": text, "resolved": text}
+        return {"version": str(data.get("version", "")), "resolved": str(data.get("resolved", ""))}
+
+    def is_installed(self, server_name: str) -> bool:
+        """設定のバージョンのサーバーが事前インストール（ウォームアップ）済みか"""
+        server_config = self.servers_config.get("servers", {}).get(server_name, {})
+        marker = self._read_marker(server_name)
+        return marker is not None and marker["version"] == str(server_config.get("version", ""))
+
+    def resolved_version(self, server_name: str) -> str:
+        """
+        起動に使用するバージョンを取得
+
+        ウォームアップ済みの場合はその時点で解決した具体的なバージョン（latest やブランチ名ではなく、
+        npm のバージョンや git のコミット SHA）を返し、ウォームアップ後に公開された版に切り替わらないようにする
+        """
+        if server_name in self._resolving:
+            return self._resolving[server_name]
+        server_config = self.servers_config.get("servers", {}).get(server_name, {})
+        marker = self._read_marker(server_name)
+        if marker is not None and marker["resolved"] and marker["version"] == str(server_config.get("version", "")):
+            return marker["resolved"]
+        return str(server_config.get("version", ""))
+
+    def _resolve(self, server_name: str, server_config: Dict[str, Any]) -> str:
+        """
+        `resolve` のコマンドで設定のバージョンを具体的なバージョンに解決（未設定の場合は設定のバージョン）
+
+        Raises:
+            RuntimeError: コマンドが失敗した、または出力が空の場合
+        """
+        version = str(server_config.get("version", ""))
+        resolve = server_config.get("resolve")
+        if not resolve:
+            return version
+        command = [self._format(server_name, resolve["command"], version)] + [
+            self._format(server_name, arg, version) for arg in resolve.get("args", [])
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=60)
+        output = completed.stdout.split()
+        if completed.returncode != 0 or not output:
+            raise RuntimeError(f"バージョンの解決に失敗しました ({shlex.join(command)}): {completed.stderr.strip()}")
+        # npm view はバージョン、git ls-remote は「SHA<TAB>ref」を出力する（先頭のトークンを使用）
+        return output[0]
+
+    def get_launch_command(self, server_name: str) -> Tuple[str, List[str]]:
+        """
+        stdio サーバーの起動コマンドを取得
+
+        事前インストール済みの場合は `installed` の設定（パッケージ解決を行わない起動方法）を優先する
+        """
+        server_config = self.servers_config.get("servers", {}).get(server_name, {})
+        launch = server_config
+        # ウォームアップ中（解決したバージョンのキャッシュ前）はパッケージ解決ありで起動
+        if "installed" in server_config and server_name not in self._resolving and self.is_installed(server_name):
+            launch = server_config["installed"]
+        command = self._format(server_name, launch.get("command"))
+        args = [self._format(server_name, arg) for arg in launch.get("args", [])]
+        return command, args
+
     def build_mcp_config(self, enabled_list: List[str]) -> Dict[str, Dict[str, Any]]:
         """
         Claude Code SDK 用の MCP サーバー設定を構築
 
+        共有 MCP サーバーが起動済みで正常な場合は、stdio で新たに起動する代わりに sse で接続する
+
         Args:
             enabled_list: 有効にするサーバー名のリスト
 
@@ -76,30 +195,27 @@ class MCPServerManager:
             Claude Code SDK 用の MCP サーバー設定
         """
         enabled_servers = self.get_enabled_servers(enabled_list)
-        mcp_config = {}
+        mcp_config: Dict[str, Dict[str, Any]] = {}
 
         for server_name, server_config in enabled_servers.items():
-            # 環境変数を展開
-            env = {}
-            if "env" in server_config:
-                for key, value in server_config["env"].items():
-                    # ${VAR_NAME} 形式の環境変数を展開
-                    if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-                        var_name = value[2:-1]
-                        env[key] = os.getenv(var_name, "")
-                    else:
-                        env[key] = value
+            env = self._resolve_env(server_config)
 
             # MCP サーバー設定を構築
             server_type = server_config.get("type", "stdio")
+            if server_type == "stdio" and self.is_shared_healthy(server_name):
+                logger.info(f"共有 MCP サーバーに接続します: {server_name}")
+                mcp_config[server_name] = {"type": "sse", "url": self.get_shared_url(server_name)}
+                continue
+
             mcp_config[server_name] = {
                 "type": server_type,
             }
 
             # stdio タイプの場合: command と args が必要
             if server_type == "stdio":
-                mcp_config[server_name]["command"] = server_config.get("command")
-                mcp_config[server_name]["args"] = server_config.get("args", [])
+                command, args = self.get_launch_command(server_name)
+                mcp_config[server_name]["command"] = command
+                mcp_config[server_name]["args"] = args
             # sse/http タイプの場合: url が必要
             elif server_type in ("sse", "http"):
                 mcp_config[server_name]["url"] = server_config.get("url")
@@ -109,12 +225,240 @@ class MCPServerManager:
 
         return mcp_config
 
-    def get_allowed_tools(self, enabled_list: List[str]) -> List[str]:
+    def measure_latency(self, server_name: str) -> Dict[str, Any]:
+        """
+        MCP サーバーの起動・ハンドシェイクのレイテンシを計測
+
+        Returns:
+            stdio: spawn_ms, handshake_ms, total_ms / sse・http: connect_ms
+        """
+        server_config = self.servers_config.get("servers", {}).get(server_name)
+        if not server_config:
+            return {"status": "error", "message": f"MCP サーバー '{server_name}' が設定ファイルに見つかりません"}
+
+        try:
+            if server_config.get("type", "stdio") == "stdio":
+                command, args = self.get_launch_command(server_name)
+                with MCPStdioSession(command, args, env=self._resolve_env(server_config)) as session:
+                    latency: Dict[str, Any] = session.start()
+                    latency["server_info"] = session.server_info
+            else:
+                started = time.perf_counter()
+                response = requests.get(server_config["url"], stream=True, timeout=30)
+                response.close()
+                latency = {"connect_ms": round((time.perf_counter() - started) * 1000, 1), "status_code": response.status_code}
+            logger.info(f"MCP サーバーのレイテンシ ({server_name}): {latency}")
+            return {"status": "success", **latency}
+        except Exception as e:
+            logger.error(f"MCP サーバーのレイテンシ計測に失敗 ({server_name}): {e}")
+            return {"status": "error", "message": str(e)}
+
+    def warmup(self, enabled_list: List[str], force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        固定バージョンの MCP サーバーを事前インストールし、起動・ハンドシェイクのレイテンシを計測
+
+        `resolve` が設定されていれば設定のバージョン（latest やブランチ名）を具体的なバージョンに解決し、
+        `install` が設定されていればそのコマンドを実行し、続けてサーバーを 1 度起動してパッケージキャッシュを温める。
+        成功したサーバーは設定のバージョンと解決済みのバージョンをマーカーに書き込み、以降は解決済みのバージョンを
+        `installed` の起動方法（パッケージ解決なし）で起動する。新しい版に更新する場合は force で再度ウォームアップする
+
+        Args:
+            enabled_list: 対象のサーバー名のリスト
+            force: インストール済みでも再インストールするか
+
+        Returns:
+            サーバー名をキーとするウォームアップ結果
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        for server_name, server_config in self.get_enabled_servers(enabled_list).items():
+            if server_config.get("type", "stdio") != "stdio":
+                results[server_name] = self.measure_latency(server_name)
+                continue
+
+            if force or not self.is_installed(server_name):
+                try:
+                    resolved = self._resolve(server_name, server_config)
+                except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+                    logger.error(f"MCP サーバーのバージョンの解決に失敗 ({server_name}): {e}")
+                    results[server_name] = {"status": "error", "message": str(e)}
+                    continue
+                self._resolving[server_name] = resolved
+                try:
+                    results[server_name] = self._install(server_name, server_config, resolved)
+                finally:
+                    self._resolving.pop(server_name, None)
+                if results[server_name]["status"] != "success":
+                    continue
+
+            # ウォームアップ後の起動レイテンシ
+            results[server_name] = self.measure_latency(server_name)
+
+        self._save_latency(results)
+        return results
+
+    def _install(self, server_name: str, server_config: Dict[str, Any], resolved: str) -> Dict[str, Any]:
+        """解決済みのバージョンをインストールして 1 度起動し、マーカーを書き込み"""
+        install = server_config.get("install")
+        if install:
+            command = [self._format(server_name, install["command"])] + [self._format(server_name, arg) for arg in install.get("args", [])]
+            logger.info(f"MCP サーバーをインストール中 ({server_name}): {shlex.join(command)}")
+            (self.install_root / server_name).mkdir(parents=True, exist_ok=True)
+            completed = subprocess.run(command, capture_output=True, text=True, timeout=600)
+            if completed.returncode != 0:
+                logger.error(f"MCP サーバーのインストールに失敗 ({server_name}): {completed.stderr.strip()}")
+                return {"status": "error", "message": completed.stderr.strip()}
+
+        # 初回起動でパッケージを解決・キャッシュ（この計測はコールドスタート）
+        cold = self.measure_latency(server_name)
+        if cold["status"] != "success":
+            return cold
+        version = str(server_config.get("version", ""))
+        marker = self._marker_path(server_name)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(json.dumps({"version": version, "resolved": resolved}), encoding="utf-8")
+        logger.info(f"MCP サーバーをウォームアップしました ({server_name}): version={version} (resolved={resolved})")
+        return cold
+
+    def _save_latency(self, results: Dict[str, Dict[str, Any]]) -> None:
+        """計測したレイテンシを状態ディレクトリに保存"""
+        path = self.install_root / "latency.json"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            history = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            for server_name, result in results.items():
+                history[server_name] = {**result, "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            path.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8")
+        except Exception as e:
+            logger.warning(f"MCP サーバーのレイテンシの保存に失敗: {e}")
+
+    def get_shared_url(self, server_name: str) -> Optional[str]:
+        """共有 MCP サーバーの sse エンドポイント URL を取得（共有設定がない場合は None）"""
+        server_config = self.servers_config.get("servers", {}).get(server_name, {})
+        port = server_config.get("shared_port")
+        if not port:
+            return None
+        host = self.servers_config.get("shared", {}).get("host", "127.0.0.1")
+        return f"http://{host}:{port}/sse"
+
+    def is_shared_healthy(self, server_name: str) -> bool:
+        """共有 MCP サーバーが起動済みで正常か（結果は短時間キャッシュ）"""
+        url = self.get_shared_url(server_name)
+        if not url:
+            return False
+
+        cached = self._shared_health.get(server_name)
+        if cached and time.monotonic() - cached[0] < SHARED_HEALTH_CACHE_SECONDS:
+            return cached[1]
+
+        health_path = self.servers_config.get("shared", {}).get("health_path", "/healthz")
+        try:
+            healthy = bool(requests.get(url.rsplit("/", 1)[0] + health_path, timeout=1.0).status_code == 200)
+        except requests.RequestException:
+            healthy = False
+        self._shared_health[server_name] = (time.monotonic(), healthy)
+        return healthy
+
+    def _start_shared_server(self, server_name: str) -> None:
+        """stdio サーバーを sse ブリッジ経由の常駐プロセスとして起動"""
+        server_config = self.servers_config.get("servers", {}).get(server_name, {})
+        bridge = self.servers_config.get("shared", {}).get("bridge")
+        if not bridge:
+            logger.warning("共有 MCP サーバーのブリッジ設定 (shared.bridge) がありません")
+            return
+
+        command, args = self.get_launch_command(server_name)
+        replacements = {"{command_line}": shlex.join([command, *args]), "{port}": str(server_config["shared_port"])}
+        bridge_args = []
+        for arg in bridge.get("args", []):
+            for key, value in replacements.items():
+                arg = arg.replace(key, value)
+            bridge_args.append(arg)
+
+        self._shared_processes[server_name] = subprocess.Popen(
+            [bridge["command"], *bridge_args],
+            env={**os.environ, **self._resolve_env(server_config)},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self._shared_health.pop(server_name, None)
+        logger.info(f"共有 MCP サーバーを起動しました: {server_name} ({self.get_shared_url(server_name)})")
+
+    def start_shared_servers(self, enabled_list: List[str], startup_timeout: float = 120.0) -> List[str]:
+        """
+        共有 MCP サーバーを起動し、ヘルスチェックによる監視（異常時の再起動）を開始
+
+        Args:
+            enabled_list: 対象のサーバー名のリスト（shared_port が設定されたサーバーのみ起動）
+            startup_timeout: 起動完了を待つ最大時間（秒）
+
+        Returns:
+            起動した（または既に起動済みの）サーバー名のリスト
+        """
+        started = []
+        for server_name, server_config in self.get_enabled_servers(enabled_list).items():
+            if server_config.get("type", "stdio") != "stdio" or not server_config.get("shared_port"):
+                continue
+            if not self.is_shared_healthy(server_name):
+                self._start_shared_server(server_name)
+            started.append(server_name)
+
+        deadline = time.monotonic() + startup_timeout
+        for server_name in started:
+            while not self.is_shared_healthy(server_name) and time.monotonic() < deadline:
+                self._shared_health.pop(server_name, None)
+                time.sleep(1.0)
+            if not self.is_shared_healthy(server_name):
+                logger.warning(f"共有 MCP サーバーが起動しませんでした: {server_name}")
+
+        if started and self._monitor_thread is None:
+            self._monitor_stop.clear()
+            self._monitor_thread = threading.Thread(target=self._monitor_shared_servers, daemon=True)
+            self._monitor_thread.start()
+        return started
+
+    def _monitor_shared_servers(self) -> None:
+        """共有 MCP サーバーを定期的にヘルスチェックし、異常時は再起動"""
+        interval = float(self.servers_config.get("shared", {}).get("health_check_interval", 30))
+        while not self._monitor_stop.wait(interval):
+            for server_name, process in list(self._shared_processes.items()):
+                self._shared_health.pop(server_name, None)
+                if process.poll() is None and self.is_shared_healthy(server_name):
+                    continue
+                logger.warning(f"共有 MCP サーバーが応答しないため再起動します: {server_name}")
+                if process.poll() is None:
+                    process.kill()
+                self._start_shared_server(server_name)
+
+    def stop_shared_servers(self) -> None:
+        """このプロセスで起動した共有 MCP サーバーを停止"""
+        self._monitor_stop.set()
+        self._monitor_thread = None
+        for server_name, process in self._shared_processes.items():
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            logger.info(f"共有 MCP サーバーを停止しました: {server_name}")
+        self._shared_processes.clear()
+        self._shared_health.clear()
+
+    def _get_report_tools(self, server_name: str, report_type: Optional[str]) -> Optional[List[str]]:
+        """レポートタイプ別のツール許可リスト（完全なツール名）を取得。未設定の場合は None"""
+        if not report_type:
+            return None
+        report_tools = self.servers_config.get("report_tools", {}).get(report_type, {})
+        if server_name not in report_tools:
+            return None
+        return [f"mcp__{server_name}__{tool}" for tool in report_tools[server_name] or []]
+
+    def get_allowed_tools(self, enabled_list: List[str], report_type: Optional[str] = None) -> List[str]:
         """
         有効な MCP サーバーの許可ツールリストを取得
 
         Args:
             enabled_list: 有効にするサーバー名のリスト
+            report_type: レポートタイプ（report_tools に設定があればそのツールのみを許可）
 
         Returns:
             許可ツールのリスト
@@ -122,12 +466,146 @@ class MCPServerManager:
         enabled_servers = self.get_enabled_servers(enabled_list)
         allowed_tools = []
 
-        for server_config in enabled_servers.values():
-            if "allowed_tools" in server_config:
+        for server_name, server_config in enabled_servers.items():
+            report_tools = self._get_report_tools(server_name, report_type)
+            if report_tools is not None:
+                allowed_tools.extend(report_tools)
+            elif "allowed_tools" in server_config:
                 allowed_tools.extend(server_config["allowed_tools"])
 
         return allowed_tools
 
+    def get_disallowed_tools(self, enabled_list: List[str], report_type: Optional[str] = None) -> List[str]:
+        """
+        許可リストに含まれないツールのリストを取得
+
+        ツール定義はモデルのコンテキストに毎ターン含まれるため、不要なツールを明示的に無効化して
+        入力トークンを削減する。ツール一覧はツールカタログ（`mcp tools` で作成）から取得する
+
+        Args:
+            enabled_list: 有効にするサーバー名のリスト
+            report_type: レポートタイプ
+
+        Returns:
+            無効化するツールのリスト
+        """
+        catalog = self.load_tool_catalog()
+        allowed_patterns = self.get_allowed_tools(enabled_list, report_type)
+        disallowed = []
+        for server_name in self.get_enabled_servers(enabled_list):
+            for tool in catalog.get(server_name, {}).get("tools", []):
+                if not any(fnmatch.fnmatchcase(tool["full_name"], pattern) for pattern in allowed_patterns):
+                    disallowed.append(tool["full_name"])
+        return disallowed
+
+    def get_report_budget(self, report_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        レポートタイプ別のターン数・ツール呼び出し回数の予算を取得
+
+        report_budgets の default にレポートタイプ別の設定を上書きする（tools はツールごとにマージ）
+
+        Args:
+            report_type: レポートタイプ
+
+        Returns:
+            max_turns（None の場合は無制限）と tools（ツール名のパターン -> 呼び出し回数の上限）
+        """
+        budgets = self.servers_config.get("report_budgets", {}) or {}
+        default = budgets.get("default", {}) or {}
+        override = budgets.get(report_type, {}) or {} if report_type else {}
+        return {
+            "max_turns": override.get("max_turns", default.get("max_turns")),
+            "tools": {**(default.get("tools") or {}), **(override.get("tools") or {})},
+        }
+
+    def list_tools(self, server_name: str) -> List[Dict[str, Any]]:
+        """
+        MCP サーバーのツール一覧とスキーマサイズを取得
+
+        Returns:
+            name, full_name, schema_chars, estimated_tokens を含むツール情報のリスト（サイズの大きい順）
+        """
+        server_config = self.servers_config.get("servers", {}).get(server_name)
+        if not server_config:
+            raise ValueError(f"MCP サーバー '{server_name}' が設定ファイルに見つかりません")
+        if server_config.get("type", "stdio") != "stdio":
+            raise ValueError(f"ツール一覧の取得は stdio サーバーのみ対応しています: {server_name}")
+
+        command, args = self.get_launch_command(server_name)
+        with MCPStdioSession(command, args, env=self._resolve_env(server_config)) as session:
+            session.start()
+            raw_tools = session.list_tools()
+
+        tools = []
+        for tool in raw_tools:
+            # モデルに渡されるツール定義（名前・説明・入力スキーマ）の大きさを計測
+            definition = json.dumps(
+                {"name": tool.get("name"), "description": tool.get("description", ""), "input_schema": tool.get("inputSchema", {})},
+                ensure_ascii=False,
+            )
+            tools.append(
+                {
+                    "name": tool.get("name"),
+                    "full_name": f"mcp__{server_name}__{tool.get('name')}",
+                    "schema_chars": len(definition),
+                    "estimated_tokens": len(definition) // CHARS_PER_TOKEN,
+                }
+            )
+        return sorted(tools, key=lambda tool: tool["schema_chars"], reverse=True)
+
+    def build_tool_catalog(self, enabled_list: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        有効な MCP サーバーのツールカタログを作成して保存
+
+        Returns:
+            サーバー名をキーとする tools（ツール情報のリスト）と total_tokens（推定トークン数の合計）
+        """
+        catalog = self.load_tool_catalog()
+        for server_name in self.get_enabled_servers(enabled_list):
+            try:
+                tools = self.list_tools(server_name)
+            except Exception as e:
+                logger.error(f"MCP ツール一覧の取得に失敗 ({server_name}): {e}")
+                continue
+            catalog[server_name] = {"tools": tools, "total_tokens": sum(tool["estimated_tokens"] for tool in tools)}
+
+        path = self.install_root / "tools.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(catalog, ensure_ascii=False, indent=2), encoding="utf-8")
+        return catalog
+
+    def load_tool_catalog(self) -> Dict[str, Dict[str, Any]]:
+        """保存済みのツールカタログを読み込み（未作成の場合は空）"""
+        path = self.install_root / "tools.json"
+        try:
+            if path.exists():
+                return cast(Dict[str, Dict[str, Any]], json.loads(path.read_text(encoding="utf-8")))
+        except Exception as e:
+            logger.warning(f"MCP ツールカタログの読み込みエラー: {e}")
+        return {}
+
+    def estimate_tool_tokens(self, enabled_list: List[str], report_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        実行時にモデルのコンテキストへ追加される MCP ツール定義のトークン数を推定
+
+        Returns:
+            exposed_tools（公開ツール数）, estimated_tokens（推定トークン数）, cataloged（カタログの有無）
+        """
+        catalog = self.load_tool_catalog()
+        disallowed = set(self.get_disallowed_tools(enabled_list, report_type))
+        exposed_tools = 0
+        estimated_tokens = 0
+        cataloged = True
+        for server_name in self.get_enabled_servers(enabled_list):
+            if server_name not in catalog:
+                cataloged = False
+                continue
+            for tool in catalog[server_name]["tools"]:
+                if tool["full_name"] not in disallowed:
+                    exposed_tools += 1
+                    estimated_tokens += tool["estimated_tokens"]
+        return {"exposed_tools": exposed_tools, "estimated_tokens": estimated_tokens, "cataloged": cataloged}
+
     def list_available_servers(self) -> List[str]:
         """利用可能な MCP サーバー名のリストを取得"""
         return list(self.servers_config.get("servers", {}).keys())
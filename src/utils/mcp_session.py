@@ -0,0 +1,151 @@
+"""
+MCP セッションモジュール - stdio の MCP サーバーと JSON-RPC で直接通信（ハンドシェイク計測・ツール一覧取得用）
+"""
+
+import json
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+
+class MCPStdioSession:
+    """stdio の MCP サーバーとの最小限の JSON-RPC セッション"""
+
+    def __init__(self, command: str, args: Optional[List[str]] = None, env: Optional[Dict[str, str]] = None, timeout: float = 120.0):
+        """
+        Args:
+            command: MCP サーバーの起動コマンド
+            args: 起動コマンドの引数
+            env: 追加の環境変数
+            timeout: 各リクエストのタイムアウト（秒）
+        """
+        self.command = command
+        self.args = args or []
+        self.env = env or {}
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.server_info: Dict[str, Any] = {}
+        self._messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._next_id = 0
+
+    def _read_stdout(self) -> None:
+        assert self.process is not None and self.process.stdout is not None
+        for line in self.process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                self._messages.put(json.loads(line))
+            except json.JSONDecodeError:
+                logger.debug(f"MCP サーバーの出力を無視します: {line[:200]}")
+
+    def _send(self, payload: Dict[str, Any]) -> None:
+        assert self.process is not None and self.process.stdin is not None
+        self.process.stdin.write(json.dumps(payload) + "\n")
+        self.process.stdin.flush()
+
+    def start(self) -> Dict[str, float]:
+        """
+        MCP サーバーを起動して initialize ハンドシェイクを実行
+
+        Returns:
+            spawn_ms（プロセス起動）, handshake_ms（initialize 応答まで）, total_ms
+        """
+        started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [self.command, *self.args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, **self.env},
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        spawned = time.perf_counter()
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+
+        result = self.request(
+            "initialize",
+            {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "ai-tech-catchup-agent", "version": "1.0.0"},
+            },
+        )
+        self.server_info = result.get("serverInfo", {})
+        self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        finished = time.perf_counter()
+
+        return {
+            "spawn_ms": round((spawned - started) * 1000, 1),
+            "handshake_ms": round((finished - spawned) * 1000, 1),
+            "total_ms": round((finished - started) * 1000, 1),
+        }
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """JSON-RPC リクエストを送信して応答の result を取得"""
+        self._next_id += 1
+        request_id = self._next_id
+        payload: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            payload["params"] = params
+        self._send(payload)
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"MCP サーバーの応答がタイムアウトしました: {method}")
+            try:
+                message = self._messages.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                if self.process is not None and self.process.poll() is not None:
+                    raise RuntimeError(f"MCP サーバーが終了しました (exit code: {self.process.returncode})")
+                continue
+            # 通知やサーバーからのリクエストは読み飛ばす
+            if message.get("id") != request_id or "method" in message:
+                continue
+            if "error" in message:
+                raise RuntimeError(f"MCP サーバーのエラー ({method}): {message['error']}")
+            result: Dict[str, Any] = message.get("result", {})
+            return result
+
+    def list_tools(self) -> List[Dict[str, Any]]:
+        """MCP サーバーのツール定義一覧を取得（ページネーション対応）"""
+        tools: List[Dict[str, Any]] = []
+        cursor = None
+        while True:
+            result = self.request("tools/list", {"cursor": cursor} if cursor else {})
+            tools.extend(result.get("tools", []))
+            cursor = result.get("nextCursor")
+            if not cursor:
+                return tools
+
+    def close(self) -> None:
+        """MCP サーバーを終了"""
+        if self.process is None:
+            return
+        try:
+            if self.process.stdin:
+                self.process.stdin.close()
+            self.process.terminate()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+        finally:
+            self.process = None
+
+    def __enter__(self) -> "MCPStdioSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
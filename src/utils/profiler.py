@@ -0,0 +1,224 @@
+"""
+プロファイラモジュール - エージェントのプロセス自体が CPU・メモリを消費している箇所を計測
+
+バックグラウンドスレッドで全スレッドのスタックを一定間隔でサンプリングし（イベントループのスレッドでは実行中の
+asyncio タスクのコルーチン名をスタックに挿入）、フレームグラフ用の collapsed stack 形式で出力する。
+メモリは tracemalloc のスナップショットをパイプラインのステージの境界で取得し、割り当ての多い箇所をレポートする
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 待機中（CPU を使用していない）とみなすスタックの末端のフレーム（ファイル名, 関数名）
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("connection.py", "wait"),
+}
+# tracemalloc で保存するトレースバックのフレーム数
+TRACEMALLOC_FRAMES = 10
+# 割り当てレポートに出力する箇所の数
+TOP_ALLOCATIONS = 20
+
+_active: Optional["Profiler"] = None
+
+
+def frame_label(frame: FrameType) -> str:
+    """collapsed stack のフレーム名（モジュールのパス:関数の修飾名）"""
+    filename = frame.f_code.co_filename
+    if "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.relpath(filename) if filename.startswith(os.getcwd()) else os.path.basename(filename)
+    # co_qualname は Python 3.11 以降
+    return f"{filename}:{getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+
+
+class Profiler:
+    """サンプリングプロファイラと tracemalloc のスナップショットによるプロセスのプロファイル"""
+
+    def __init__(self, output_dir: str, interval: float = 0.005, name: str = "run", include_idle: bool = False):
+        """
+        Args:
+            output_dir: プロファイル結果を保存するディレクトリ
+            interval: スタックのサンプリング間隔（秒）
+            name: 出力ファイル名の接頭辞（レポートモードなど）
+            include_idle: 待機中のスタックもサンプルに含めるか
+        """
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.include_idle = include_idle
+        self.run_id = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.boundaries: List[Dict[str, Any]] = []
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        """サンプリングと tracemalloc を開始"""
+        if self._thread is not None:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._previous = tracemalloc.take_snapshot()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"プロファイルを開始しました: {self.run_id} (サンプリング間隔 {self.interval * 1000:.1f}ms)")
+
+    @staticmethod
+    def _task_label(frame: FrameType) -> Optional[str]:
+        """
+        イベントループの _run_once のフレームから実行中の asyncio タスクのコルーチン名を取得
+
+        asyncio.run を繰り返すとスレッドのイベントループが入れ替わるため、ループはサンプルごとにフレームから取得する
+        """
+        loop = frame.f_locals.get("self")
+        if not isinstance(loop, asyncio.AbstractEventLoop) or loop.is_closed():
+            return None
+        task = asyncio.current_task(loop)
+        if task is None:
+            return None
+        coro = task.get_coro()
+        return f"<task {getattr(coro, '__qualname__', type(coro).__name__)}>"
+
+    def _collapse(self, thread_name: str, leaf: FrameType) -> Optional[str]:
+        """スレッドのスタックを collapsed stack 形式（ルートから ; 区切り）に変換（待機中の場合は None）"""
+        code = leaf.f_code
+        if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            return None
+
+        frames: List[FrameType] = []
+        frame: Optional[FrameType] = leaf
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        labels = [thread_name]
+        for frame in reversed(frames):
+            labels.append(frame_label(frame))
+            if frame.f_code.co_name == "_run_once":
+                task = self._task_label(frame)
+                if task:
+                    labels.append(task)
+        return ";".join(labels)
+
+    def _sample_loop(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                try:
+                    stack = self._collapse(names.get(thread_id, str(thread_id)), frame)
+                except Exception:
+                    continue
+                if stack:
+                    with self._lock:
+                        self.stacks[stack] += 1
+            self.samples += 1
+
+    def mark(self, label: str) -> None:
+        """
+        ステージの境界で tracemalloc のスナップショットを取得し、前回の境界からの増加量が多い箇所を記録
+
+        Args:
+            label: 境界の名前（ステージ名など）
+        """
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        growth: List[Tuple[str, int, int]] = []
+        with self._lock:
+            if self._previous is not None:
+                for stat in snapshot.compare_to(self._previous, "lineno")[:5]:
+                    frame = stat.traceback[0]
+                    growth.append((f"{frame.filename}:{frame.lineno}", stat.size_diff, stat.count_diff))
+            self._previous = snapshot
+            self.boundaries.append(
+                {"label": label, "elapsed": time.perf_counter() - self._started, "current": current, "peak": peak, "growth": growth}
+            )
+
+    def _allocation_report(self) -> str:
+        lines = [f"# Allocation report: {self.run_id}", ""]
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB")
+        lines.append("")
+        lines.append(f"## Top {TOP_ALLOCATIONS} allocations (lineno)")
+        # プロファイラ自身（サンプルの集計・スナップショット）の割り当ては除外
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)])
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+        lines.append("")
+        lines.append("## Stage boundaries")
+        for boundary in self.boundaries:
+            header = f"[{boundary['elapsed']:8.2f}s] {boundary['label']}"
+            lines.append(f"{header}: current {boundary['current'] / 1024:.1f} KiB, peak {boundary['peak'] / 1024:.1f} KiB")
+            for location, size_diff, count_diff in boundary["growth"]:
+                lines.append(f"    {size_diff / 1024:+10.1f} KiB {count_diff:+8d} blocks  {location}")
+        return "\n".join(lines) + "\n"
+
+    def stop(self) -> Dict[str, str]:
+        """
+        サンプリングを停止し、collapsed stack と割り当てレポートを保存
+
+        Returns:
+            出力ファイルのパス（stacks, allocations。開始していない場合は空）
+        """
+        if self._thread is None:
+            return {}
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stacks_path = self.output_dir / f"{self.run_id}.collapsed.txt"
+        allocations_path = self.output_dir / f"{self.run_id}.allocations.txt"
+        with self._lock:
+            stacks = sorted(self.stacks.items())
+        with open(stacks_path, "w", encoding="utf-8") as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in stacks)
+        with open(allocations_path, "w", encoding="utf-8") as file:
+            file.write(self._allocation_report())
+        tracemalloc.stop()
+
+        logger.info(f"プロファイルを保存しました: {stacks_path} ({self.samples} サンプル), {allocations_path}")
+        return {"stacks": str(stacks_path), "allocations": str(allocations_path)}
+
+
+def use_profiler(profiler: Optional[Profiler]) -> None:
+    """プロセス全体で使用するプロファイラを設定（None で解除）"""
+    global _active
+    _active = profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    """使用中のプロファイラを取得"""
+    return _active
+
+
+def mark_boundary(label: str) -> None:
+    """プロファイル中の場合、ステージの境界でメモリのスナップショットを取得"""
+    if _active is not None:
+        _active.mark(label)
@@ -10,16 +10,21 @@ from typing import Any, Dict, Optional
 import yaml
 
 from ..config import settings
+from .source_registry import SourceRegistry, extract_urls
 
 logger = logging.getLogger(__name__)
 
+# プロンプト内のレポート形式（構成）の見出し
+REPORT_FORMAT_HEADINGS = ("## レポート形式", "## レポート構成")
+
 
 class PromptManager:
     """プロンプト管理クラス"""
 
-    def __init__(self, prompts_dir: str = "prompts"):
+    def __init__(self, prompts_dir: str = "prompts", source_registry: Optional[SourceRegistry] = None):
         self.prompts_dir = Path(prompts_dir)
         self.prompts = self._load_prompts()
+        self.source_registry = source_registry
 
     def _load_prompts(self) -> Dict[str, Any]:
         """promptsディレクトリからYAMLファイルを読み込み"""
@@ -76,7 +81,7 @@ class PromptManager:
             # 自動的にkey_urlsを統合
             key_urls_config = self.prompts["key_urls"]
             if "sources" in key_urls_config:
-                kwargs["key_urls"] = key_urls_config["sources"]
+                kwargs["key_urls"] = self._rank_key_urls(key_urls_config["sources"])
 
         # MCP ツール指示を動的に統合（有効なサーバーがある場合のみ）
         mcp_tools_parts = []
@@ -118,6 +123,15 @@ class PromptManager:
             month_ago = yesterday - timedelta(days=29)  # 前日から30日間
             kwargs["month_period"] = f"{month_ago.strftime('%Y年%m月%d日')}から{yesterday.strftime('%Y年%m月%d日')}までの過去1ヶ月"
 
+        # 前回のレポート作成以降の期間を動的に設定（since: 前回成功したレポートの作成時刻。未記録の場合は過去24時間）
+        if "since_period" not in kwargs:
+            since = kwargs.get("since")
+            if since:
+                kwargs["since_period"] = f"{since.strftime('%Y年%m月%d日 %H:%M')}以降（前回のレポート作成以降）"
+            else:
+                yesterday = datetime.now() - timedelta(days=1)
+                kwargs["since_period"] = f"{yesterday.strftime('%Y年%m月%d日 %H:%M')}以降の過去24時間"
+
         if "template" in prompt_config:
             # テンプレートプロンプト（変数置換あり）
             template = prompt_config["template"]
@@ -148,17 +162,60 @@ class PromptManager:
             # 月間期間が含まれている場合は置換
             if "{month_period}" in prompt_text and "month_period" in kwargs:
                 prompt_text = prompt_text.replace("{month_period}", kwargs["month_period"])
+            # 前回のレポート作成以降の期間が含まれている場合は置換
+            if "{since_period}" in prompt_text and "since_period" in kwargs:
+                prompt_text = prompt_text.replace("{since_period}", kwargs["since_period"])
             # MCP指示が含まれている場合は置換
             if "{mcp_tools}" in prompt_text and "mcp_tools" in kwargs:
                 prompt_text = prompt_text.replace("{mcp_tools}", kwargs["mcp_tools"])
             # トピックが含まれている場合は置換
             if "{topic}" in prompt_text and "topic" in kwargs:
                 prompt_text = prompt_text.replace("{topic}", kwargs["topic"])
+            # その他の変数が含まれている場合は置換
+            for key, value in kwargs.items():
+                if isinstance(value, str) and f"{{{key}}}" in prompt_text:
+                    prompt_text = prompt_text.replace(f"{{{key}}}", value)
             return str(prompt_text)
         else:
             logger.error(f"プロンプト設定が無効です: {prompt_type}")
             return None
 
+    def get_source_urls(self) -> list:
+        """key_urls に含まれる情報源の URL リストを取得"""
+        return extract_urls(self.prompts.get("key_urls", {}).get("sources", ""))
+
+    def _rank_key_urls(self, sources: str) -> str:
+        """
+        情報源レジストリの記録に基づき、停止中の情報源を除外し、単位レイテンシあたりの鮮度が高い情報源を先頭に列挙
+        """
+        if self.source_registry is None:
+            return sources
+
+        urls = extract_urls(sources)
+        self.source_registry.track(urls)
+        ranked, suppressed = self.source_registry.rank(urls)
+        if suppressed:
+            logger.info(f"停止中の情報源を除外: {suppressed}")
+            sources = "\n".join(line for line in sources.splitlines() if not any(url in extract_urls(line) for url in suppressed))
+
+        scored = [url for url in ranked if self.source_registry.stats(url)["score"] is not None][: settings.source_rank_top_n]
+        if not scored:
+            return sources
+        priority = "\n".join(f"  - {url}" for url in scored)
+        return f"- **優先して確認する情報源（更新頻度が高く応答が速い順）**:\n{priority}\n{sources}"
+
+    def get_report_format(self, prompt_type: str, **kwargs: Any) -> Optional[str]:
+        """レポートタイプのプロンプトから、レポート形式（構成）の部分のみを取得"""
+        prompt = self.get_prompt(prompt_type, **kwargs)
+        if not prompt:
+            return None
+        for heading in REPORT_FORMAT_HEADINGS:
+            index = prompt.find(heading)
+            if index >= 0:
+                return prompt[index:].split("\n", 1)[-1].strip()
+        logger.warning(f"レポート形式が見つかりません: {prompt_type}")
+        return None
+
     def get_prompt_info(self, prompt_type: str) -> Dict[str, Any]:
         """プロンプトの情報を取得"""
         if prompt_type not in self.prompts:
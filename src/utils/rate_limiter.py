@@ -0,0 +1,296 @@
+"""
+レート制限モジュール - プロバイダ（Anthropic, Gemini, GitHub）ごとのリクエスト数・トークン数のトークンバケットを共有し、
+優先度の高いジョブから順に実行を許可する。レスポンスヘッダのレート制限情報に追従し、任意でファイル経由で複数プロセス間で状態を共有する
+"""
+
+import contextlib
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .json_store import JSONStore
+
+logger = logging.getLogger(__name__)
+
+# 優先度が指定されていない場合の優先度（小さいほど優先）
+DEFAULT_PRIORITY = 1
+# 待機中に状態を再確認する最大間隔（秒）
+MAX_POLL_INTERVAL = 1.0
+# レート制限で拒否されたリクエストを再試行する最大回数
+MAX_RATE_LIMIT_RETRIES = 2
+
+# レスポンスヘッダ名（Anthropic, GitHub）
+REQUESTS_REMAINING_HEADERS = ("anthropic-ratelimit-requests-remaining", "x-ratelimit-remaining")
+REQUESTS_RESET_HEADERS = ("anthropic-ratelimit-requests-reset", "x-ratelimit-reset")
+TOKENS_REMAINING_HEADERS = ("anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-input-tokens-remaining")
+TOKENS_RESET_HEADERS = ("anthropic-ratelimit-tokens-reset", "anthropic-ratelimit-input-tokens-reset")
+
+_priority: ContextVar[Optional[int]] = ContextVar("rate_limit_priority", default=None)
+
+
+@dataclass
+class ProviderLimit:
+    """プロバイダごとのレート制限（0 の場合は制限なし。レスポンスヘッダによる待機のみ行う）"""
+
+    requests_per_minute: float = 0.0
+    tokens_per_minute: float = 0.0
+
+
+def parse_priorities(value: str) -> Dict[str, int]:
+    """ "report:0,topic_report:2" 形式のレポートタイプ別の優先度を解析"""
+    priorities = {}
+    for entry in value.split(","):
+        name, _, priority = entry.partition(":")
+        if name.strip() and priority.strip().lstrip("-").isdigit():
+            priorities[name.strip()] = int(priority)
+    return priorities
+
+
+def usage_tokens(usage: Mapping[str, Any]) -> int:
+    """レート制限の対象となるトークン数（入力・出力・キャッシュ書き込み。キャッシュ読み込みは除く）"""
+    return int(sum(usage.get(key) or 0 for key in ("input_tokens", "output_tokens", "cache_creation_input_tokens")))
+
+
+def _parse_reset(value: str, now: float) -> Optional[float]:
+    """リセット時刻（秒数, UNIX 時刻, RFC 3339）を UNIX 時刻に変換"""
+    try:
+        number = float(value)
+        return number if number > 1e9 else now + number
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _header(headers: Mapping[str, str], names: Tuple[str, ...]) -> Optional[str]:
+    lowered = {key.lower(): value for key, value in headers.items()}
+    return next((lowered[name] for name in names if name in lowered), None)
+
+
+class RateLimiter:
+    """プロバイダごとのリクエスト数・トークン数のトークンバケットと優先度付きの待ち行列"""
+
+    def __init__(self, limits: Dict[str, ProviderLimit], state_file: Optional[str] = None, priorities: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            limits: プロバイダ名（anthropic, gemini, github）ごとのレート制限
+            state_file: バケットの状態を複数プロセスで共有する JSON ファイルのパス（None の場合はプロセス内のみ）
+            priorities: レポートタイプ別の優先度（小さいほど優先。例: {"report": 0, "topic_report": 2}）
+        """
+        self.limits = limits
+        self.state_file = Path(state_file) if state_file else None
+        self._store = JSONStore(state_file, "レート制限の状態", indent=None) if state_file else None
+        self.priorities = priorities or {}
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._state: Dict[str, Dict[str, float]] = {}
+        self._waiting: Dict[str, List[Tuple[int, int]]] = {}
+        self._sequence = itertools.count()
+
+    def _transact(self, apply: Callable[[Dict[str, Dict[str, float]]], Any]) -> Any:
+        """バケットの状態を読み込んで更新（ファイル共有時はファイルロックで複数プロセス間を直列化）"""
+        with self._lock:
+            if self._store is None:
+                return apply(self._state)
+            return self._store.update(apply)
+
+    def _bucket(self, state: Dict[str, Dict[str, float]], provider: str, now: float) -> Dict[str, float]:
+        """プロバイダのバケットを取得し、経過時間分を補充"""
+        limit = self.limits.get(provider, ProviderLimit())
+        bucket = state.setdefault(
+            provider, {"requests": limit.requests_per_minute, "tokens": limit.tokens_per_minute, "updated_at": now, "blocked_until": 0.0}
+        )
+        elapsed = max(0.0, now - bucket["updated_at"])
+        if limit.requests_per_minute:
+            bucket["requests"] = min(limit.requests_per_minute, bucket["requests"] + elapsed * limit.requests_per_minute / 60)
+        if limit.tokens_per_minute:
+            bucket["tokens"] = min(limit.tokens_per_minute, bucket["tokens"] + elapsed * limit.tokens_per_minute / 60)
+        bucket["updated_at"] = now
+        return bucket
+
+    def _try_consume(self, provider: str, tokens: int) -> float:
+        """
+        バケットからリクエスト 1 件とトークンを消費
+
+        Returns:
+            消費できた場合は 0、できない場合は消費できるまでの待機時間（秒）
+        """
+        limit = self.limits.get(provider, ProviderLimit())
+
+        def apply(state: Dict[str, Dict[str, float]]) -> float:
+            now = time.time()
+            bucket = self._bucket(state, provider, now)
+            needed = min(tokens, limit.tokens_per_minute) if limit.tokens_per_minute else 0
+            waits = [bucket["blocked_until"] - now]
+            if limit.requests_per_minute and bucket["requests"] < 1:
+                waits.append((1 - bucket["requests"]) * 60 / limit.requests_per_minute)
+            if needed and bucket["tokens"] < needed:
+                waits.append((needed - bucket["tokens"]) * 60 / limit.tokens_per_minute)
+            wait = max(waits)
+            if wait > 0:
+                return wait
+            if limit.requests_per_minute:
+                bucket["requests"] -= 1
+            bucket["tokens"] -= needed
+            return 0.0
+
+        result: float = self._transact(apply)
+        return result
+
+    def priority_for(self, report_type: Optional[str]) -> int:
+        """レポートタイプの優先度"""
+        return self.priorities.get(report_type or "", DEFAULT_PRIORITY)
+
+    def acquire(self, provider: str, tokens: int = 0, priority: Optional[int] = None) -> float:
+        """
+        リクエストの実行許可を取得（許可されるまでブロック）
+
+        待機中のリクエストは優先度順（同じ優先度は到着順）に許可する
+
+        Args:
+            provider: プロバイダ名
+            tokens: 消費する見込みのトークン数
+            priority: 優先度（None の場合は rate_limit_priority で設定された優先度）
+
+        Returns:
+            待機した時間（秒）
+        """
+        if priority is None:
+            priority = _priority.get()
+        ticket = (priority if priority is not None else DEFAULT_PRIORITY, next(self._sequence))
+        started = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._waiting.setdefault(provider, []), ticket)
+        try:
+            while True:
+                with self._condition:
+                    if self._waiting[provider][0] != ticket:
+                        self._condition.wait(MAX_POLL_INTERVAL)
+                        continue
+                wait = self._try_consume(provider, tokens)
+                if wait <= 0:
+                    break
+                with self._condition:
+                    self._condition.wait(min(wait, MAX_POLL_INTERVAL))
+        finally:
+            with self._condition:
+                self._waiting[provider].remove(ticket)
+                heapq.heapify(self._waiting[provider])
+                self._condition.notify_all()
+
+        waited = time.monotonic() - started
+        if waited >= 1.0:
+            logger.info(f"レート制限のため {waited:.1f} 秒待機しました: {provider} (優先度: {ticket[0]})")
+        return waited
+
+    def record(self, provider: str, requests: int = 0, tokens: int = 0) -> None:
+        """実際に消費したリクエスト数・トークン数と見込みとの差分をバケットに反映（負の値で返却）"""
+        if not requests and not tokens:
+            return
+        limit = self.limits.get(provider, ProviderLimit())
+
+        def apply(state: Dict[str, Dict[str, float]]) -> None:
+            bucket = self._bucket(state, provider, time.time())
+            if limit.requests_per_minute:
+                bucket["requests"] -= requests
+            if limit.tokens_per_minute:
+                bucket["tokens"] = min(limit.tokens_per_minute, bucket["tokens"] - tokens)
+
+        self._transact(apply)
+
+    def block(self, provider: str, seconds: float) -> None:
+        """指定時間、プロバイダへのリクエストを停止（429 の Retry-After など）"""
+
+        def apply(state: Dict[str, Dict[str, float]]) -> None:
+            now = time.time()
+            bucket = self._bucket(state, provider, now)
+            bucket["blocked_until"] = max(bucket["blocked_until"], now + seconds)
+
+        self._transact(apply)
+        logger.warning(f"レート制限により {seconds:.1f} 秒間リクエストを停止します: {provider}")
+
+    def update_from_headers(self, provider: str, headers: Mapping[str, str], status_code: Optional[int] = None) -> bool:
+        """
+        レスポンスヘッダのレート制限情報（残り回数・リセット時刻・Retry-After）をバケットに反映
+
+        Returns:
+            レート制限によりリクエストが拒否された場合は True（再試行の判定に使用）
+        """
+        now = time.time()
+        retry_after = _header(headers, ("retry-after",))
+        requests_remaining = _header(headers, REQUESTS_REMAINING_HEADERS)
+        tokens_remaining = _header(headers, TOKENS_REMAINING_HEADERS)
+        blocked_until = now + float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() else 0.0
+        for remaining, reset_names in ((requests_remaining, REQUESTS_RESET_HEADERS), (tokens_remaining, TOKENS_RESET_HEADERS)):
+            reset = _header(headers, reset_names)
+            if remaining is not None and remaining.isdigit() and int(remaining) == 0 and reset:
+                blocked_until = max(blocked_until, _parse_reset(reset, now) or 0.0)
+
+        limited = status_code == 429 or (status_code == 403 and (bool(retry_after) or requests_remaining == "0"))
+        if limited and blocked_until <= now:
+            blocked_until = now + 60
+
+        def apply(state: Dict[str, Dict[str, float]]) -> None:
+            bucket = self._bucket(state, provider, now)
+            if requests_remaining is not None and requests_remaining.isdigit():
+                bucket["requests"] = min(bucket["requests"], float(requests_remaining))
+            if tokens_remaining is not None and tokens_remaining.isdigit():
+                bucket["tokens"] = min(bucket["tokens"], float(tokens_remaining))
+            bucket["blocked_until"] = max(bucket["blocked_until"], blocked_until)
+
+        self._transact(apply)
+        if blocked_until > now:
+            logger.warning(f"レート制限の上限に達したため {blocked_until - now:.1f} 秒間リクエストを停止します: {provider}")
+        return limited
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def use_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """プロセス全体で使用するレート制限を設定"""
+    global _limiter
+    _limiter = limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    """プロセス全体で使用するレート制限を取得（未設定の場合は設定値から作成）"""
+    global _limiter
+    if _limiter is None:
+        from ..config import settings
+
+        _limiter = RateLimiter(
+            {
+                "anthropic": ProviderLimit(settings.rate_limit_anthropic_rpm, settings.rate_limit_anthropic_tpm),
+                "gemini": ProviderLimit(settings.rate_limit_gemini_rpm, settings.rate_limit_gemini_tpm),
+                "github": ProviderLimit(settings.rate_limit_github_rpm),
+            },
+            state_file=settings.rate_limit_state_file or None,
+            priorities=parse_priorities(settings.rate_limit_priorities),
+        )
+    return _limiter
+
+
+def current_priority() -> Optional[int]:
+    """このコンテキストに設定された優先度（別スレッドのイベントループで acquire する場合に引き継ぐため）"""
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def rate_limit_priority(report_type: Optional[str]) -> Iterator[int]:
+    """このコンテキスト（スレッド・タスク）から発行するリクエストの優先度をレポートタイプから設定"""
+    priority = get_rate_limiter().priority_for(report_type)
+    token = _priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _priority.reset(token)
@@ -0,0 +1,334 @@
+"""
+レポート検索インデックスモジュール - 配信済みレポートをチャンクに分割し、BM25（任意でベクトル検索）で関連するチャンクのみを取得
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .json_store import JSONStore
+
+logger = logging.getLogger(__name__)
+
+# 英数字の単語と、日本語（ひらがな・カタカナ・漢字）の連続部分
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+")
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$")
+TOP_LEVEL_ITEM_PATTERN = re.compile(r"^(?:[-*+]|\d+\.)\s")
+
+# チャンクの目安の文字数（見出し・トップレベルの箇条書きの区切りで分割）
+CHUNK_CHARS = 800
+# BM25 のパラメータ
+BM25_K1 = 1.5
+BM25_B = 0.75
+# BM25 とベクトル検索の順位を統合する Reciprocal Rank Fusion の定数
+RRF_K = 60
+EMBEDDING_BATCH_SIZE = 100
+
+# 過去のレポートを検索するツールの定義（MCP サーバー・Claude API のローカルツールで共通）
+SEARCH_TOOL: Dict[str, Any] = {
+    "name": "search_reports",
+    "description": "過去に配信した AI 技術動向レポート（日次・週次・月次・トピック別）から、質問に関連する部分のみを Issue へのリンク付きで検索します。",
+    "inputSchema": {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "検索クエリ（例: VLA モデル, Claude Code の新機能）"},
+            "k": {"type": "integer", "description": "取得するチャンク数（デフォルト: 5）", "minimum": 1, "maximum": 20},
+            "report_type": {
+                "type": "string",
+                "enum": ["report", "weekly_report", "monthly_report", "topic_report"],
+                "description": "レポートタイプで絞り込み",
+            },
+            "topic": {"type": "string", "description": "トピック名で絞り込み（部分一致）"},
+            "since": {"type": "string", "description": "この日付（YYYY-MM-DD）以降に作成されたレポートに絞り込み"},
+        },
+        "required": ["query"],
+    },
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """検索用のトークンに分割（英数字は単語、日本語は文字 bi-gram）"""
+    tokens: List[str] = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        word = match.group(0)
+        if CJK_PATTERN.match(word) and len(word) > 1:
+            tokens.extend(first + second for first, second in zip(word, word[1:]))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def extract_report_content(body: str) -> str:
+    """Issue 本文からヘッダ・フッタ（区切り線 --- の外側）を除いたレポート本文を取得"""
+    parts = re.split(r"^---\s*$", body, flags=re.MULTILINE)
+    return "---".join(parts[1:-1]).strip() if len(parts) >= 3 else body.strip()
+
+
+def chunk_markdown(markdown: str, max_chars: int = CHUNK_CHARS) -> List[Dict[str, str]]:
+    """
+    Markdown を見出しごとに分割し、長いセクションはトップレベルの箇条書き・段落の区切りでさらに分割
+
+    Returns:
+        heading（見出しの階層を " > " で連結）と text を含むチャンクのリスト
+    """
+    chunks: List[Dict[str, str]] = []
+    headings: List[str] = []
+    lines: List[str] = []
+
+    def flush() -> None:
+        text = "\n".join(lines).strip()
+        if text:
+            chunks.append({"heading": " > ".join(headings), "text": text})
+        lines.clear()
+
+    for line in markdown.splitlines():
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            flush()
+            level = len(heading.group(1))
+            headings[:] = headings[: level - 1] + [heading.group(2).strip()]
+            continue
+        boundary = not line.strip() or TOP_LEVEL_ITEM_PATTERN.match(line)
+        if boundary and sum(len(existing) + 1 for existing in lines) >= max_chars:
+            flush()
+        lines.append(line)
+    flush()
+    return chunks
+
+
+class ReportIndex:
+    """配信済みレポートのチャンク検索インデックス（JSON ファイル）"""
+
+    def __init__(self, directory: str, embedding_model: Optional[str] = None, google_api_key: str = ""):
+        """
+        Args:
+            directory: インデックスを保存するディレクトリ（STATE_DIR/report_index）
+            embedding_model: ベクトル検索に使用する埋め込みモデル（例: text-embedding-004。None の場合は BM25 のみ）
+            google_api_key: 埋め込みの作成に使用する Google API Key
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / "reports.json"
+        self.embedding_model = embedding_model if embedding_model and google_api_key else None
+        self.google_api_key = google_api_key
+        self._store = JSONStore(str(self.path), "レポート検索インデックス", default=lambda: {"docs": {}}, indent=None)
+        self._lock = threading.Lock()
+        self._loaded_mtime = -1.0
+        self._data: Dict[str, Any] = {"docs": {}}
+        self._chunks: List[Dict[str, Any]] = []
+        self._doc_freqs: Counter = Counter()
+        self._avg_length = 0.0
+
+    def _load(self) -> None:
+        """ファイルが更新されていれば読み込み、BM25 の統計を再計算"""
+        mtime = self.path.stat().st_mtime if self.path.exists() else 0.0
+        with self._lock:
+            if mtime == self._loaded_mtime:
+                return
+            self._data = self._store.read()
+            self._chunks = [
+                {**chunk, "doc_id": doc_id, "terms": Counter(tokenize(f"{doc['title']} {chunk['heading']} {chunk['text']}"))}
+                for doc_id, doc in self._data["docs"].items()
+                for chunk in doc["chunks"]
+            ]
+            self._doc_freqs = Counter(term for chunk in self._chunks for term in chunk["terms"])
+            self._avg_length = sum(sum(chunk["terms"].values()) for chunk in self._chunks) / max(1, len(self._chunks))
+            self._loaded_mtime = mtime
+
+    def _embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """テキストの埋め込みを作成（無効・失敗時は None）"""
+        if not self.embedding_model or not texts:
+            return None
+        try:
+            from google import genai
+
+            client = genai.Client(api_key=self.google_api_key)
+            vectors: List[List[float]] = []
+            for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+                end = start + EMBEDDING_BATCH_SIZE
+                batch = texts[start:end]
+                response = client.models.embed_content(model=self.embedding_model, contents=batch)  # type: ignore[arg-type]
+                vectors.extend(list(embedding.values or []) for embedding in response.embeddings or [])
+            return vectors if len(vectors) == len(texts) else None
+        except Exception as e:
+            logger.warning(f"埋め込みの作成に失敗（BM25 のみで検索します）: {e}")
+            return None
+
+    def add(self, doc_id: str, title: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        レポートをインデックスに追加（同じ doc_id のレポートは置き換え）
+
+        Args:
+            doc_id: レポートの ID（Issue の URL など）
+            title: レポートのタイトル
+            content: レポート本文（Markdown）
+            metadata: url, report_type, topic, created_at などのメタデータ
+
+        Returns:
+            追加したチャンク数
+        """
+        return self.add_many([{"doc_id": doc_id, "title": title, "content": content, "metadata": metadata or {}}])
+
+    def add_many(self, reports: List[Dict[str, Any]]) -> int:
+        """
+        複数のレポートをまとめてインデックスに追加（複数プロセスからの更新はファイルロックで直列化）
+
+        Args:
+            reports: doc_id, title, content, metadata を含むレポートのリスト
+
+        Returns:
+            追加したチャンク数の合計
+        """
+        if not reports:
+            return 0
+        docs: Dict[str, Dict[str, Any]] = {}
+        for report in reports:
+            chunks: List[Dict[str, Any]] = list(chunk_markdown(report["content"]))
+            vectors = self._embed([f"{report['title']}\n{chunk['heading']}\n{chunk['text']}" for chunk in chunks])
+            if vectors:
+                for chunk, vector in zip(chunks, vectors):
+                    chunk["embedding"] = [round(value, 6) for value in vector]
+            docs[report["doc_id"]] = {
+                "title": report["title"],
+                **report.get("metadata", {}),
+                "indexed_at": datetime.now().isoformat(timespec="seconds"),
+                "chunks": chunks,
+            }
+
+        self._store.update(lambda data: data["docs"].update(docs))
+        total = sum(len(doc["chunks"]) for doc in docs.values())
+        logger.info(f"レポートを検索インデックスに追加しました: {len(docs)} 件 ({total} チャンク)")
+        return total
+
+    def indexed_versions(self) -> Dict[str, Optional[str]]:
+        """インデックス済みのレポートの doc_id -> updated_at（差分更新の判定用）"""
+        return {doc_id: doc.get("updated_at") for doc_id, doc in self._store.read()["docs"].items()}
+
+    def get_meta(self, key: str) -> Any:
+        """インデックスのメタデータ（同期済みの時刻など）を取得"""
+        return self._store.read().get("meta", {}).get(key)
+
+    def set_meta(self, key: str, value: Any) -> None:
+        """インデックスのメタデータを更新"""
+        self._store.update(lambda data: data.setdefault("meta", {}).update({key: value}))
+
+    def _bm25(self, query_terms: List[str], chunk: Dict[str, Any]) -> float:
+        length = sum(chunk["terms"].values())
+        score = 0.0
+        for term in set(query_terms):
+            frequency = chunk["terms"].get(term, 0)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(self._chunks) - self._doc_freqs[term] + 0.5) / (self._doc_freqs[term] + 0.5))
+            score += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / max(self._avg_length, 1.0)))
+        return score
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        report_type: Optional[str] = None,
+        topic: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        クエリに関連するチャンクを取得（埋め込みモデルが有効な場合は BM25 とベクトル検索の順位を統合）
+
+        Args:
+            query: 検索クエリ
+            k: 取得するチャンク数
+            report_type: レポートタイプで絞り込み（report, weekly_report, monthly_report, topic_report）
+            topic: トピック名で絞り込み（部分一致）
+            since: この日付（YYYY-MM-DD）以降に作成されたレポートに絞り込み
+
+        Returns:
+            title, url, heading, text, created_at, report_type, topic, score を含むチャンクのリスト
+        """
+        self._load()
+        docs = self._data["docs"]
+
+        def matches(doc: Dict[str, Any]) -> bool:
+            if report_type and doc.get("report_type") != report_type:
+                return False
+            if topic and topic.lower() not in str(doc.get("topic") or "").lower():
+                return False
+            return not since or str(doc.get("created_at") or "")[:10] >= since
+
+        candidates = [chunk for chunk in self._chunks if matches(docs[chunk["doc_id"]])]
+        query_terms = tokenize(query)
+        bm25 = sorted(((self._bm25(query_terms, chunk), index) for index, chunk in enumerate(candidates)), reverse=True)
+        rankings: List[List[Tuple[float, int]]] = [[entry for entry in bm25 if entry[0] > 0]]
+
+        query_vector = self._embed([query])
+        if query_vector:
+            rankings.append(
+                sorted(
+                    ((_cosine(query_vector[0], chunk["embedding"]), index) for index, chunk in enumerate(candidates) if chunk.get("embedding")),
+                    reverse=True,
+                )
+            )
+
+        # Reciprocal Rank Fusion（BM25 のみの場合は BM25 の順位そのまま）
+        fused: Dict[int, float] = {}
+        for ranking in rankings:
+            for rank, (_, index) in enumerate(ranking):
+                fused[index] = fused.get(index, 0.0) + 1 / (RRF_K + rank + 1)
+
+        results = []
+        for index, score in sorted(fused.items(), key=lambda entry: -entry[1])[:k]:
+            chunk = candidates[index]
+            doc = docs[chunk["doc_id"]]
+            results.append(
+                {
+                    "title": doc["title"],
+                    "url": doc.get("url") or chunk["doc_id"],
+                    "heading": chunk["heading"],
+                    "text": chunk["text"],
+                    "created_at": doc.get("created_at"),
+                    "report_type": doc.get("report_type"),
+                    "topic": doc.get("topic"),
+                    "score": round(score, 6),
+                }
+            )
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """インデックスのレポート数・チャンク数"""
+        self._load()
+        return {"reports": len(self._data["docs"]), "chunks": len(self._chunks)}
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """検索結果を回答のコンテキスト用の Markdown に整形"""
+    if not results:
+        return "該当するレポートは見つかりませんでした。"
+    sections = []
+    for result in results:
+        created_at = str(result.get("created_at") or "")[:10]
+        heading = f" - {result['heading']}" if result["heading"] else ""
+        sections.append(f"### [{result['title']}]({result['url']}){heading}\n作成日: {created_at}\n\n{result['text']}")
+    return "\n\n".join(sections)
+
+
+def run_search_tool(report_index: ReportIndex, arguments: Dict[str, Any], default_k: int = 5) -> str:
+    """search_reports ツールの引数で検索し、結果を Markdown で返す"""
+    results = report_index.search(
+        arguments["query"],
+        k=min(int(arguments.get("k") or default_k), 20),
+        report_type=arguments.get("report_type"),
+        topic=arguments.get("topic"),
+        since=arguments.get("since"),
+    )
+    logger.info(f"レポート検索: {arguments['query']} ({len(results)} 件)")
+    return format_results(results)
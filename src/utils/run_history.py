@@ -0,0 +1,160 @@
+"""
+実行履歴モジュール - レポートタイプ・モデルごとの実行時間・トークン数・ツール呼び出し回数・失敗を記録し、
+目標の実行時間に収まる実行パラメータ（generate ステージの同時実行数、生成のタイムアウト、最大出力トークン数）を推奨
+"""
+
+import fcntl
+import json
+import logging
+import math
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# 推奨値の計算に使用する直近の実行数
+HISTORY_WINDOW = 50
+# 推奨値を計算するのに必要な成功した実行数（これより少ない場合は設定値のまま）
+MIN_RUNS = 3
+# 推奨値の余裕（最大出力トークン数は p95 の 1.25 倍、タイムアウトは p95 の 1.5 倍）
+TOKEN_HEADROOM = 1.25
+TIMEOUT_HEADROOM = 1.5
+# 自動調整で設定値より増やす場合の generate ステージの同時実行数の上限（設定値がこれより大きい場合は設定値まで）
+MAX_AUTO_CONCURRENCY = 4
+# 失敗率がこれ以上の場合は同時実行数を設定値より増やさない（レート制限やタイムアウトの増加を防ぐため）
+FAILURE_RATE_LIMIT = 0.25
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """パーセンタイル（最近傍法、q は 0〜100）"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(len(ordered) * q / 100) - 1)
+    return ordered[index]
+
+
+def _round_up(value: float, step: int) -> int:
+    return int(math.ceil(value / step) * step)
+
+
+class RunHistory:
+    """追記専用の実行履歴（JSON Lines。レポート 1 件につき 1 行）"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """
+        実行結果を 1 件追記（複数プロセスからの同時追記はファイルロックで直列化）
+
+        Args:
+            entry: report_type, model, status, failed_stage, generate_seconds, output_tokens, tool_calls, items, run_seconds などを含む記録
+        """
+        entry = {"recorded_at": datetime.now().isoformat(timespec="seconds"), **entry}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                try:
+                    file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                finally:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+        except Exception as e:
+            logger.error(f"実行履歴への記録に失敗: {e}")
+
+    def read(self, report_type: Optional[str] = None, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """実行履歴を読み込み（レポートタイプ・モデルで絞り込み、直近 HISTORY_WINDOW 件）"""
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if (report_type and entry.get("report_type") != report_type) or (model and entry.get("model") != model):
+                    continue
+                entries.append(entry)
+        return entries[-HISTORY_WINDOW:]
+
+    def keys(self) -> List[tuple]:
+        """記録されているレポートタイプ・モデルの組み合わせ"""
+        if not self.path.exists():
+            return []
+        keys = set()
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                keys.add((entry.get("report_type"), entry.get("model")))
+        return sorted(keys, key=lambda key: tuple(str(value) for value in key))
+
+    def stats(self, report_type: str, model: str) -> Dict[str, Any]:
+        """
+        直近の実行の統計
+
+        Returns:
+            runs, failures, failure_rate, generate_p50 / generate_p95（秒）, output_tokens_p95, avg_tool_calls, items_per_run
+            （成功した実行がない場合、成功した実行から求める値は None）
+        """
+        entries = self.read(report_type, model)
+        succeeded = [entry for entry in entries if entry.get("status") == "success"]
+        durations = [entry["generate_seconds"] for entry in succeeded if entry.get("generate_seconds") is not None]
+        tokens = [entry["output_tokens"] for entry in succeeded if entry.get("output_tokens")]
+        tool_calls = [entry["tool_calls"] for entry in succeeded if entry.get("tool_calls") is not None]
+        items = [entry["items"] for entry in entries if entry.get("items")]
+        return {
+            "runs": len(entries),
+            "succeeded": len(succeeded),
+            "failures": len(entries) - len(succeeded),
+            "failure_rate": round((len(entries) - len(succeeded)) / len(entries), 3) if entries else 0.0,
+            "generate_p50": round(percentile(durations, 50), 1) if durations else None,
+            "generate_p95": round(percentile(durations, 95), 1) if durations else None,
+            "output_tokens_p95": int(percentile(tokens, 95)) if tokens else None,
+            "avg_tool_calls": round(sum(tool_calls) / len(tool_calls), 1) if tool_calls else None,
+            "items_per_run": int(median(items)) if items else None,
+        }
+
+    def recommend(
+        self,
+        report_type: str,
+        model: str,
+        target_seconds: float,
+        configured: Dict[str, Any],
+        items: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        目標の実行時間に収まる実行パラメータを推奨
+
+        Args:
+            report_type: レポートタイプ
+            model: モデル名
+            target_seconds: 1 回の実行（複数レポートをまとめて生成する場合はその全体）の目標時間（秒）
+            configured: 現在の設定値（generate_concurrency, generate_timeout, max_tokens）
+            items: 1 回の実行で生成するレポート数（None の場合は履歴の中央値）
+
+        Returns:
+            推奨値（generate_concurrency, generate_timeout, max_tokens）。成功した実行が MIN_RUNS 件未満の場合は設定値
+        """
+        stats = self.stats(report_type, model)
+        recommended = dict(configured)
+        if stats["succeeded"] < MIN_RUNS:
+            return recommended
+
+        if stats["generate_p95"] is not None:
+            recommended["generate_timeout"] = max(60, _round_up(stats["generate_p95"] * TIMEOUT_HEADROOM, 60))
+        if stats["output_tokens_p95"] is not None:
+            recommended["max_tokens"] = max(1024, _round_up(stats["output_tokens_p95"] * TOKEN_HEADROOM, 1024))
+        if stats["generate_p50"] is not None and target_seconds > 0:
+            count = items or stats["items_per_run"] or 1
+            concurrency = min(count, max(1, math.ceil(count * stats["generate_p50"] / target_seconds)))
+            # 上限は設定値より増やす場合のみ適用する（利用者が設定した大きな同時実行数は上限で減らさない）
+            if concurrency > configured["generate_concurrency"]:
+                limit = configured["generate_concurrency"] if stats["failure_rate"] >= FAILURE_RATE_LIMIT else MAX_AUTO_CONCURRENCY
+                concurrency = max(configured["generate_concurrency"], min(concurrency, limit))
+            recommended["generate_concurrency"] = concurrency
+        return recommended
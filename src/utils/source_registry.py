@@ -0,0 +1,245 @@
+"""
+情報源レジストリモジュール - key_urls の情報源ごとの取得レイテンシ・エラー率・更新間隔を記録し、プロンプトでの優先順位付けに使用
+"""
+
+import hashlib
+import logging
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from .json_store import JSONStore
+
+logger = logging.getLogger(__name__)
+
+URL_PATTERN = re.compile(r"https?://[^\s)>\]]+")
+
+# 情報源ごとに保持するレイテンシ・結果・更新時刻の件数
+MAX_SAMPLES = 20
+# 更新検出のために読み込む本文の最大バイト数
+PROBE_READ_BYTES = 256 * 1024
+
+
+def extract_urls(text: str) -> List[str]:
+    """テキストに含まれる URL を出現順に重複なく取得"""
+    return list(dict.fromkeys(URL_PATTERN.findall(text)))
+
+
+class SourceRegistry:
+    """情報源ごとの取得レイテンシ・エラー率・更新間隔の記録（JSON ファイル）"""
+
+    def __init__(self, path: str, down_threshold: int = 3, probe_timeout: float = 10.0):
+        """
+        Args:
+            path: 記録を保存する JSON ファイルのパス
+            down_threshold: 停止中とみなす連続エラー回数
+            probe_timeout: ヘルスチェックのタイムアウト（秒）
+        """
+        self.path = Path(path)
+        self.down_threshold = down_threshold
+        self.probe_timeout = probe_timeout
+        self._store = JSONStore(path, "情報源レジストリ")
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Dict[str, Any]] = self._store.read()
+        self._loaded_mtime = self._mtime()
+        self._dirty: set = set()
+        self._tracked: List[str] = []
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._monitor_stop = threading.Event()
+
+    def _mtime(self) -> float:
+        return self.path.stat().st_mtime if self.path.exists() else 0.0
+
+    def _reload_if_changed(self) -> None:
+        """他のプロセス（常駐モードのヘルスチェックなど）が保存した記録を取り込む"""
+        mtime = self._mtime()
+        if mtime <= self._loaded_mtime:
+            return
+        data = self._store.read()
+        with self._lock:
+            for url, source in data.items():
+                if url not in self._dirty:
+                    self._sources[url] = source
+            self._loaded_mtime = mtime
+
+    def track(self, urls: List[str]) -> None:
+        """記録対象の情報源（key_urls）を設定"""
+        with self._lock:
+            self._tracked = sorted(set(urls), key=len, reverse=True)
+
+    def record_fetch(self, url: str, latency_ms: float, ok: bool) -> None:
+        """
+        エージェントの WebFetch の結果を、URL が前方一致する情報源の記録として追加（一致しない URL は記録しない）
+
+        Args:
+            url: 取得した URL
+            latency_ms: ツール呼び出しから結果までの時間（ミリ秒）
+            ok: 取得に成功したか
+        """
+        with self._lock:
+            source_url = next((tracked for tracked in self._tracked if url.startswith(tracked.rstrip("/"))), None)
+        if source_url:
+            self.record(source_url, latency_ms, ok)
+
+    def record(
+        self,
+        url: str,
+        latency_ms: Optional[float],
+        ok: bool,
+        status: Optional[int] = None,
+        marker: Optional[str] = None,
+        changed_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        情報源の取得結果を 1 件記録
+
+        Args:
+            url: 情報源の URL
+            latency_ms: 取得にかかった時間（ミリ秒）
+            ok: 取得に成功したか
+            status: HTTP ステータスコード
+            marker: 更新検出用の値（Last-Modified, ETag, 本文のハッシュなど）。前回と異なる場合に更新とみなす
+            changed_at: 更新時刻（Last-Modified など。不明な場合は検出時刻）
+        """
+        now = datetime.now()
+        with self._lock:
+            source = self._sources.setdefault(url, {"latencies_ms": [], "results": [], "changes": [], "consecutive_failures": 0})
+            if latency_ms is not None:
+                source["latencies_ms"] = (source["latencies_ms"] + [round(latency_ms, 1)])[-MAX_SAMPLES:]
+            source["results"] = (source["results"] + [1 if ok else 0])[-MAX_SAMPLES:]
+            source["consecutive_failures"] = 0 if ok else source["consecutive_failures"] + 1
+            source["last_status"] = status
+            source["last_checked"] = now.isoformat(timespec="seconds")
+            if ok and marker and marker != source.get("marker"):
+                if source.get("marker") is not None:
+                    changed_local = changed_at.astimezone().replace(tzinfo=None) if changed_at and changed_at.tzinfo else changed_at
+                    changed = (changed_local or now).isoformat(timespec="seconds")
+                    source["changes"] = sorted(set(source["changes"] + [changed]))[-MAX_SAMPLES:]
+                source["marker"] = marker
+            self._dirty.add(url)
+
+    def save(self) -> None:
+        """記録を保存（他プロセスの記録とは情報源単位でマージ）"""
+        with self._lock:
+            updates = {url: dict(self._sources[url]) for url in self._dirty}
+            self._dirty.clear()
+        if not updates:
+            return
+        try:
+            self._store.update(lambda data: data.update(updates))
+            self._loaded_mtime = self._mtime()
+        except Exception as e:
+            logger.error(f"情報源レジストリの保存に失敗: {e}")
+
+    def stats(self, url: str) -> Dict[str, Any]:
+        """情報源の統計（latency_ms: 中央値, error_rate, cadence_hours: 平均更新間隔, down, score）"""
+        with self._lock:
+            source = self._sources.get(url)
+            if not source:
+                return {"url": url, "known": False, "down": False, "score": None}
+            latencies = list(source["latencies_ms"])
+            results = list(source["results"])
+            changes = [datetime.fromisoformat(value) for value in source["changes"]]
+            consecutive_failures = source["consecutive_failures"]
+
+        latency_ms = statistics.median(latencies) if latencies else None
+        cadence_hours = None
+        if len(changes) >= 2:
+            cadence_hours = (changes[-1] - changes[0]).total_seconds() / 3600 / (len(changes) - 1)
+        error_rate = 1 - sum(results) / len(results) if results else None
+
+        # 単位レイテンシあたりの鮮度（1 時間あたりの更新回数 / 秒）。成功率で重み付け
+        score = None
+        if latency_ms and cadence_hours:
+            score = (1 / max(cadence_hours, 0.1)) / (latency_ms / 1000) * (1 - (error_rate or 0.0))
+
+        return {
+            "url": url,
+            "known": True,
+            "latency_ms": latency_ms,
+            "error_rate": round(error_rate, 3) if error_rate is not None else None,
+            "cadence_hours": round(cadence_hours, 1) if cadence_hours is not None else None,
+            "consecutive_failures": consecutive_failures,
+            "down": consecutive_failures >= self.down_threshold,
+            "score": score,
+        }
+
+    def rank(self, urls: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        情報源を単位レイテンシあたりの鮮度の高い順に並べ替え
+
+        Returns:
+            (スコアの高い順の URL リスト（未計測の URL は末尾に元の順序で）, 停止中のため除外する URL リスト)
+        """
+        self._reload_if_changed()
+        stats = {url: self.stats(url) for url in urls}
+        suppressed = [url for url in urls if stats[url]["down"]]
+        available = [url for url in urls if not stats[url]["down"]]
+        scored = sorted((url for url in available if stats[url]["score"] is not None), key=lambda url: -stats[url]["score"])
+        return scored + [url for url in available if stats[url]["score"] is None], suppressed
+
+    def probe(self, url: str) -> Dict[str, Any]:
+        """情報源を 1 回取得してヘルスチェック（応答ヘッダまでのレイテンシと更新有無を記録）"""
+        started = time.perf_counter()
+        try:
+            with requests.get(url, timeout=self.probe_timeout, stream=True, headers={"User-Agent": "ai-tech-catchup-agent"}) as response:
+                latency_ms = (time.perf_counter() - started) * 1000
+                ok = response.status_code < 400
+                changed_at = None
+                marker = response.headers.get("Last-Modified") or response.headers.get("ETag")
+                if response.headers.get("Last-Modified"):
+                    try:
+                        changed_at = parsedate_to_datetime(response.headers["Last-Modified"])
+                    except (TypeError, ValueError):
+                        changed_at = None
+                if ok and not marker:
+                    body = b""
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        body += chunk
+                        if len(body) >= PROBE_READ_BYTES:
+                            break
+                    marker = hashlib.sha256(body[:PROBE_READ_BYTES]).hexdigest()[:16]
+            self.record(url, latency_ms, ok, status=response.status_code, marker=marker, changed_at=changed_at)
+            return {"url": url, "status": "success" if ok else "error", "status_code": response.status_code, "latency_ms": round(latency_ms, 1)}
+        except Exception as e:
+            self.record(url, None, False)
+            return {"url": url, "status": "error", "message": str(e)}
+
+    def probe_all(self, urls: List[str], concurrency: int = 8) -> List[Dict[str, Any]]:
+        """複数の情報源を並行してヘルスチェックし、記録を保存"""
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="source-probe") as executor:
+            results = list(executor.map(self.probe, urls))
+        self.save()
+        failed = sum(1 for result in results if result["status"] != "success")
+        logger.info(f"情報源のヘルスチェックが完了しました: {len(results)} 件 (エラー: {failed} 件)")
+        return results
+
+    def start_background_probes(self, urls: List[str], interval: float, concurrency: int = 8) -> None:
+        """バックグラウンドで定期的にヘルスチェックを実行"""
+        if self._monitor_thread is not None:
+            return
+
+        def monitor() -> None:
+            while not self._monitor_stop.is_set():
+                self.probe_all(urls, concurrency)
+                self._monitor_stop.wait(interval)
+
+        self._monitor_stop.clear()
+        self._monitor_thread = threading.Thread(target=monitor, name="source-probe-monitor", daemon=True)
+        self._monitor_thread.start()
+        logger.info(f"情報源のヘルスチェックを開始しました: {len(urls)} 件, 間隔 {interval} 秒")
+
+    def stop_background_probes(self) -> None:
+        """バックグラウンドのヘルスチェックを停止"""
+        self._monitor_stop.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(timeout=self.probe_timeout + 5)
+            self._monitor_thread = None
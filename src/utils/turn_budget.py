@@ -0,0 +1,107 @@
+"""
+ターン予算モジュール - 1 回の生成におけるターン数・ツールごとの呼び出し回数の予算管理
+"""
+
+import fnmatch
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+
+class TurnBudget:
+    """1 回の生成におけるターン数・ツールごとの呼び出し回数の予算とその集計"""
+
+    def __init__(self, max_turns: Optional[int] = None, tool_limits: Optional[Dict[str, int]] = None, wrap_up_ratio: float = 0.8):
+        """
+        Args:
+            max_turns: 最大ターン数
+            tool_limits: ツール名（fnmatch パターン可）ごとの呼び出し回数の上限
+            wrap_up_ratio: 最大ターン数に対してこの割合に達した時点でツールの使用を止め、レポートをまとめさせる
+        """
+        self.max_turns = max_turns
+        self.tool_limits = tool_limits or {}
+        self.wrap_up_ratio = wrap_up_ratio
+        self.turns = 0
+        self.tool_calls: Dict[str, str] = {}
+        self.denied: set = set()
+        self.wrap_up_reason: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_turns is not None or bool(self.tool_limits)
+
+    def _limit_key(self, tool_name: str) -> Optional[str]:
+        """ツール名に対応する上限のキー（完全一致を優先し、なければ最初に一致したパターン）"""
+        if tool_name in self.tool_limits:
+            return tool_name
+        return next((pattern for pattern in self.tool_limits if fnmatch.fnmatchcase(tool_name, pattern)), None)
+
+    def limit_for(self, tool_name: str) -> Optional[int]:
+        """ツールの呼び出し回数の上限（未設定の場合は None）"""
+        key = self._limit_key(tool_name)
+        return self.tool_limits[key] if key is not None else None
+
+    def counts(self) -> Dict[str, int]:
+        """ツールごとの呼び出し回数（拒否した呼び出しを除く）"""
+        counts: Dict[str, int] = defaultdict(int)
+        for tool_use_id, tool_name in self.tool_calls.items():
+            if tool_use_id not in self.denied:
+                counts[tool_name] += 1
+        return dict(counts)
+
+    def start_turn(self) -> Optional[str]:
+        """
+        ターン数を加算し、最大ターン数に近づいた場合はまとめに入る
+
+        Returns:
+            このターンでまとめに入った場合はその理由（それ以外は None）
+        """
+        self.turns += 1
+        if self.wrap_up_reason is None and self.max_turns is not None and self.turns >= max(1, int(self.max_turns * self.wrap_up_ratio)):
+            self.wrap_up_reason = f"ターン予算の上限に近づきました ({self.turns}/{self.max_turns})"
+            return self.wrap_up_reason
+        return None
+
+    def record_tool(self, tool_use_id: str, tool_name: str) -> None:
+        """ツール呼び出しを記録（同じ呼び出しを重複して数えない）"""
+        self.tool_calls.setdefault(tool_use_id, tool_name)
+
+    def check_tool(self, tool_use_id: str, tool_name: str) -> Optional[str]:
+        """
+        ツール呼び出しを記録して可否を判定
+
+        Returns:
+            呼び出しを拒否する場合はその理由（許可する場合は None）
+        """
+        self.record_tool(tool_use_id, tool_name)
+        reason = self.wrap_up_reason
+        key = self._limit_key(tool_name)
+        if reason is None and key is not None:
+            used = sum(
+                1
+                for other_id, other_name in self.tool_calls.items()
+                if other_id != tool_use_id and other_id not in self.denied and self._limit_key(other_name) == key
+            )
+            if used >= self.tool_limits[key]:
+                reason = f"{key} の呼び出し回数が上限に達しました ({self.tool_limits[key]} 回)"
+        if reason is not None:
+            self.denied.add(tool_use_id)
+        return reason
+
+    def describe(self) -> str:
+        """ログ出力用の集計（例: ターン 3/40, WebSearch 2/20, WebFetch 1/30）"""
+        parts = [f"ターン {self.turns}/{self.max_turns if self.max_turns is not None else '-'}"]
+        counts = self.counts()
+        for tool_name in sorted(counts):
+            key = self._limit_key(tool_name)
+            parts.append(f"{tool_name} {counts[tool_name]}/{self.tool_limits[key] if key is not None else '-'}")
+        return ", ".join(parts)
+
+    def summary(self) -> Dict[str, Any]:
+        """集計結果（turns, max_turns, tool_calls, denied_tool_calls, wrap_up）"""
+        return {
+            "turns": self.turns,
+            "max_turns": self.max_turns,
+            "tool_calls": self.counts(),
+            "denied_tool_calls": len(self.denied),
+            "wrap_up": self.wrap_up_reason,
+        }
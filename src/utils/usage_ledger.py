@@ -0,0 +1,180 @@
+"""
+利用量台帳モジュール - トークン数・コストの記録と実行ごとの予算管理
+"""
+
+import fcntl
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# モデル別の料金（USD / 100万トークン）: (入力, 出力, キャッシュ読み込み, キャッシュ書き込み)
+# API がコストを返さないバックエンド（Gemini など）の概算に使用。前方一致で長いものを優先
+MODEL_PRICING: Dict[str, Tuple[float, float, float, float]] = {
+    "claude-opus-4": (15.0, 75.0, 1.5, 18.75),
+    "claude-sonnet-4": (3.0, 15.0, 0.3, 3.75),
+    "claude-3-7-sonnet": (3.0, 15.0, 0.3, 3.75),
+    "claude-3-5-haiku": (0.8, 4.0, 0.08, 1.0),
+    "claude-haiku-4": (1.0, 5.0, 0.1, 1.25),
+    "gemini-2.5-pro": (1.25, 10.0, 0.31, 0.0),
+    "gemini-2.5-flash-lite": (0.10, 0.40, 0.025, 0.0),
+    "gemini-2.5-flash": (0.30, 2.50, 0.075, 0.0),
+    "gemini-2.0-flash-lite": (0.075, 0.30, 0.0, 0.0),
+    "gemini-2.0-flash": (0.10, 0.40, 0.025, 0.0),
+}
+
+USAGE_KEYS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+
+def empty_usage() -> Dict[str, int]:
+    """空の利用量を作成"""
+    return {key: 0 for key in USAGE_KEYS}
+
+
+def get_pricing(model: str) -> Optional[Tuple[float, float, float, float]]:
+    """モデル名に対応する料金を取得（未登録の場合は None）"""
+    for prefix in sorted(MODEL_PRICING, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_PRICING[prefix]
+    return None
+
+
+def estimate_cost(model: str, usage: Dict[str, int]) -> Optional[float]:
+    """利用量からコスト（USD）を概算"""
+    pricing = get_pricing(model)
+    if pricing is None:
+        return None
+    tokens = [usage.get(key, 0) for key in USAGE_KEYS]
+    return sum(count * price for count, price in zip(tokens, pricing)) / 1_000_000
+
+
+class UsageBudget:
+    """1 回の実行におけるトークン数・コストの予算"""
+
+    def __init__(self, model: str, max_tokens: Optional[int] = None, max_cost_usd: Optional[float] = None):
+        """
+        Args:
+            model: モデル名（コストの概算に使用）
+            max_tokens: 入力・出力の合計トークン数の上限
+            max_cost_usd: コスト（USD）の上限
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_cost_usd = max_cost_usd
+        self.usage = empty_usage()
+        self.reported_cost_usd: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_tokens is not None or self.max_cost_usd is not None
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.usage.values())
+
+    @property
+    def cost_usd(self) -> Optional[float]:
+        if self.reported_cost_usd is not None:
+            return self.reported_cost_usd
+        return estimate_cost(self.model, self.usage)
+
+    def add(self, **usage: int) -> None:
+        """利用量を加算"""
+        for key, value in usage.items():
+            if key in self.usage and value:
+                self.usage[key] += int(value)
+
+    def exceeded(self) -> Optional[str]:
+        """予算超過の場合はその理由を返す"""
+        if self.max_tokens is not None and self.total_tokens > self.max_tokens:
+            return f"トークン予算を超過しました ({self.total_tokens} > {self.max_tokens})"
+        cost = self.cost_usd
+        if self.max_cost_usd is not None and cost is not None and cost > self.max_cost_usd:
+            return f"コスト予算を超過しました (${cost:.4f} > ${self.max_cost_usd:.4f})"
+        return None
+
+    def remaining_output_tokens(self, prompt_tokens: int) -> Optional[int]:
+        """入力トークン数を差し引いた、予算内で出力可能なトークン数（予算未設定の場合は None）"""
+        limits = []
+        if self.max_tokens is not None:
+            limits.append(self.max_tokens - self.total_tokens - prompt_tokens)
+        pricing = get_pricing(self.model)
+        if self.max_cost_usd is not None and pricing is not None and pricing[1] > 0:
+            spent = (self.cost_usd or 0.0) + prompt_tokens * pricing[0] / 1_000_000
+            limits.append(int((self.max_cost_usd - spent) * 1_000_000 / pricing[1]))
+        return max(0, min(limits)) if limits else None
+
+
+class UsageLedger:
+    """追記専用の利用量台帳（JSON Lines）"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """
+        利用量を 1 件追記（複数プロセスからの同時追記はファイルロックで直列化）
+
+        Args:
+            entry: run_id, report_type, topic, model, usage, cost_usd などを含む記録
+        """
+        entry = {"recorded_at": datetime.now().isoformat(), **entry}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                try:
+                    file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                finally:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+        except Exception as e:
+            logger.error(f"利用量台帳への記録に失敗: {e}")
+
+    def read(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """台帳を読み込み（since: この日付 YYYY-MM-DD 以降の記録のみ）"""
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since and entry.get("recorded_at", "")[:10] < since:
+                    continue
+                entries.append(entry)
+        return entries
+
+    def summarize(self, group_by: Sequence[str] = ("day", "report_type", "model"), since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        利用量を集計
+
+        Args:
+            group_by: 集計キー（day, report_type, model, topic, backend, tier）
+            since: この日付 YYYY-MM-DD 以降の記録のみ集計
+
+        Returns:
+            集計キーごとの runs, 各トークン数, cost_usd, avg_latency_ms（レイテンシが記録された実行の平均）のリスト
+        """
+        groups: Dict[tuple, Dict[str, Any]] = defaultdict(lambda: {"runs": 0, **empty_usage(), "cost_usd": 0.0, "latency_ms": []})
+        for entry in self.read(since):
+            values = {**entry, "day": entry.get("recorded_at", "")[:10]}
+            key = tuple(values.get(name) or "-" for name in group_by)
+            group = groups[key]
+            group["runs"] += 1
+            for usage_key in USAGE_KEYS:
+                group[usage_key] += entry.get("usage", {}).get(usage_key, 0)
+            group["cost_usd"] += entry.get("cost_usd") or 0.0
+            if entry.get("latency_ms") is not None:
+                group["latency_ms"].append(entry["latency_ms"])
+
+        rows = []
+        for key, group in sorted(groups.items()):
+            latencies = group.pop("latency_ms")
+            rows.append({**dict(zip(group_by, key)), **group, "avg_latency_ms": int(sum(latencies) / len(latencies)) if latencies else None})
+        return rows
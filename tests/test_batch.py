@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from src.agent.ai_tech_catchup_agent import AITechCatchupAgent
+from src.agent.batch import BatchJobStore, batch_key
+from src.agent.pipeline import PipelineStage
+from src.client.claude_client import ClaudeClient
+
+STARTED_AT = datetime(2026, 10, 19, 9, 0)
+
+
+def message(text: str, stop_reason: str = "end_turn") -> Any:
+    usage = SimpleNamespace(input_tokens=100, output_tokens=50, cache_read_input_tokens=0, cache_creation_input_tokens=0)
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], usage=usage, stop_reason=stop_reason)
+
+
+def entry(custom_id: str, result_type: str = "succeeded", **fields: Any) -> Any:
+    return SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type=result_type, **fields))
+
+
+class FakeBatches:
+    """Message Batches API の代わり"""
+
+    def __init__(self, statuses: List[str], results: List[Any]):
+        self.statuses = statuses
+        self.entries = results
+        self.created: List[Dict[str, Any]] = []
+
+    def create(self, requests: List[Dict[str, Any]]) -> Any:
+        self.created.extend(requests)
+        return SimpleNamespace(id="batch-1")
+
+    def retrieve(self, batch_id: str) -> Any:
+        counts = SimpleNamespace(processing=0, succeeded=2, errored=0, canceled=0, expired=0)
+        return SimpleNamespace(processing_status=self.statuses.pop(0), request_counts=counts)
+
+    def results(self, batch_id: str) -> Any:
+        return iter(self.entries)
+
+
+def make_client(batches: FakeBatches) -> ClaudeClient:
+    client = ClaudeClient(anthropic_api_key="key", model_name="claude-sonnet-4-20250514", max_tokens=8192)
+    client.client = SimpleNamespace(messages=SimpleNamespace(batches=batches))  # type: ignore[assignment]
+    return client
+
+
+def test_batch_key_ignores_topic_case() -> None:
+    assert batch_key("m", [{"mode": "topic", "topic": "LLM"}]) == batch_key("m", [{"mode": "topic", "topic": " llm "}])
+    assert batch_key("m", [{"mode": "topic", "topic": "LLM"}]) != batch_key("other", [{"mode": "topic", "topic": "LLM"}])
+
+
+def test_job_store_persists_across_restart(tmp_path: Path) -> None:
+    path = str(tmp_path / "batches.json")
+    BatchJobStore(path).create("key", "batch-1", "m", {"item-0": {"mode": "report", "started_at": STARTED_AT}})
+    BatchJobStore(path).save_result("key", "item-0", {"status": "success", "issue_url": "url", "content": "not saved"})
+
+    job = BatchJobStore(path).find("key")
+    assert job is not None
+    assert job["batch_id"] == "batch-1"
+    assert job["items"]["item-0"]["started_at"] == "2026-10-19T09:00:00"
+    assert job["results"] == {"item-0": {"status": "success", "issue_url": "url"}}
+
+    BatchJobStore(path).complete("key")
+    assert BatchJobStore(path).find("key") is None
+
+
+def test_submit_batch_uses_per_run_max_tokens() -> None:
+    batches = FakeBatches([], [])
+    client = make_client(batches)
+    client.submit_batch({"item-0": "a"}, {"item-0": "report"})
+    client.submit_batch({"item-1": "b"}, {"item-1": "report"}, max_tokens=2048)
+    assert [request["params"]["max_tokens"] for request in batches.created] == [8192, 2048]
+
+
+def test_wait_batch_backs_off_until_ended(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: List[float] = []
+    monkeypatch.setattr("src.client.claude_client.time.sleep", sleeps.append)
+    client = make_client(FakeBatches(["in_progress", "in_progress", "in_progress", "ended"], []))
+    assert client.wait_batch("batch-1", poll_interval=10, max_poll_interval=30)["succeeded"] == 2
+    assert sleeps == [10, 20, 30]
+
+
+def test_pause_turn_results_are_rejected() -> None:
+    client = make_client(FakeBatches([], [entry("item-0", message=message("partial", "pause_turn")), entry("item-1", message=message("report"))]))
+    results = dict(client.iter_batch_results("batch-1"))
+    assert results["item-0"]["status"] == "error"
+    assert "pause_turn" in results["item-0"]["message"]
+    assert results["item-1"]["status"] == "success"
+    assert results["item-1"]["content"] == "report"
+
+
+def test_resumed_batch_skips_published_results(tmp_path: Path) -> None:
+    path = str(tmp_path / "batches.json")
+    items = {f"item-{index}": {"mode": "report", "started_at": STARTED_AT} for index in range(3)}
+    BatchJobStore(path).create("key", "batch-1", "m", items)
+    BatchJobStore(path).save_result("key", "item-0", {"status": "success", "issue_url": "url-0"})
+
+    published: List[str] = []
+
+    async def publish(item: Dict[str, Any]) -> Dict[str, Any]:
+        published.append(item["result"]["content"])
+        item["result"]["issue_url"] = f"url-{len(published)}"
+        return item
+
+    # 再起動したプロセスとして、保存したジョブからバッチの結果を処理
+    store = BatchJobStore(path)
+    agent = SimpleNamespace(
+        pipeline=SimpleNamespace(stages=[PipelineStage("render", publish), PipelineStage("publish", publish)]),
+        batch_store=store,
+        _record_usage=lambda *args: None,
+    )
+    client = make_client(
+        FakeBatches(
+            [],
+            [
+                entry("item-0", message=message("already published")),
+                entry("item-1", message=message("report 1")),
+                entry("item-2", message=message("partial", "pause_turn")),
+            ],
+        )
+    )
+    job = store.find("key")
+    assert job is not None
+    results = asyncio.run(AITechCatchupAgent._publish_batch_results(agent, client, "key", job))  # type: ignore[arg-type]
+
+    assert published == ["report 1"]
+    assert results["item-0"] == {"status": "success", "issue_url": "url-0"}
+    assert results["item-1"]["issue_url"] == "url-1"
+    assert results["item-2"]["status"] == "error"
+    assert set(BatchJobStore(path).find("key")["results"]) == {"item-0", "item-1", "item-2"}  # type: ignore[index]
@@ -0,0 +1,164 @@
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+import pytest
+import requests
+from claude_code_sdk.types import AssistantMessage, ResultMessage, TextBlock
+from google.genai import types as genai_types
+
+from src.client import gemini_client
+from src.client.gemini_client import GeminiClient
+from src.client.github_client import GitHubClient
+from src.utils.cassette import Cassette, RecordingSDKClient, ReplaySDKClient, fingerprint, use_cassette
+from src.utils.rate_limiter import RateLimiter, use_rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def reset_globals() -> Any:
+    use_rate_limiter(RateLimiter({}))
+    yield
+    use_cassette(None)
+    use_rate_limiter(None)
+
+
+def result(subtype: str) -> ResultMessage:
+    return ResultMessage(subtype=subtype, duration_ms=1, duration_api_ms=1, is_error=False, num_turns=1, session_id="s")
+
+
+class FakeSDKClient:
+    """query ごとに用意した応答を返す ClaudeSDKClient の代わり"""
+
+    def __init__(self, responses: Dict[str, List[Any]]):
+        self.responses = responses
+        self.current: List[Any] = []
+
+    async def __aenter__(self) -> "FakeSDKClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def query(self, prompt: str) -> None:
+        self.current = self.responses[prompt]
+
+    async def receive_response(self) -> AsyncIterator[Any]:
+        for message in self.current:
+            yield message
+
+
+async def run_session(client: Any, prompts: List[str]) -> List[List[Any]]:
+    received = []
+    async with client:
+        for prompt in prompts:
+            await client.query(prompt)
+            received.append([message async for message in client.receive_response()])
+    return received
+
+
+def test_claude_code_round_trip(tmp_path: Path) -> None:
+    path = str(tmp_path / "cassette.json")
+    sessions = {
+        "report A": [AssistantMessage(content=[TextBlock(text="report A")], model="m"), result("success")],
+        "report B": [AssistantMessage(content=[TextBlock(text="report B")], model="m"), result("success")],
+    }
+    cassette = Cassette(path, mode="record")
+    recorded = [asyncio.run(run_session(RecordingSDKClient(FakeSDKClient(sessions), cassette, "report"), [prompt])) for prompt in sessions]
+    cassette.save()
+
+    # 記録と異なる順序で再生してもプロンプトの fingerprint で照合される
+    replay = Cassette(path, mode="replay", speed="max")
+    assert asyncio.run(run_session(ReplaySDKClient(replay, "report"), ["report B"])) == recorded[1]
+    assert asyncio.run(run_session(ReplaySDKClient(replay, "report"), ["report A"])) == recorded[0]
+
+
+def test_claude_code_multi_query_round_trip(tmp_path: Path) -> None:
+    path = str(tmp_path / "cassette.json")
+    sessions = {
+        "report A": [AssistantMessage(content=[TextBlock(text="searching A")], model="m"), result("error_max_turns")],
+        "report B": [AssistantMessage(content=[TextBlock(text="report B")], model="m"), result("success")],
+        "wrap up": [AssistantMessage(content=[TextBlock(text="summary")], model="m"), result("success")],
+    }
+    cassette = Cassette(path, mode="record")
+    recorded = asyncio.run(run_session(RecordingSDKClient(FakeSDKClient(sessions), cassette, "report"), ["report A", "wrap up"]))
+    asyncio.run(run_session(RecordingSDKClient(FakeSDKClient(sessions), cassette, "report"), ["report B"]))
+    cassette.save()
+
+    replay = Cassette(path, mode="replay", speed="max")
+    # 記録と異なる順序で再生しても、まとめの依頼は同じセッションの 2 回目の query として照合される
+    assert asyncio.run(run_session(ReplaySDKClient(replay, "report"), ["report B"]))[0][0].content[0].text == "report B"
+    replayed = asyncio.run(run_session(ReplaySDKClient(replay, "report"), ["report A", "wrap up"]))
+    assert replayed == recorded
+    assert replayed[0][-1].subtype == "error_max_turns"
+    assert replayed[1][0].content[0].text == "summary"
+
+
+def test_next_matches_fingerprint_and_falls_back_to_oldest(tmp_path: Path) -> None:
+    path = str(tmp_path / "cassette.json")
+    cassette = Cassette(path, mode="record")
+    for name in ("first", "second", "third"):
+        cassette.record("gemini", "report", {"fingerprint": fingerprint(name), "name": name})
+    cassette.record("gemini", "weekly", {"fingerprint": fingerprint("weekly"), "name": "weekly"})
+    cassette.save()
+
+    replay = Cassette(path, mode="replay")
+    assert replay.next("gemini", "report", fingerprint("second"))["name"] == "second"
+    assert replay.next("gemini", "report", fingerprint("unknown"))["name"] == "first"
+    assert replay.next("gemini", "report")["name"] == "third"
+    with pytest.raises(LookupError):
+        replay.next("gemini", "report", fingerprint("first"))
+    with pytest.raises(LookupError):
+        replay.next("github", "report")
+
+
+class FakeGenAIClient:
+    """generate_content の応答を返す genai.Client の代わり"""
+
+    calls = 0
+
+    def __init__(self, **kwargs: Any):
+        self.models = self
+
+    def generate_content(self, **kwargs: Any) -> genai_types.GenerateContentResponse:
+        FakeGenAIClient.calls += 1
+        return genai_types.GenerateContentResponse(
+            candidates=[genai_types.Candidate(content=genai_types.Content(role="model", parts=[genai_types.Part(text="gemini report")]))]
+        )
+
+
+def test_gemini_round_trip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = str(tmp_path / "cassette.json")
+    monkeypatch.setattr(gemini_client.genai, "Client", FakeGenAIClient)
+    client = GeminiClient(google_api_key="key")
+    cassette = Cassette(path, mode="record")
+    use_cassette(cassette)
+    assert client.send_message("prompt", report_type="report")["content"] == "gemini report"
+    cassette.save()
+    assert FakeGenAIClient.calls == 1
+
+    use_cassette(Cassette(path, mode="replay", speed="max"))
+    assert client.send_message("prompt", report_type="report")["content"] == "gemini report"
+    assert FakeGenAIClient.calls == 1
+
+
+def test_github_round_trip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = str(tmp_path / "cassette.json")
+    client = GitHubClient(token="token", repo="owner/repo")
+
+    def send(method: str, url: str, **kwargs: Any) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["ETag"] = '"abc"'
+        response._content = b'{"node_id": "R_1"}'
+        return response
+
+    monkeypatch.setattr(client.session, "request", send)
+    cassette = Cassette(path, mode="record")
+    use_cassette(cassette)
+    assert client.get_repository_id() == "R_1"
+    cassette.save()
+
+    monkeypatch.setattr(client.session, "request", lambda *args, **kwargs: pytest.fail("再生中に API を呼び出しました"))
+    client._repository_id = None
+    use_cassette(Cassette(path, mode="replay", speed="max"))
+    assert client.get_repository_id() == "R_1"
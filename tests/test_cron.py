@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import pytest
+
+from src.scheduler.cron import CronExpression
+
+
+def test_parse_fields() -> None:
+    cron = CronExpression("*/15 9-17/4 1,15 * 7")
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == {9, 13, 17}
+    assert cron.days == {1, 15}
+    assert cron.months == set(range(1, 13))
+    assert cron.weekdays == {0}
+
+
+@pytest.mark.parametrize("expression", ["0 9 * *", "*/0 * * * *", "60 * * * *", "0 9 5-1 * *"])
+def test_invalid_expression(expression: str) -> None:
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_next_after_weekly() -> None:
+    cron = CronExpression("0 9 * * 1")
+    # 2026-10-19 は月曜日
+    assert cron.next_after(datetime(2026, 10, 19, 8, 59, 30)) == datetime(2026, 10, 19, 9, 0)
+    assert cron.next_after(datetime(2026, 10, 19, 9, 0)) == datetime(2026, 10, 26, 9, 0)
+
+
+def test_next_after_month_boundary() -> None:
+    cron = CronExpression("30 0 1 * *")
+    assert cron.next_after(datetime(2026, 12, 15, 12, 0)) == datetime(2027, 1, 1, 0, 30)
+
+
+def test_previous_at_or_before() -> None:
+    cron = CronExpression("0 9 * * *")
+    assert cron.previous_at_or_before(datetime(2026, 10, 19, 9, 0)) == datetime(2026, 10, 19, 9, 0)
+    assert cron.previous_at_or_before(datetime(2026, 10, 19, 8, 59)) == datetime(2026, 10, 18, 9, 0)
+
+
+def test_day_and_weekday_use_or() -> None:
+    cron = CronExpression("0 0 13 * 5")
+    assert cron.matches(datetime(2026, 10, 13, 0, 0))  # 火曜日の 13 日
+    assert cron.matches(datetime(2026, 10, 16, 0, 0))  # 金曜日
+    assert not cron.matches(datetime(2026, 10, 14, 0, 0))
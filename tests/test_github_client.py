@@ -0,0 +1,128 @@
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+import requests
+
+from src.client.github_client import GitHubClient
+
+BASE = "https://api.github.com/repos/owner/repo"
+GRAPHQL = "https://api.github.com/graphql"
+
+
+def response(status_code: int, body: Any = None, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    result = requests.Response()
+    result.status_code = status_code
+    result.headers.update(headers or {})
+    result._content = json.dumps(body).encode("utf-8") if body is not None else b""
+    return result
+
+
+class FakeAPI:
+    """(メソッド, URL) ごとの応答を返す _request の代わり"""
+
+    def __init__(self, routes: Dict[Tuple[str, str], Callable[..., requests.Response]]):
+        self.routes = routes
+        self.calls: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        with self._lock:
+            self.calls.append((method, url, kwargs))
+        return self.routes[(method, url)](**kwargs)
+
+    def count(self, method: str, url: str) -> int:
+        return sum(1 for call in self.calls if call[:2] == (method, url))
+
+
+def label(name: str) -> Dict[str, Any]:
+    return {"name": name, "node_id": f"L_{name}"}
+
+
+def make_client(monkeypatch: pytest.MonkeyPatch, routes: Dict[Tuple[str, str], Callable[..., requests.Response]]) -> Tuple[GitHubClient, FakeAPI]:
+    client = GitHubClient(token="token", repo="owner/repo")
+    api = FakeAPI({("GET", BASE): lambda **kwargs: response(200, {"node_id": "R_1"}), **routes})
+    monkeypatch.setattr(client, "_request", api)
+    return client, api
+
+
+def test_labels_revalidated_with_etag(monkeypatch: pytest.MonkeyPatch) -> None:
+    def labels(headers: Dict[str, str], **kwargs: Any) -> requests.Response:
+        if headers.get("If-None-Match") == '"v1"':
+            return response(304)
+        return response(200, [label("news")], {"ETag": '"v1"'})
+
+    client, api = make_client(monkeypatch, {("GET", f"{BASE}/labels"): labels})
+    assert list(client.get_labels()) == ["news"]
+    assert list(client.get_labels()) == ["news"]
+    assert [call[2]["headers"] for call in api.calls] == [{}, {"If-None-Match": '"v1"'}]
+
+
+def test_missing_labels_created_in_parallel(monkeypatch: pytest.MonkeyPatch) -> None:
+    barrier = threading.Barrier(3, timeout=5)
+
+    def create(data: str, **kwargs: Any) -> requests.Response:
+        barrier.wait()
+        return response(201, label(json.loads(data)["name"]))
+
+    client, api = make_client(
+        monkeypatch,
+        {("GET", f"{BASE}/labels"): lambda **kwargs: response(200, [label("news")]), ("POST", f"{BASE}/labels"): create},
+    )
+    labels = client.ensure_labels(["news", "a", "b", "c", "a"])
+    assert list(labels) == ["news", "a", "b", "c"]
+    assert api.count("POST", f"{BASE}/labels") == 3
+
+
+def graphql_issue(**kwargs: Any) -> requests.Response:
+    variables = json.loads(kwargs["data"])["variables"]
+    assert variables["labelIds"] == ["L_news"]
+    return response(200, {"data": {"createIssue": {"issue": {"number": 1, "url": "https://github.com/owner/repo/issues/1", "id": "I_1"}}}})
+
+
+def test_create_issue_graphql(monkeypatch: pytest.MonkeyPatch) -> None:
+    client, api = make_client(
+        monkeypatch, {("GET", f"{BASE}/labels"): lambda **kwargs: response(200, [label("news")]), ("POST", GRAPHQL): graphql_issue}
+    )
+    issue = client.create_issue("Daily", "body", ["news"])
+    assert issue == {"number": 1, "html_url": "https://github.com/owner/repo/issues/1", "node_id": "I_1"}
+    assert api.count("POST", f"{BASE}/issues") == 0
+
+
+def timeout(**kwargs: Any) -> requests.Response:
+    raise requests.Timeout("timed out")
+
+
+def test_create_issue_graphql_failed_but_issue_exists(monkeypatch: pytest.MonkeyPatch) -> None:
+    existing = {"title": "Daily", "html_url": "https://github.com/owner/repo/issues/2"}
+    client, api = make_client(
+        monkeypatch,
+        {
+            ("GET", f"{BASE}/labels"): lambda **kwargs: response(200, [label("news")]),
+            ("POST", GRAPHQL): timeout,
+            ("GET", f"{BASE}/issues"): lambda **kwargs: response(200, [existing]),
+        },
+    )
+    assert client.create_issue("Daily", "body", ["news"]) == existing
+    assert api.count("POST", f"{BASE}/issues") == 0
+
+
+def test_create_issue_rest_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    created = {"number": 3, "html_url": "https://github.com/owner/repo/issues/3"}
+
+    def create(data: str, **kwargs: Any) -> requests.Response:
+        assert json.loads(data) == {"title": "Daily", "body": "body", "labels": ["news"]}
+        return response(201, created)
+
+    client, api = make_client(
+        monkeypatch,
+        {
+            ("GET", f"{BASE}/labels"): lambda **kwargs: response(200, [label("news")]),
+            ("POST", GRAPHQL): lambda **kwargs: response(200, {"errors": [{"message": "forbidden"}]}),
+            ("GET", f"{BASE}/issues"): lambda **kwargs: response(200, [{"title": "Other", "html_url": "x"}]),
+            ("POST", f"{BASE}/issues"): create,
+        },
+    )
+    assert client.create_issue("Daily", "body", ["news"]) == created
+    assert api.count("POST", f"{BASE}/issues") == 1
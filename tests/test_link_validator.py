@@ -0,0 +1,35 @@
+from src.utils.link_validator import BROKEN_LINK_NOTE, apply_link_results
+
+MARKDOWN = """# News
+
+- [Good](https://good.example/a)
+- [Broken](https://broken.example/b)
+  - child detail
+- Bare https://broken.example/b.
+
+See [Broken](https://broken.example/b) for details."""
+
+RESULTS = {"https://good.example/a": {"ok": True}, "https://broken.example/b": {"ok": False}}
+
+
+def test_no_broken_links_returns_original() -> None:
+    markdown, broken = apply_link_results(MARKDOWN, {"https://good.example/a": {"ok": True}})
+    assert markdown == MARKDOWN
+    assert broken == []
+
+
+def test_annotate() -> None:
+    markdown, broken = apply_link_results(MARKDOWN, RESULTS)
+    assert broken == ["https://broken.example/b"]
+    assert f"- [Broken](https://broken.example/b){BROKEN_LINK_NOTE}" in markdown
+    assert f"- Bare https://broken.example/b{BROKEN_LINK_NOTE}." in markdown
+    assert "[Good](https://good.example/a)" + BROKEN_LINK_NOTE not in markdown
+
+
+def test_drop() -> None:
+    markdown, broken = apply_link_results(MARKDOWN, RESULTS, action="drop")
+    assert broken == ["https://broken.example/b"]
+    assert "- [Good](https://good.example/a)" in markdown
+    assert "child detail" not in markdown
+    assert "- Bare" not in markdown
+    assert "See Broken for details." in markdown
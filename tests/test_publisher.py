@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.publisher import GitHubIssueSink, ReportPublisher, ReportSink
+
+REPORT = {"title": "Daily", "body": "body", "labels": ["news"]}
+
+
+class FlakySink(ReportSink):
+    """指定回数失敗した後に成功する出力先"""
+
+    def __init__(self, name: str, failures: int):
+        self.name = name
+        self.failures = failures
+        self.calls = 0
+
+    def publish(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError(f"{self.name} failed")
+        return {"html_url": f"https://example.com/{self.name}"}
+
+
+@pytest.fixture
+def delays(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    recorded: List[float] = []
+
+    async def sleep(delay: float) -> None:
+        recorded.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return recorded
+
+
+def test_retry_with_backoff(delays: List[float]) -> None:
+    sink = FlakySink("a", failures=2)
+    result = ReportPublisher([sink], max_retries=3, retry_backoff=2.0).publish(REPORT)
+    assert result["status"] == "success"
+    assert result["results"]["a"]["attempts"] == 3
+    assert delays == [2.0, 4.0]
+
+
+def test_failure_is_isolated_per_sink(delays: List[float]) -> None:
+    broken, healthy = FlakySink("broken", failures=10), FlakySink("healthy", failures=0)
+    result = ReportPublisher([broken, healthy], max_retries=2, retry_backoff=1.0).publish(REPORT)
+    assert result["status"] == "partial"
+    assert result["results"]["broken"] == {"status": "error", "attempts": 3, "message": "broken failed"}
+    assert result["results"]["healthy"]["status"] == "success"
+    assert healthy.calls == 1
+    assert result["issue_url"] == "https://example.com/healthy"
+    assert result["message"] == "broken: broken failed"
+
+
+def test_all_sinks_failed(delays: List[float]) -> None:
+    result = ReportPublisher([FlakySink("a", failures=10)], max_retries=0).publish(REPORT)
+    assert result["status"] == "error"
+    assert delays == []
+
+
+class FakeGitHubClient:
+    """Issue の作成がタイムアウトしたが GitHub 側では作成済みになる GitHubClient の代わり"""
+
+    repo = "owner/repo"
+
+    def __init__(self) -> None:
+        self.created: List[str] = []
+        self.searched: List[Optional[str]] = []
+
+    def create_issue(self, title: str, body: str, labels: Optional[list] = None) -> Dict[str, Any]:
+        self.created.append(title)
+        return {"error": "timed out"}
+
+    def find_issue(self, title: str, label: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        self.searched.append(label)
+        if title in self.created:
+            return {"html_url": "https://github.com/owner/repo/issues/1", "number": 1}
+        return None
+
+
+def test_github_sink_retry_does_not_duplicate_issue(delays: List[float]) -> None:
+    client = FakeGitHubClient()
+    sink = GitHubIssueSink(client)  # type: ignore[arg-type]
+    result = ReportPublisher([sink], max_retries=3).publish(REPORT)
+    assert result["status"] == "success"
+    assert result["issue_url"] == "https://github.com/owner/repo/issues/1"
+    assert client.created == ["Daily"]
+    assert client.searched == ["news"]
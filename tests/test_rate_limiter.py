@@ -0,0 +1,53 @@
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+from src.utils.rate_limiter import ProviderLimit, RateLimiter
+
+
+def test_unlimited_provider_does_not_wait() -> None:
+    limiter = RateLimiter({})
+    assert all(limiter.acquire("anthropic") < 0.1 for _ in range(100))
+
+
+def test_requests_per_minute(tmp_path: Path) -> None:
+    limiter = RateLimiter({"anthropic": ProviderLimit(requests_per_minute=120)}, state_file=str(tmp_path / "limits.json"))
+    for _ in range(120):
+        limiter.acquire("anthropic")
+    # バケットが空の場合は 1 件分（0.5 秒）補充されるまで待機する
+    assert limiter.acquire("anthropic") >= 0.3
+
+
+def test_state_file_is_shared(tmp_path: Path) -> None:
+    state_file = str(tmp_path / "limits.json")
+    limits = {"anthropic": ProviderLimit(requests_per_minute=120)}
+    RateLimiter(limits, state_file=state_file).update_from_headers("anthropic", {"anthropic-ratelimit-requests-remaining": "0"})
+    assert RateLimiter(limits, state_file=state_file).acquire("anthropic") >= 0.3
+
+
+def test_retry_after_blocks(tmp_path: Path) -> None:
+    limiter = RateLimiter({})
+    assert limiter.update_from_headers("github", {"Retry-After": "1"}, status_code=429)
+    started = time.monotonic()
+    limiter.acquire("github")
+    assert time.monotonic() - started >= 0.8
+
+
+def test_priority_order() -> None:
+    limiter = RateLimiter({})
+    limiter.block("anthropic", 0.5)
+    order: List[str] = []
+
+    def worker(name: str, priority: int) -> None:
+        limiter.acquire("anthropic", priority=priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=worker, args=("low", 2))]
+    threads[0].start()
+    time.sleep(0.1)
+    threads.append(threading.Thread(target=worker, args=("high", 0)))
+    threads[1].start()
+    for thread in threads:
+        thread.join()
+    assert order == ["high", "low"]
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from src.utils.report_index import ReportIndex, chunk_markdown, tokenize
+
+
+def test_chunk_markdown_headings() -> None:
+    chunks = chunk_markdown("# Report\nintro\n## Models\nnew model\n## Tools\nnew tool\n")
+    assert [chunk["heading"] for chunk in chunks] == ["Report", "Report > Models", "Report > Tools"]
+    assert "new model" in chunks[1]["text"]
+
+
+def test_chunk_markdown_splits_long_sections() -> None:
+    paragraphs = "\n\n".join(f"paragraph {i} " + "x" * 100 for i in range(20))
+    chunks = chunk_markdown(f"# Long\n{paragraphs}", max_chars=300)
+    assert len(chunks) > 1
+    assert all(chunk["heading"] == "Long" for chunk in chunks)
+
+
+def test_tokenize_cjk_bigrams() -> None:
+    assert {"大規", "規模", "模言", "言語"} <= set(tokenize("大規模言語"))
+
+
+def test_search_ranks_and_filters(tmp_path: Path) -> None:
+    index = ReportIndex(str(tmp_path))
+    index.add("a", "Daily A", "# Daily\n## Agents\nagent frameworks and tool use", {"report_type": "report", "created_at": "2026-10-01"})
+    index.add("b", "Daily B", "# Daily\n## Vision\nimage generation models", {"report_type": "report", "created_at": "2026-10-10"})
+    index.add("c", "Weekly", "# Weekly\n## Agents\nagent agent benchmarks", {"report_type": "weekly_report", "created_at": "2026-10-12"})
+
+    results = index.search("agent", k=5)
+    assert {result["title"] for result in results} == {"Daily A", "Weekly"}
+    assert results[0]["score"] >= results[-1]["score"]
+
+    assert [result["title"] for result in index.search("agent", k=5, report_type="report")] == ["Daily A"]
+    assert [result["title"] for result in index.search("agent", k=5, since="2026-10-05")] == ["Weekly"]
+    assert index.search("quantum", k=5) == []
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.server import report_service
+from src.server.report_service import ReportJobService
+
+
+class FakeAgent:
+    """実行中のスレッドを記録する AITechCatchupAgent の代わり"""
+
+    instances: List["FakeAgent"] = []
+    release = threading.Event()
+
+    def __init__(self, model: Optional[str] = None, max_tokens: Optional[int] = None, enabled_mcp_servers: Optional[List[str]] = None):
+        self.threads: set = set()
+        self.running = 0
+        FakeAgent.instances.append(self)
+
+    def run_report(self, mode: str, topic: Optional[str], news_count: Optional[int], create_issue: bool) -> Dict[str, Any]:
+        self.threads.add(threading.current_thread().name)
+        self.running += 1
+        assert self.running == 1, "Agent が複数のジョブで同時に使用されました"
+        FakeAgent.release.wait(5)
+        self.running -= 1
+        return {"status": "success", "message": f"{mode} {topic}", "content": "report"}
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> Any:
+    FakeAgent.instances = []
+    FakeAgent.release = threading.Event()
+    monkeypatch.setattr(report_service, "AITechCatchupAgent", FakeAgent)
+    job_service = ReportJobService(max_workers=2)
+    yield job_service
+    FakeAgent.release.set()
+    job_service.shutdown()
+
+
+def wait_finished(service: ReportJobService, job_id: str) -> Dict[str, Any]:
+    deadline = time.monotonic() + 5
+    job = service.get_job(job_id)
+    while job["status"] not in ("success", "error") and time.monotonic() < deadline:
+        job = service.wait_for_update(job_id, job["version"], timeout=1)
+    return job
+
+
+def test_each_worker_has_its_own_agent(service: ReportJobService) -> None:
+    jobs = [service.submit({"mode": "topic", "topic": topic}) for topic in ("LLM", "RAG")]
+    time.sleep(0.2)
+    FakeAgent.release.set()
+    assert [wait_finished(service, job["job_id"])["status"] for job in jobs] == ["success", "success"]
+    assert len(FakeAgent.instances) == 2
+    assert all(len(agent.threads) == 1 for agent in FakeAgent.instances)
+
+    # 同じワーカーの以降のジョブでは Agent を使い回す
+    job = service.submit({"mode": "topic", "topic": "Agents"})
+    assert wait_finished(service, job["job_id"])["status"] == "success"
+    assert len(FakeAgent.instances) == 2
+
+
+def test_same_request_is_coalesced_then_cached(service: ReportJobService) -> None:
+    first = service.submit({"mode": "topic", "topic": "LLM"})
+    second = service.submit({"mode": "topic", "topic": " llm "})
+    assert second["coalesced"] and second["job_id"] == first["job_id"]
+    FakeAgent.release.set()
+    wait_finished(service, first["job_id"])
+    assert service.submit({"mode": "topic", "topic": "LLM"})["cached"]
+
+
+def test_only_current_window_is_accepted(service: ReportJobService) -> None:
+    with pytest.raises(ValueError):
+        service.submit({"mode": "report", "window": "2020-01-01"})
+    job = service.submit({"mode": "report", "window": ReportJobService.default_window("report")})
+    assert job["window"] == ReportJobService.default_window("report")
@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+from src.agent.research import ResearchStore, parse_research
+
+
+def test_parse_research_json_block() -> None:
+    text = 'Result:\n```json\n{"items": [{"url": "https://a.example", "title": "A"}, {"title": "no url"}]}\n```'
+    assert parse_research(text) == [{"url": "https://a.example", "title": "A"}]
+
+
+def test_parse_research_bare_object() -> None:
+    assert parse_research('prefix {"items": [{"url": "https://b.example"}]} suffix') == [{"url": "https://b.example"}]
+
+
+@pytest.mark.parametrize("text", ["no json here", '{"items": "x"}', "```json\n{broken\n```"])
+def test_parse_research_invalid(text: str) -> None:
+    with pytest.raises(ValueError):
+        parse_research(text)
+
+
+ARTIFACT = {
+    "items": [
+        {"url": "https://a.example", "title": "LLM release", "published_at": "2026-10-10"},
+        {"url": "https://b.example", "title": "Robotics", "published_at": "2026-10-12T08:00:00"},
+        {"url": "https://c.example", "title": "Old LLM news", "published_at": "2026-09-01"},
+        {"url": "https://d.example", "title": "Unknown date"},
+    ]
+}
+
+
+def test_select_items_by_window() -> None:
+    items = ResearchStore.select_items(ARTIFACT, date(2026, 10, 9), date(2026, 10, 12))
+    assert [item["url"] for item in items] == ["https://a.example", "https://b.example", "https://d.example"]
+
+
+def test_select_items_by_topic() -> None:
+    items = ResearchStore.select_items(ARTIFACT, date(2026, 10, 9), date(2026, 10, 12), topic="llm")
+    assert [item["url"] for item in items] == ["https://a.example"]
+
+
+def test_select_items_topic_without_match_returns_window() -> None:
+    items = ResearchStore.select_items(ARTIFACT, date(2026, 10, 9), date(2026, 10, 12), topic="quantum")
+    assert len(items) == 3
@@ -0,0 +1,101 @@
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.agent import run_guard
+from src.agent.ai_tech_catchup_agent import AITechCatchupAgent
+from src.agent.run_guard import IssueLookup, RunGuard, run_key
+from src.config import settings
+
+STARTED_AT = datetime(2026, 10, 19, 9, 0)
+KEY = run_key("report", "2026-10-19")
+
+
+class FakeGitHubClient:
+    def __init__(self, issues: Optional[List[Dict[str, Any]]] = None):
+        self.issues = issues or []
+        self.calls = 0
+
+    def list_issues(self, label: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        self.calls += 1
+        return self.issues
+
+
+def guard(tmp_path: Path, github_client: FakeGitHubClient, attach: bool = False) -> Dict[str, Any]:
+    agent = SimpleNamespace(
+        run_guard=RunGuard(str(tmp_path / "runs")), issue_lookup=IssueLookup(str(tmp_path / "issues.json")), github_client=github_client
+    )
+    item: Dict[str, Any] = {"mode": "report", "started_at": STARTED_AT, "attach": attach}
+    AITechCatchupAgent._guard_run(agent, item)  # type: ignore[arg-type]
+    return item
+
+
+def test_run_key_normalizes_topic() -> None:
+    assert run_key("topic_report", "2026-10-19", " LLM ") == "topic_report:2026-10-19:llm"
+
+
+def test_new_period_is_locked_for_generation(tmp_path: Path) -> None:
+    item = guard(tmp_path, FakeGitHubClient())
+    assert item["run_key"] == KEY
+    assert RunGuard(str(tmp_path / "runs")).try_lock(KEY) is None
+    item["run_lock"].release()
+
+
+def test_completed_period_is_skipped(tmp_path: Path) -> None:
+    RunGuard(str(tmp_path / "runs")).complete(KEY, {"issue_url": "https://github.com/owner/repo/issues/1"})
+    github_client = FakeGitHubClient()
+    item = guard(tmp_path, github_client)
+    assert item["skipped"]
+    assert item["result"]["issue_url"] == "https://github.com/owner/repo/issues/1"
+    assert github_client.calls == 0
+    assert "run_lock" not in item
+
+
+def test_existing_issue_is_skipped(tmp_path: Path) -> None:
+    issue = {"title": "🤖 AI Tech Catchup Report - 2026-10-19", "html_url": "https://github.com/owner/repo/issues/2"}
+    item = guard(tmp_path, FakeGitHubClient([issue]))
+    assert item["skipped"]
+    assert item["result"]["issue_url"] == issue["html_url"]
+
+
+def test_running_elsewhere_is_deferred(tmp_path: Path) -> None:
+    held = RunGuard(str(tmp_path / "runs")).try_lock(KEY)
+    assert held is not None
+    item = guard(tmp_path, FakeGitHubClient())
+    assert item["deferred"]
+    assert "run_lock" not in item and "skipped" not in item
+    held.release()
+
+
+def test_attach_waits_for_other_run(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(run_guard, "ATTACH_POLL_INTERVAL", 0.05)
+    monkeypatch.setattr(settings, "run_attach_timeout", 0.2)
+    held = RunGuard(str(tmp_path / "runs")).try_lock(KEY)
+    assert held is not None
+    assert "タイムアウト" in guard(tmp_path, FakeGitHubClient(), attach=True)["error"]
+
+    # 他の実行が完了した後は作成済みとしてスキップ
+    RunGuard(str(tmp_path / "runs")).complete(KEY, {"issue_url": "https://github.com/owner/repo/issues/3"})
+    held.release()
+    item = guard(tmp_path, FakeGitHubClient(), attach=True)
+    assert item["skipped"]
+
+
+def test_issue_lookup_cache_expires(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    github_client = FakeGitHubClient([{"title": "A", "html_url": "url-a"}])
+    lookup = IssueLookup(str(tmp_path / "issues.json"), ttl=60)
+    assert lookup.find(github_client, "report", "A") == "url-a"
+    assert lookup.find(github_client, "report", "B") is None
+    lookup.add("report", "B", "url-b")
+    assert IssueLookup(str(tmp_path / "issues.json"), ttl=60).find(github_client, "report", "B") == "url-b"
+    assert github_client.calls == 1
+
+    now = time.time()
+    monkeypatch.setattr(run_guard.time, "time", lambda: now + 61)
+    github_client.issues = [{"title": "C", "html_url": "url-c"}]
+    assert lookup.find(github_client, "report", "C") == "url-c"
+    assert github_client.calls == 2
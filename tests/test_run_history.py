@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pytest
+
+from src.utils.run_history import MAX_AUTO_CONCURRENCY, RunHistory
+
+CONFIGURED = {"generate_concurrency": 1, "generate_timeout": 600, "max_tokens": 8192}
+
+
+def make_history(tmp_path: Path, runs: int = 5, failures: int = 0, seconds: float = 100.0, items: int = 10) -> RunHistory:
+    history = RunHistory(str(tmp_path / "history.jsonl"))
+    for _ in range(runs):
+        history.record(
+            {"report_type": "report", "model": "m", "status": "success", "generate_seconds": seconds, "output_tokens": 3000, "items": items}
+        )
+    for _ in range(failures):
+        history.record({"report_type": "report", "model": "m", "status": "error", "items": items})
+    return history
+
+
+def test_too_few_runs_returns_configured(tmp_path: Path) -> None:
+    history = make_history(tmp_path, runs=2)
+    assert history.recommend("report", "m", 300, CONFIGURED) == CONFIGURED
+
+
+def test_timeout_and_tokens(tmp_path: Path) -> None:
+    recommended = make_history(tmp_path).recommend("report", "m", 300, CONFIGURED)
+    assert recommended["generate_timeout"] == 180
+    assert recommended["max_tokens"] == 4096
+
+
+@pytest.mark.parametrize("configured, expected", [(1, MAX_AUTO_CONCURRENCY), (4, 4), (8, 8), (16, 10)])
+def test_concurrency(tmp_path: Path, configured: int, expected: int) -> None:
+    # 10 件 × 100 秒を 100 秒に収めるには同時実行数 10 が必要
+    history = make_history(tmp_path)
+    recommended = history.recommend("report", "m", 100, {**CONFIGURED, "generate_concurrency": configured})
+    assert recommended["generate_concurrency"] == expected
+
+
+def test_concurrency_not_raised_when_failing(tmp_path: Path) -> None:
+    history = make_history(tmp_path, runs=3, failures=3)
+    recommended = history.recommend("report", "m", 100, {**CONFIGURED, "generate_concurrency": 2})
+    assert recommended["generate_concurrency"] == 2
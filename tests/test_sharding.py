@@ -0,0 +1,31 @@
+from src.agent.sharding import select_shard, shard_of
+
+TOPICS = [f"topic {i}" for i in range(40)]
+
+
+def test_shard_of_is_stable_and_in_range() -> None:
+    for topic in TOPICS:
+        shard = shard_of(topic, 4)
+        assert 1 <= shard <= 4
+        assert shard_of(topic, 4) == shard
+        assert shard_of(f"  {topic.upper()} ", 4) == shard
+
+
+def test_shards_partition_topics() -> None:
+    shards = [select_shard(TOPICS, index, 4) for index in range(1, 5)]
+    assert sorted(topic for shard in shards for topic in shard) == sorted(TOPICS)
+    assert all(shards)
+
+
+def test_select_shard_dedupes_and_keeps_order() -> None:
+    topics = ["LLM", "Agents", "llm ", "RAG", ""]
+    selected = [topic for index in range(1, 3) for topic in select_shard(topics, index, 2)]
+    assert sorted(selected) == ["Agents", "LLM", "RAG"]
+    for index in range(1, 3):
+        shard = select_shard(topics, index, 2)
+        assert shard == [topic for topic in ["LLM", "Agents", "RAG"] if topic in shard]
+
+
+def test_resharding_moves_few_topics() -> None:
+    moved = sum(1 for topic in TOPICS if shard_of(topic, 4) != shard_of(topic, 5) and shard_of(topic, 5) != 5)
+    assert moved == 0
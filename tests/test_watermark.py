@@ -0,0 +1,30 @@
+from datetime import datetime
+from pathlib import Path
+
+from src.agent.watermark import WatermarkStore
+
+NOW = datetime(2026, 10, 19, 9, 0)
+
+
+def test_get_unrecorded(tmp_path: Path) -> None:
+    assert WatermarkStore(str(tmp_path / "watermarks.json")).get("report", now=NOW) is None
+
+
+def test_update_only_moves_forward(tmp_path: Path) -> None:
+    store = WatermarkStore(str(tmp_path / "watermarks.json"))
+    store.update("report", None, datetime(2026, 10, 18, 9, 0))
+    store.update("report", None, datetime(2026, 10, 17, 9, 0))
+    assert store.get("report", now=NOW) == datetime(2026, 10, 18, 9, 0)
+
+
+def test_topic_is_normalized(tmp_path: Path) -> None:
+    store = WatermarkStore(str(tmp_path / "watermarks.json"))
+    store.update("topic_report", " LLM ", datetime(2026, 10, 18, 9, 0))
+    assert store.get("topic_report", "llm", now=NOW) == datetime(2026, 10, 18, 9, 0)
+    assert store.get("topic_report", "rag", now=NOW) is None
+
+
+def test_get_clamps_to_max_age(tmp_path: Path) -> None:
+    store = WatermarkStore(str(tmp_path / "watermarks.json"), max_age_days=7)
+    store.update("report", None, datetime(2026, 9, 1, 9, 0))
+    assert store.get("report", now=NOW) == datetime(2026, 10, 12, 9, 0)